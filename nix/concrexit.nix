@@ -31,6 +31,7 @@ let
   # Wrapper script that sets the right options for uWSGI
   concrexit-uwsgi = writeScript "concrexit-uwsgi" ''
     MANAGE_PY=1 ${concrexit-env}/bin/python ${manage-py} migrate
+    MANAGE_PY=1 ${concrexit-env}/bin/python ${manage-py} createcachetable
 
     ${uwsgi-python}/bin/uwsgi $@ \
       --plugins python3 \
@@ -92,6 +92,7 @@ in
         SITE_DOMAIN = if cfg.ssl then cfg.domain else "*";
         MEDIA_ROOT = "${cfg.dir}/media";
         SENDFILE_ROOT = "${cfg.dir}/media";
+        CACHE_LOCATION = "${cfg.dir}/cache";
         POSTGRES_USER = "concrexit";
         POSTGRES_DB = "concrexit";
         DJANGO_ENV = "staging";
@@ -179,6 +180,8 @@ in
         script = ''
           mkdir --parents ${cfg.dir}/media
           chown ${cfg.user} ${cfg.dir}/media
+          mkdir --parents ${cfg.dir}/cache
+          chown ${cfg.user} ${cfg.dir}/cache
         '';
       };
 
@@ -221,10 +224,26 @@ in
         every = 60 * 5;
         description = "Send scheduled push notifications";
       };
+      importalbumarchives = {
+        every = 60;
+        description = "Import uploaded photo album archives";
+      };
+      generatethumbnails = {
+        every = 60;
+        description = "Generate the thumbnails of new photos";
+      };
+      renderthabloids = {
+        every = 60;
+        description = "Render the pages of new Thabloids";
+      };
       sendplannednewsletters = {
         every = 60;
         description = "Send planned newsletters";
       };
+      sync_mailinglist_changes = {
+        every = 60 * 5;
+        description = "Sync the changed mailing lists with GSuite";
+      };
       sync_mailinglists.calendar = "*-*-* *:30:00";
       clearsessions.calendar = "*-*-* 23:00:00";
       minimiseregistrations.calendar = "*-*-01 03:00:00";
@@ -234,6 +253,19 @@ in
       sendmembershipnotification.calendar = "*-08-31 06:00:00";
       sendinformationcheck.calendar = "*-10-15 06:00:00";
       revokeoldmandates.calendar = "*-*-* 03:00:00";
+      reconcilesalestotals.calendar = "*-*-* 04:00:00";
+      sendwithdrawalnotices = {
+        every = 60 * 5;
+        description = "Send Thalia Pay withdrawal notices";
+      };
+      sendentryemails = {
+        every = 60;
+        description = "Send the emails of accepted registrations";
+      };
+      sendoutbox = {
+        every = 60;
+        description = "Deliver the queued emails";
+      };
     };
 
     services = {
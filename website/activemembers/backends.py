@@ -1,9 +1,5 @@
 """Authentication backend to check permissions."""
-from django.contrib.auth.models import Permission
-from django.db.models import Q
-from django.utils import timezone
-
-from members.models import Member
+from activemembers.services import get_member_group_permissions
 
 
 class MemberGroupBackend:
@@ -21,28 +17,10 @@ class MemberGroupBackend:
     def _get_permissions(user, obj):
         if not user.is_active or user.is_anonymous or obj is not None:
             return set()
-        try:
-            member = Member.objects.get(pk=user.pk)
-        except Member.DoesNotExist:
-            return set()
-
-        groups = member.membergroup_set.filter(
-            Q(membergroupmembership__until=None)
-            | Q(membergroupmembership__until__gte=timezone.now())
-        )
 
         perm_cache_name = "_membergroup_perm_cache"
         if not hasattr(user, perm_cache_name):
-            perms = (
-                Permission.objects.filter(membergroup__in=groups)
-                .values_list("content_type__app_label", "codename")
-                .order_by()
-            )
-            setattr(
-                user,
-                perm_cache_name,
-                set("{}.{}".format(ct, name) for ct, name in perms),
-            )
+            setattr(user, perm_cache_name, get_member_group_permissions(user))
         return getattr(user, perm_cache_name)
 
     def get_all_permissions(self, user, obj=None):
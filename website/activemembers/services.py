@@ -1,7 +1,12 @@
+from django.contrib.auth.models import Permission
 from django.db.models import Count, Q
 from django.utils import timezone
 
 from activemembers.models import Committee
+from utils import cache
+
+PERMISSIONS_CACHE_TAG = "membergroup_perms"
+PERMISSIONS_CACHE_TIMEOUT = 60 * 60
 
 
 def generate_statistics() -> dict:
@@ -24,3 +29,47 @@ def generate_statistics() -> dict:
         data["datasets"][0]["data"].append(committee.member_count)
 
     return data
+
+
+def invalidate_member_group_permissions():
+    """Invalidate the cached member group permissions of all users."""
+    cache.invalidate(PERMISSIONS_CACHE_TAG)
+
+
+def get_member_group_permissions(user) -> set:
+    """Get the permissions a user has through their member groups.
+
+    The permissions are cached with a tag that is invalidated when
+    memberships or the permissions of groups change. The key also contains
+    the date, since memberships end without any change to the database.
+    Without a shared cache the permissions are not cached, because other
+    processes would not see the invalidation.
+
+    :param user: the user to get the permissions of
+    :return: the permissions as ``app_label.codename`` strings
+    :rtype: set
+    """
+    today = timezone.now().date()
+
+    def _get_permissions():
+        return set(
+            "{}.{}".format(ct, name)
+            for ct, name in Permission.objects.filter(
+                Q(membergroup__membergroupmembership__until=None)
+                | Q(membergroup__membergroupmembership__until__gte=today),
+                membergroup__membergroupmembership__member=user.pk,
+            )
+            .values_list("content_type__app_label", "codename")
+            .distinct()
+            .order_by()
+        )
+
+    if not cache.is_shared():
+        return _get_permissions()
+
+    return cache.get_or_set(
+        f"membergroup_perms_{user.pk}_{today.isoformat()}",
+        _get_permissions,
+        tags=[PERMISSIONS_CACHE_TAG],
+        timeout=PERMISSIONS_CACHE_TIMEOUT,
+    )
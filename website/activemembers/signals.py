@@ -3,11 +3,14 @@ import logging
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models.signals import pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
 from googleapiclient.errors import HttpError
 
 from activemembers import emails
 from activemembers.gsuite import GSuiteUserService
+from activemembers.models import MemberGroup, MemberGroupMembership
+from activemembers.services import invalidate_member_group_permissions
 from members.models import Member
 from utils.models.signals import suspendingreceiver
 
@@ -42,3 +45,33 @@ def pre_member_save(instance, **kwargs):
             sync_service.update_user(instance, existing_member.username)
     except HttpError as e:
         logger.error("Could not update G Suite account: %s", e)
+
+
+@receiver(
+    post_save,
+    sender=MemberGroupMembership,
+    dispatch_uid="activemembers_membership_save_permissions",
+)
+@receiver(
+    post_delete,
+    sender=MemberGroupMembership,
+    dispatch_uid="activemembers_membership_delete_permissions",
+)
+@receiver(
+    post_delete,
+    sender=MemberGroup,
+    dispatch_uid="activemembers_group_delete_permissions",
+)
+@receiver(
+    m2m_changed,
+    sender=MemberGroup.permissions.through,
+    dispatch_uid="activemembers_group_permissions_changed",
+)
+def member_group_permissions_changed(**kwargs):
+    """Invalidate the cached permissions when memberships or groups change.
+
+    These receivers are not suspended, see
+    ``utils.models.signals.suspendingreceiver``.
+    """
+    if kwargs.get("action", "post_").startswith("post_"):
+        invalidate_member_group_permissions()
@@ -1,7 +1,13 @@
+import shutil
+import tempfile
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.db.utils import IntegrityError
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from activemembers.models import Committee, MemberGroupMembership, Board
@@ -141,6 +147,21 @@ class PermissionsBackendTest(TestCase):
         cls.m1 = MemberGroupMembership.objects.create(group=cls.c1, member=cls.u1)
         cls.m2 = MemberGroupMembership.objects.create(group=cls.c2, member=cls.u2)
 
+    def setUp(self):
+        # Permissions are only cached in a cache that is shared by all processes
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache_settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": cache_dir,
+                }
+            }
+        )
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+
     def test_permissions(self):
         self.assertEqual(3, len(self.u1.get_all_permissions()))
         self.assertEqual(set(), self.u2.get_all_permissions())
@@ -150,6 +171,70 @@ class PermissionsBackendTest(TestCase):
         u = get_user_model().objects.create(username="foo")
         self.assertEqual(set(), u.get_all_permissions())
 
+    def test_permissions_cached(self):
+        self.c1.permissions.add(Permission.objects.get(codename="change_committee"))
+        self.assertTrue(self.u1.has_perm("activemembers.change_committee"))
+        user = Member.objects.get(pk=1)
+        with self.assertNumQueries(2):
+            # Only the queries of the ModelBackend remain
+            self.assertTrue(user.has_perm("activemembers.change_committee"))
+            self.assertFalse(user.has_perm("activemembers.delete_board"))
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_permissions_not_cached_per_process(self):
+        self.c1.permissions.add(Permission.objects.get(codename="change_committee"))
+        self.assertTrue(self.u1.has_perm("activemembers.change_committee"))
+        user = Member.objects.get(pk=1)
+        with self.assertNumQueries(3):
+            self.assertTrue(user.has_perm("activemembers.change_committee"))
+            self.assertFalse(user.has_perm("activemembers.delete_board"))
+
+    def test_permissions_membership_changed(self):
+        self.assertEqual(set(), self.u3.get_all_permissions())
+        MemberGroupMembership.objects.create(group=self.c1, member=self.u3)
+        u3 = Member.objects.get(pk=3)
+        self.assertEqual(self.u1.get_all_permissions(), u3.get_all_permissions())
+
+        MemberGroupMembership.objects.filter(member=self.u3).update(
+            until=timezone.now().date() - timezone.timedelta(days=1)
+        )
+        MemberGroupMembership.objects.get(member=self.u3).save()
+        u3 = Member.objects.get(pk=3)
+        self.assertEqual(set(), u3.get_all_permissions())
+
+    def test_permissions_group_changed(self):
+        self.assertEqual(set(), self.u2.get_all_permissions())
+        self.c2.permissions.add(Permission.objects.get(codename="change_committee"))
+        u2 = Member.objects.get(pk=2)
+        self.assertEqual({"activemembers.change_committee"}, u2.get_all_permissions())
+
+        self.c2.permissions.clear()
+        u2 = Member.objects.get(pk=2)
+        self.assertEqual(set(), u2.get_all_permissions())
+
+    def test_admin_changelist_queries(self):
+        self.u1.is_staff = True
+        self.u1.save()
+        self.c1.permissions.add(
+            *Permission.objects.filter(
+                codename__in=["view_committee", "change_committee"]
+            )
+        )
+        self.client.force_login(self.u1)
+        self.client.get("/admin/activemembers/committee/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/activemembers/committee/")
+        self.assertEqual(200, response.status_code)
+        self.assertFalse(
+            any(
+                "activemembers_membergroup_permissions" in q["sql"]
+                for q in queries.captured_queries
+            )
+        )
+
 
 class CommitteeMailingListTest(TestCase):
     fixtures = ["mailinglists.json", "member_groups.json"]
@@ -8,3 +8,12 @@ class AnnouncementsConfig(AppConfig):
 
     name = "announcements"
     verbose_name = _("Site announcements")
+
+    def ready(self):
+        """Invalidate the cached announcements when they change."""
+        # pylint: disable=import-outside-toplevel
+        from utils.cache import invalidate_on_change
+        from .models import Announcement
+        from .services import ANNOUNCEMENTS_CACHE_TAG
+
+        invalidate_on_change(Announcement, ANNOUNCEMENTS_CACHE_TAG)
@@ -1,5 +1,5 @@
 """These context processors can be used to expand the context provided to admin views."""
-from .models import Announcement
+from .services import get_visible_announcements
 
 
 def announcements(request):
@@ -13,8 +13,6 @@ def announcements(request):
     """
     closed_announcements = request.session.get("closed_announcements", [])
     announcements_list = [
-        a
-        for a in Announcement.objects.all()
-        if a.is_visible and a.pk not in closed_announcements
+        a for a in get_visible_announcements() if a.pk not in closed_announcements
     ]
     return {"announcements": announcements_list}
@@ -0,0 +1,53 @@
+"""The services defined by the announcements package."""
+import math
+
+from django.core.cache import cache as default_cache
+from django.db.models import Q
+from django.utils import timezone
+
+from announcements.models import Announcement
+from utils import cache
+
+ANNOUNCEMENTS_CACHE_TAG = "announcements"
+ANNOUNCEMENTS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _visible_announcements():
+    """Get the visible announcements and the moment the set changes next.
+
+    :return: the visible announcements and the next start or end time of an
+             announcement, or None if there is none
+    :rtype: tuple
+    """
+    now = timezone.now()
+    announcements = list(
+        Announcement.objects.filter(Q(until__isnull=True) | Q(until__gt=now))
+    )
+    visible = [a for a in announcements if a.since <= now]
+    boundaries = [a.since for a in announcements if a.since > now] + [
+        a.until for a in visible if a.until is not None
+    ]
+    return visible, min(boundaries, default=None)
+
+
+def get_visible_announcements():
+    """Get the announcements that are currently visible.
+
+    The announcements are cached until the next announcement starts or ends,
+    or until an announcement is changed.
+
+    :return: the visible announcements
+    :rtype: list
+    """
+    key = cache.tagged_key("announcements_visible", [ANNOUNCEMENTS_CACHE_TAG])
+    announcements = default_cache.get(key)
+    if announcements is None:
+        announcements, boundary = _visible_announcements()
+        timeout = ANNOUNCEMENTS_CACHE_TIMEOUT
+        if boundary is not None:
+            timeout = min(
+                timeout, math.ceil((boundary - timezone.now()).total_seconds())
+            )
+        if timeout > 0:
+            default_cache.set(key, announcements, timeout)
+    return announcements
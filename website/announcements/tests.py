@@ -1,8 +1,16 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
 from django.test import TestCase, RequestFactory, override_settings
 from django.urls import reverse
+from django.utils import timezone
+
+from announcements.context_processors import announcements
+from announcements.models import Announcement
 
 from announcements.views import close_announcement
 
@@ -83,3 +91,53 @@ class AnnouncementCloseTestCase(TestCase):
         self.assertEqual(len(request.session["closed_announcements"]), 1)
         self.assertTrue(request.session.modified)
         self.assertEqual(response.content, b"")
+
+
+class AnnouncementsContextProcessorTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.now = timezone.now()
+        self.visible = Announcement.objects.create(
+            content="Visible", since=self.now - timedelta(days=1)
+        )
+        self.ending = Announcement.objects.create(
+            content="Ending",
+            since=self.now - timedelta(days=1, hours=1),
+            until=self.now + timedelta(hours=1),
+        )
+        Announcement.objects.create(
+            content="Future", since=self.now + timedelta(hours=2)
+        )
+        Announcement.objects.create(
+            content="Ended",
+            since=self.now - timedelta(days=2),
+            until=self.now - timedelta(days=1),
+        )
+
+    def _announcements(self, closed=()):
+        request = self.factory.get("/")
+        SessionMiddleware().process_request(request)
+        request.session["closed_announcements"] = list(closed)
+        return announcements(request)["announcements"]
+
+    def test_visible(self):
+        self.assertEqual([self.visible, self.ending], self._announcements())
+
+    def test_closed(self):
+        self.assertEqual([self.ending], self._announcements([self.visible.pk]))
+
+    def test_cached(self):
+        self._announcements()
+        with self.assertNumQueries(0):
+            self.assertEqual([self.ending], self._announcements([self.visible.pk]))
+
+    def test_invalidated_on_change(self):
+        self._announcements()
+        self.visible.delete()
+        self.assertEqual([self.ending], self._announcements())
+
+    def test_cached_until_next_boundary(self):
+        with mock.patch("django.core.cache.cache.set") as cache_set:
+            self._announcements()
+        self.assertAlmostEqual(60 * 60, cache_set.call_args[0][2], delta=5)
@@ -1,5 +1,7 @@
 """The models defined by the education package."""
 from django.db import models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -24,9 +26,41 @@ class Category(models.Model):
         verbose_name_plural = _("categories")
 
 
+class CourseQuerySet(models.QuerySet):
+    """Custom queryset for courses."""
+
+    def with_document_count(self):
+        """Annotate the number of accepted documents of every course.
+
+        The ``document_count`` contains the accepted exams and summaries of
+        the course and its old courses.
+
+        :return: the annotated queryset
+        """
+        old_courses = Course.old_courses.through.objects.filter(
+            from_course=OuterRef(OuterRef("pk"))
+        ).values("to_course")
+
+        def count(model):
+            documents = (
+                model.objects.filter(
+                    Q(course=OuterRef("pk")) | Q(course__in=old_courses), accepted=True,
+                )
+                .order_by()
+                .values("accepted")
+                .annotate(count=Count("pk"))
+                .values("count")
+            )
+            return Coalesce(Subquery(documents, output_field=IntegerField()), 0)
+
+        return self.annotate(document_count=count(Exam) + count(Summary))
+
+
 class Course(models.Model):
     """Describes a course."""
 
+    objects = CourseQuerySet.as_manager()
+
     name = models.CharField(max_length=255)
 
     categories = models.ManyToManyField(
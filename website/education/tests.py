@@ -0,0 +1,96 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from education import services
+from education.models import Course, Exam, Summary
+
+
+class CourseIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.old_course = Course.objects.create(
+            name="Old course", course_code="OLD", ec=3, since=2010, until=2015
+        )
+        cls.course = Course.objects.create(
+            name="Course", course_code="NEW", ec=3, since=2015
+        )
+        cls.course.old_courses.add(cls.old_course)
+        cls.empty_course = Course.objects.create(
+            name="Empty", course_code="EMP", ec=3, since=2015
+        )
+
+        for course, accepted in [
+            (cls.course, True),
+            (cls.course, False),
+            (cls.old_course, True),
+            (cls.empty_course, False),
+        ]:
+            Exam.objects.create(
+                type="exam",
+                exam_date=timezone.now().date(),
+                course=course,
+                accepted=accepted,
+            )
+            Summary.objects.create(
+                name="Summary",
+                year=2020,
+                author="Author",
+                course=course,
+                accepted=accepted,
+            )
+
+    def test_document_count(self):
+        courses = Course.objects.with_document_count()
+        self.assertEqual(4, courses.get(pk=self.course.pk).document_count)
+        self.assertEqual(2, courses.get(pk=self.old_course.pk).document_count)
+        self.assertEqual(0, courses.get(pk=self.empty_course.pk).document_count)
+
+    def test_index_queries(self):
+        # Fill the caches that are used by every page
+        self.client.get(reverse("education:courses"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("education:courses"))
+
+        for i in range(3):
+            course = Course.objects.create(
+                name=f"Course {i}", course_code=f"C{i}", ec=3, since=2015
+            )
+            course.old_courses.add(self.old_course, self.course)
+
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(reverse("education:courses"))
+        self.assertEqual(
+            {"NEW": 4, "EMP": 0, "C0": 4, "C1": 4, "C2": 4},
+            {
+                course.course_code: course.document_count
+                for course in response.context["object_list"]
+            },
+        )
+
+
+class DownloadCountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        course = Course.objects.create(
+            name="Course", course_code="NEW", ec=3, since=2015
+        )
+        cls.exam = Exam.objects.create(
+            type="exam", exam_date=timezone.now().date(), course=course
+        )
+        cls.summary = Summary.objects.create(
+            name="Summary", year=2020, author="Author", course=course
+        )
+
+    def test_increment_download_count(self):
+        with self.assertNumQueries(1):
+            services.increment_download_count(self.exam)
+        services.increment_download_count(self.exam)
+        services.increment_download_count(self.summary)
+
+        self.exam.refresh_from_db()
+        self.summary.refresh_from_db()
+        self.assertEqual(2, self.exam.download_count)
+        self.assertEqual(1, self.summary.download_count)
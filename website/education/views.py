@@ -14,7 +14,7 @@ from django.views.generic import ListView, DetailView, CreateView, TemplateView
 from django_sendfile import sendfile
 
 from members.decorators import membership_required
-from . import emails
+from . import emails, services
 from .forms import AddExamForm, AddSummaryForm
 from .models import Category, Course, Exam, Summary
 
@@ -22,7 +22,11 @@ from .models import Category, Course, Exam, Summary
 class CourseIndexView(ListView):
     """Render an overview of the courses."""
 
-    queryset = Course.objects.filter(until=None)
+    queryset = (
+        Course.objects.filter(until=None)
+        .with_document_count()
+        .prefetch_related("categories")
+    )
     template_name = "education/courses.html"
 
     def get_ordering(self) -> str:
@@ -37,17 +41,7 @@ class CourseIndexView(ListView):
                         "course_code": x.course_code,
                         "name": x.name,
                         "categories": x.categories.all(),
-                        "document_count": sum(
-                            [
-                                x.summary_set.filter(accepted=True).count(),
-                                x.exam_set.filter(accepted=True).count(),
-                            ]
-                            + [
-                                c.summary_set.filter(accepted=True).count()
-                                + c.exam_set.filter(accepted=True).count()
-                                for c in x.old_courses.all()
-                            ]
-                        ),
+                        "document_count": x.document_count,
                         "url": x.get_absolute_url(),
                     }
                     for x in context["object_list"]
@@ -117,8 +111,7 @@ class ExamDetailView(DetailView):
     def get(self, request, *args, **kwargs) -> HttpResponse:
         response = super().get(request, *args, **kwargs)
         exam = response.context_data["object"]
-        exam.download_count += 1
-        exam.save()
+        services.increment_download_count(exam)
 
         ext = os.path.splitext(exam.file.path)[1]
         filename = f"{exam.course.name}-exam{exam.year}{ext}"
@@ -137,8 +130,7 @@ class SummaryDetailView(DetailView):
     def get(self, request, *args, **kwargs) -> HttpResponse:
         response = super().get(request, *args, **kwargs)
         obj = response.context_data["object"]
-        obj.download_count += 1
-        obj.save()
+        services.increment_download_count(obj)
 
         ext = os.path.splitext(obj.file.path)[1]
         filename = f"{obj.course.name}-summary{obj.year}{ext}"
@@ -1,11 +1,8 @@
-import csv
-
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin import helpers
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import PermissionRequiredMixin
-from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.utils import timezone
 from django.utils.decorators import method_decorator
@@ -21,7 +18,8 @@ from events.exceptions import RegistrationError
 from events.forms import FieldsForm, EventMessageForm
 from payments.models import Payment
 from pushnotifications.models import Message, Category
-from .models import Event, EventRegistration
+from utils.export import batched, export_response
+from .models import Event, EventRegistration, RegistrationInformationField
 
 
 @method_decorator(staff_member_required, name="dispatch")
@@ -37,7 +35,26 @@ class EventAdminDetails(DetailView, PermissionRequiredMixin):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        context.update({"payment": Payment, "has_permission": True, "site_url": "/"})
+        event = context["event"]
+        context.update(
+            {
+                "payment": Payment,
+                "has_permission": True,
+                "site_url": "/",
+                "participants": services.load_information_fields(
+                    event, event.participants.select_related("member", "payment")
+                ),
+                "queue": services.load_information_fields(
+                    event,
+                    event.queue.select_related("member", "payment")
+                    if event.max_participants is not None
+                    else [],
+                ),
+                "cancellations": services.load_information_fields(
+                    event, event.cancellations.select_related("member", "payment")
+                ),
+            }
+        )
 
         return context
 
@@ -198,11 +215,16 @@ class EventRegistrationsExport(View, PermissionRequiredMixin):
 
         :param request: the request object
         :param pk: the primary key of the event
-        :return: A CSV containing all registrations for the event
+        :return: A CSV or XLSX file containing all registrations for the event
         """
         event = get_object_or_404(Event, pk=pk)
-        extra_fields = event.registrationinformationfield_set.all()
-        registrations = event.eventregistration_set.all()
+        extra_fields = list(event.registrationinformationfield_set.all())
+        registrations = (
+            event.eventregistration_set.with_queue_position()
+            .with_late_cancellation()
+            .select_related("member", "member__profile", "payment")
+            .order_by("-late_cancellation", "-date")
+        )
 
         header_fields = (
             [
@@ -216,11 +238,10 @@ class EventRegistrationsExport(View, PermissionRequiredMixin):
             + [field.name for field in extra_fields]
             + [_("Date"), _("Date cancelled")]
         )
-
-        rows = []
         if event.price == 0:
             header_fields.remove(_("Paid"))
-        for registration in registrations:
+
+        def _row(registration, values):
             if registration.member:
                 name = registration.member.get_full_name()
             else:
@@ -228,8 +249,7 @@ class EventRegistrationsExport(View, PermissionRequiredMixin):
             status = pgettext_lazy("registration status", "registered").capitalize()
             cancelled = None
             if registration.date_cancelled:
-
-                if registration.is_late_cancellation():
+                if registration.late_cancellation:
                     status = pgettext_lazy(
                         "registration status", "late cancellation"
                     ).capitalize()
@@ -241,53 +261,38 @@ class EventRegistrationsExport(View, PermissionRequiredMixin):
 
             elif registration.queue_position:
                 status = pgettext_lazy("registration status", "waiting")
-            data = {
-                _("Name"): name,
-                _("Date"): timezone.localtime(registration.date),
-                _("Present"): _("Yes") if registration.present else "",
-                _("Phone number"): (
-                    registration.member.profile.phone_number
-                    if registration.member
-                    else ""
-                ),
-                _("Email"): (registration.member.email if registration.member else ""),
-                _("Status"): status,
-                _("Date cancelled"): cancelled,
-            }
+
+            row = [
+                name,
+                registration.member.email if registration.member else "",
+            ]
             if event.price > 0:
                 if registration.is_paid():
-                    data[_("Paid")] = registration.payment.get_type_display()
+                    row.append(registration.payment.get_type_display())
                 else:
-                    data[_("Paid")] = _("No")
-
-            data.update(
-                {
-                    field["field"].name: field["value"]
-                    for field in registration.information_fields
-                }
-            )
-            rows.append(data)
-
-        response = HttpResponse(content_type="text/csv")
-        writer = csv.DictWriter(response, header_fields)
-        writer.writeheader()
-
-        rows = sorted(
-            rows,
-            key=lambda row: (
-                row[_("Status")]
-                == pgettext_lazy(
-                    "registration status", "late cancellation"
-                ).capitalize(),
-                row[_("Date")],
-            ),
-            reverse=True,
-        )
-
-        for row in rows:
-            writer.writerow(row)
-
-        response["Content-Disposition"] = 'attachment; filename="{}.csv"'.format(
-            slugify(event.title)
+                    row.append(_("No"))
+            row += [
+                _("Yes") if registration.present else "",
+                status,
+                registration.member.profile.phone_number if registration.member else "",
+            ]
+            row += [values.get(field.pk) for field in extra_fields]
+            row += [timezone.localtime(registration.date), cancelled]
+            return row
+
+        def _rows():
+            # The information fields are loaded for a batch of registrations
+            # at a time, so the registrations do not need to fit in memory
+            for batch in batched(registrations.iterator(chunk_size=500), 500):
+                values = RegistrationInformationField.get_values_for_registrations(
+                    batch
+                )
+                for registration in batch:
+                    yield _row(registration, values[registration.pk])
+
+        return export_response(
+            slugify(event.title),
+            header_fields,
+            _rows(),
+            request.GET.get("format", "csv"),
         )
-        return response
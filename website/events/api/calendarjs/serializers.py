@@ -6,23 +6,29 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework.reverse import reverse
 
-from events import services
+from events.api.serializers import EventStateListSerializer, EventStateMixin
 from events.models import Event
 from thaliawebsite.api.calendarjs.serializers import CalenderJSSerializer
 
 
-class EventsCalenderJSSerializer(CalenderJSSerializer):
+class EventsCalenderJSSerializer(EventStateMixin, CalenderJSSerializer):
     class Meta(CalenderJSSerializer.Meta):
         model = Event
+        list_serializer_class = EventStateListSerializer
 
     def _url(self, instance):
         return reverse("events:event", kwargs={"pk": instance.id})
 
+    def _registration(self, instance):
+        registration = self._event_state(instance)["registration"]
+        if registration is not None and registration.is_registered:
+            return registration
+        return None
+
     def _class_names(self, instance):
-        if self.context["member"] and services.is_user_registered(
-            self.context["member"], instance
-        ):
-            if services.user_registration_pending(self.context["member"], instance):
+        registration = self._registration(instance)
+        if registration is not None:
+            if instance.registration_required and registration.queue_position:
                 return ["regular-event-pending-registration"]
             else:
                 return ["regular-event-has-registration"]
@@ -33,15 +39,11 @@ class EventsCalenderJSSerializer(CalenderJSSerializer):
             return ["regular-event-registration-closed"]
 
     def _registration_info(self, instance: Event):
-        if self.context["member"] and services.is_user_registered(
-            self.context["member"], instance
-        ):
-            queue_pos = services.user_registration_pending(
-                self.context["member"], instance
-            )
-            if isinstance(queue_pos, int):
+        registration = self._registration(instance)
+        if registration is not None:
+            if instance.registration_required and registration.queue_position:
                 return _("In waiting list at position {queue_pos}").format(
-                    queue_pos=queue_pos
+                    queue_pos=registration.queue_position
                 )
             else:
                 return _("You are registered for this event")
@@ -0,0 +1,35 @@
+from django.db import models
+from rest_framework import serializers
+
+from events import services
+
+
+class EventStateListSerializer(serializers.ListSerializer):
+    """List serializer that resolves the user state of all events at once.
+
+    See :func:`events.services.event_states`.
+    """
+
+    def to_representation(self, data):
+        events = list(data.all() if isinstance(data, models.Manager) else data)
+        self.context.setdefault("event_states", {}).update(
+            services.event_states(self.context["request"].member, events)
+        )
+        return super().to_representation(events)
+
+
+class EventStateMixin:
+    """Serializer mixin that gives access to the user state of an event.
+
+    The states are shared through the serializer context, so a list of
+    events is resolved in one go when ``EventStateListSerializer`` is set
+    as the ``list_serializer_class``.
+    """
+
+    def _event_state(self, instance):
+        states = self.context.setdefault("event_states", {})
+        if instance.pk not in states:
+            states.update(
+                services.event_states(self.context["request"].member, [instance])
+            )
+        return states[instance.pk]
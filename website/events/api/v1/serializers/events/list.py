@@ -4,15 +4,16 @@ from django.utils.html import strip_tags
 from rest_framework import serializers
 
 from announcements.api.v1.serializers import SlideSerializer
-from events import services
+from events.api.serializers import EventStateListSerializer, EventStateMixin
 from events.models import Event
 
 
-class EventListSerializer(serializers.ModelSerializer):
+class EventListSerializer(EventStateMixin, serializers.ModelSerializer):
     """Custom list serializer for events."""
 
     class Meta:
         model = Event
+        list_serializer_class = EventStateListSerializer
         fields = (
             "pk",
             "title",
@@ -38,24 +39,17 @@ class EventListSerializer(serializers.ModelSerializer):
         return unescape(strip_tags(instance.description))
 
     def _registered(self, instance):
-        try:
-            registered = services.is_user_registered(
-                self.context["request"].user, instance,
-            )
-            if registered is None:
-                return False
-            return registered
-        except AttributeError:
-            return False
+        registration = self._event_state(instance)["registration"]
+        return registration is not None and registration.is_registered
 
     def _pizza(self, instance):
         return instance.has_food_event
 
     def _present(self, instance):
-        try:
-            present = services.is_user_present(self.context["request"].user, instance,)
-            if present is None:
-                return False
-            return present
-        except AttributeError:
-            return False
+        registration = self._event_state(instance)["registration"]
+        return (
+            instance.registration_required
+            and registration is not None
+            and registration.is_registered
+            and registration.present
+        )
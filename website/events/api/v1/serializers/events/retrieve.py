@@ -2,16 +2,16 @@ from django.utils.html import strip_spaces_between_tags
 from rest_framework import serializers
 
 from announcements.api.v1.serializers import SlideSerializer
-from events import services
+from events.api.serializers import EventStateMixin
 from events.api.v1.serializers.event_registrations.list import (
     EventRegistrationAdminListSerializer,
 )
-from events.models import Event, EventRegistration
+from events.models import Event
 from thaliawebsite.templatetags.bleach_tags import bleach
 from utils.snippets import create_google_maps_url
 
 
-class EventRetrieveSerializer(serializers.ModelSerializer):
+class EventRetrieveSerializer(EventStateMixin, serializers.ModelSerializer):
     """Serializer for events."""
 
     class Meta:
@@ -58,25 +58,15 @@ class EventRetrieveSerializer(serializers.ModelSerializer):
         return strip_spaces_between_tags(bleach(instance.description))
 
     def _num_participants(self, instance):
-        if (
-            instance.max_participants
-            and instance.participants.count() > instance.max_participants
-        ):
-            return instance.max_participants
-        return instance.participants.count()
+        return self._event_state(instance)["num_participants"]
 
     def _user_registration(self, instance):
-        try:
-            if self.context["request"].member:
-                reg = instance.eventregistration_set.get(
-                    member=self.context["request"].member
-                )
-                return EventRegistrationAdminListSerializer(
-                    reg, context=self.context
-                ).data
-        except EventRegistration.DoesNotExist:
-            pass
-        return None
+        registration = self._event_state(instance)["registration"]
+        if registration is None:
+            return None
+        return EventRegistrationAdminListSerializer(
+            registration, context=self.context
+        ).data
 
     def _registration_allowed(self, instance):
         member = self.context["request"].member
@@ -87,7 +77,7 @@ class EventRetrieveSerializer(serializers.ModelSerializer):
         )
 
     def _has_fields(self, instance):
-        return instance.has_fields
+        return self._event_state(instance)["has_fields"]
 
     def _is_pizza_event(self, instance):
         return instance.has_food_event
@@ -96,5 +86,4 @@ class EventRetrieveSerializer(serializers.ModelSerializer):
         return create_google_maps_url(instance.map_location, zoom=13, size="450x250")
 
     def _is_admin(self, instance):
-        member = self.context["request"].member
-        return services.is_organiser(member, instance)
+        return self._event_state(instance)["permissions"]["manage_event"]
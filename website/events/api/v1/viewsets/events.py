@@ -86,17 +86,17 @@ class EventViewset(viewsets.ReadOnlyModelViewSet):
         # the permissions to do so
         context = {"request": request}
         if services.is_organiser(self.request.member, event):
-            queryset = EventRegistration.objects.filter(event=pk)
+            queryset = EventRegistration.objects.with_queue_position().filter(event=pk)
             if status == "queued":
-                queryset = EventRegistration.objects.filter(
+                queryset = EventRegistration.objects.with_queue_position().filter(
                     event=pk, date_cancelled=None
                 )[event.max_participants :]
             elif status == "cancelled":
-                queryset = EventRegistration.objects.filter(
+                queryset = EventRegistration.objects.with_queue_position().filter(
                     event=pk, date_cancelled__not=None
                 )
             elif status == "registered":
-                queryset = EventRegistration.objects.filter(
+                queryset = EventRegistration.objects.with_queue_position().filter(
                     event=pk, date_cancelled=None
                 )[: event.max_participants]
 
@@ -105,9 +105,9 @@ class EventViewset(viewsets.ReadOnlyModelViewSet):
             )
         else:
             serializer = EventRegistrationListSerializer(
-                EventRegistration.objects.filter(event=pk, date_cancelled=None)[
-                    : event.max_participants
-                ],
+                EventRegistration.objects.with_queue_position().filter(
+                    event=pk, date_cancelled=None
+                )[: event.max_participants],
                 many=True,
                 context=context,
             )
@@ -85,8 +85,10 @@ class EventRegistrationAdminListView(AdminListAPIView, AdminCreateAPIView):
     def get_queryset(self):
         event = get_object_or_404(Event, pk=self.kwargs.get("pk"))
         if event:
-            return EventRegistration.objects.filter(event_id=event).prefetch_related(
-                "member", "member__profile"
+            return (
+                EventRegistration.objects.with_queue_position()
+                .filter(event_id=event)
+                .prefetch_related("member", "member__profile")
             )
         return EventRegistration.objects.none()
 
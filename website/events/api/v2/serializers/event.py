@@ -3,18 +3,19 @@ from rest_framework import serializers
 from activemembers.api.v2.serializers.member_group import MemberGroupSerializer
 from announcements.api.v2.serializers import SlideSerializer
 from documents.api.v2.serializers.document import DocumentSerializer
-from events import services
+from events.api.serializers import EventStateListSerializer, EventStateMixin
 from events.api.v2.serializers.event_registration import EventRegistrationSerializer
-from events.models import Event, EventRegistration
+from events.models import Event
 from thaliawebsite.api.v2.serializers import CleanedHTMLSerializer
 from utils.snippets import create_google_maps_url
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(EventStateMixin, serializers.ModelSerializer):
     """Serializer for events."""
 
     class Meta:
         model = Event
+        list_serializer_class = EventStateListSerializer
         fields = (
             "pk",
             "title",
@@ -47,6 +48,7 @@ class EventSerializer(serializers.ModelSerializer):
     organiser = MemberGroupSerializer()
     user_registration = serializers.SerializerMethodField("_user_registration")
     num_participants = serializers.SerializerMethodField("_num_participants")
+    has_fields = serializers.SerializerMethodField("_has_fields")
     maps_url = serializers.SerializerMethodField("_maps_url")
     price = serializers.DecimalField(max_digits=5, decimal_places=2)
     fine = serializers.DecimalField(max_digits=5, decimal_places=2)
@@ -55,39 +57,31 @@ class EventSerializer(serializers.ModelSerializer):
     user_permissions = serializers.SerializerMethodField("_user_permissions")
 
     def _user_registration(self, instance):
-        try:
-            if self.context["request"].member:
-                reg = instance.eventregistration_set.get(
-                    member=self.context["request"].member
-                )
-                return EventRegistrationSerializer(
-                    reg,
-                    context=self.context,
-                    fields=(
-                        "pk",
-                        "present",
-                        "queue_position",
-                        "is_cancelled",
-                        "is_late_cancellation",
-                        "date",
-                        "payment",
-                    ),
-                ).data
-        except EventRegistration.DoesNotExist:
-            pass
-        return None
+        registration = self._event_state(instance)["registration"]
+        if registration is None:
+            return None
+        return EventRegistrationSerializer(
+            registration,
+            context=self.context,
+            fields=(
+                "pk",
+                "present",
+                "queue_position",
+                "is_cancelled",
+                "is_late_cancellation",
+                "date",
+                "payment",
+            ),
+        ).data
 
     def _num_participants(self, instance):
-        if (
-            instance.max_participants
-            and instance.participants.count() > instance.max_participants
-        ):
-            return instance.max_participants
-        return instance.participants.count()
+        return self._event_state(instance)["num_participants"]
+
+    def _has_fields(self, instance):
+        return self._event_state(instance)["has_fields"]
 
     def _user_permissions(self, instance):
-        member = self.context["request"].member
-        return services.event_permissions(member, instance)
+        return self._event_state(instance)["permissions"]
 
     def _maps_url(self, instance):
         return create_google_maps_url(instance.map_location, zoom=13, size="450x250")
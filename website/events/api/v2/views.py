@@ -26,7 +26,11 @@ class EventListView(ListAPIView):
     """Returns an overview of all upcoming events."""
 
     serializer_class = EventSerializer
-    queryset = Event.objects.filter(published=True)
+    queryset = (
+        Event.objects.filter(published=True)
+        .select_related("organiser", "slide")
+        .prefetch_related("documents")
+    )
     filter_backends = (
         framework_filters.OrderingFilter,
         framework_filters.SearchFilter,
@@ -44,7 +48,11 @@ class EventDetailView(RetrieveAPIView):
     """Returns details of an event."""
 
     serializer_class = EventSerializer
-    queryset = Event.objects.filter(published=True)
+    queryset = (
+        Event.objects.filter(published=True)
+        .select_related("organiser", "slide")
+        .prefetch_related("documents")
+    )
     permission_classes = [IsAuthenticatedOrTokenHasScope]
     required_scopes = ["events:read"]
 
@@ -76,7 +84,7 @@ class EventRegistrationsView(ListAPIView):
 
     def get_queryset(self):
         if self.event:
-            return EventRegistration.objects.filter(
+            return EventRegistration.objects.with_queue_position().filter(
                 event=self.event, date_cancelled=None
             )[: self.event.max_participants]
         return EventRegistration.objects.none()
@@ -10,7 +10,6 @@ from django.utils.translation import gettext_lazy as _
 from tinymce.models import HTMLField
 
 from announcements.models import Slide
-from members.models import Member
 from pushnotifications.models import ScheduledMessage, Category
 
 
@@ -421,6 +420,15 @@ class Event(models.Model):
     def get_absolute_url(self):
         return reverse("events:event", args=[str(self.pk)])
 
+    def _set_start_reminder_audience(self, start_reminder):
+        """Send the start reminder to the registrations or all members."""
+        if self.registration_required:
+            start_reminder.audience = ScheduledMessage.EVENT_REGISTRATIONS
+            start_reminder.audience_event = self
+        else:
+            start_reminder.audience = ScheduledMessage.CURRENT_MEMBERS
+            start_reminder.audience_event = None
+
     def save(self, **kwargs):
         delete_collector = Collector(
             using=router.db_for_write(self.__class__, instance=self)
@@ -454,10 +462,10 @@ class Event(models.Model):
                         f"{settings.BASE_URL}"
                         f'{reverse("events:event", args=[self.id])}'
                     )
+                    registration_reminder.audience = ScheduledMessage.CURRENT_MEMBERS
 
                     registration_reminder.save()
                     self.registration_reminder = registration_reminder
-                    self.registration_reminder.users.set(Member.current_members.all())
                 elif registration_reminder.pk is not None:
                     delete_collector.collect([self.registration_reminder])
                     self.registration_reminder = None
@@ -472,14 +480,9 @@ class Event(models.Model):
                 start_reminder.body = f"'{self.title}' starts in 1 hour"
                 start_reminder.category = Category.objects.get(key=Category.EVENT)
                 start_reminder.time = start_reminder_time
+                self._set_start_reminder_audience(start_reminder)
                 start_reminder.save()
                 self.start_reminder = start_reminder
-                if self.registration_required:
-                    self.start_reminder.users.set(
-                        [r.member for r in self.participants if r.member]
-                    )
-                else:
-                    self.start_reminder.users.set(Member.current_members.all())
             elif start_reminder.pk is not None:
                 delete_collector.collect([self.start_reminder])
                 self.start_reminder = None
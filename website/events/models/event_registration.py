@@ -1,6 +1,18 @@
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Q
+from django.db.models import (
+    BooleanField,
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -14,9 +26,106 @@ def registration_member_choices_limit():
     )
 
 
+def _registrations_ahead_filter(event, date, pk):
+    """Filter for active registrations of an event placed before the given one.
+
+    Registrations are ordered by date, ties are broken by their primary key.
+    """
+    return Q(event=event, date_cancelled=None) & (
+        Q(date__lt=date) | Q(date=date, pk__lt=pk)
+    )
+
+
+class EventRegistrationQuerySet(models.QuerySet):
+    def with_queue_position(self):
+        """Annotate the position on the waiting list of every registration.
+
+        The position is computed in the database from the number of active
+        registrations ahead of each registration, which keeps it correct
+        when the queryset is filtered further and lets lists and exports
+        get every position in a single query. It is ``None`` for
+        registrations that are cancelled or not on the waiting list.
+
+        :return: the annotated queryset
+        """
+        ahead = (
+            EventRegistration.objects.filter(
+                _registrations_ahead_filter(
+                    OuterRef("event"), OuterRef("date"), OuterRef("pk")
+                )
+            )
+            .order_by()
+            .values("event")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.annotate(
+            registration_position=Coalesce(
+                Subquery(ahead, output_field=IntegerField()), 0
+            )
+            + 1
+        ).annotate(
+            queue_position=Case(
+                When(
+                    date_cancelled=None,
+                    event__max_participants__isnull=False,
+                    registration_position__gt=F("event__max_participants"),
+                    then=F("registration_position") - F("event__max_participants"),
+                ),
+                default=None,
+                output_field=IntegerField(),
+            )
+        )
+
+    def with_late_cancellation(self):
+        """Annotate whether every registration was cancelled too late.
+
+        This is the check of ``EventRegistration.is_late_cancellation``
+        computed in the database, so exports can sort on it.
+
+        :return: the annotated queryset
+        """
+        not_cancelled_before = (
+            EventRegistration.objects.filter(
+                Q(date_cancelled__gte=OuterRef("date_cancelled"))
+                | Q(date_cancelled=None),
+                event=OuterRef("event"),
+                date__lte=OuterRef("date"),
+            )
+            .order_by()
+            .values("event")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.annotate(
+            not_cancelled_before=Coalesce(
+                Subquery(not_cancelled_before, output_field=IntegerField()), 0
+            )
+        ).annotate(
+            late_cancellation=Case(
+                When(
+                    Q(
+                        date_cancelled__isnull=False,
+                        event__cancel_deadline__isnull=False,
+                        date_cancelled__gt=F("event__cancel_deadline"),
+                    )
+                    & (
+                        Q(event__max_participants=None)
+                        | Q(not_cancelled_before__lt=F("event__max_participants"))
+                    ),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+
+
 class EventRegistration(models.Model):
     """Describes a registration for an Event."""
 
+    objects = EventRegistrationQuerySet.as_manager()
+
     event = models.ForeignKey(Event, models.CASCADE)
 
     member = models.ForeignKey(
@@ -50,10 +159,16 @@ class EventRegistration(models.Model):
 
     @property
     def information_fields(self):
+        if hasattr(self, "_information_fields"):
+            return self._information_fields
         fields = self.event.registrationinformationfield_set.all()
-        return [
-            {"field": field, "value": field.get_value_for(self)} for field in fields
-        ]
+        values = fields.model.get_values_for_registrations([self])[self.pk]
+        return [{"field": field, "value": values.get(field.pk)} for field in fields]
+
+    @information_fields.setter
+    def information_fields(self, value):
+        # Set by ``services.load_information_fields``
+        self._information_fields = value
 
     @property
     def is_registered(self):
@@ -61,12 +176,24 @@ class EventRegistration(models.Model):
 
     @property
     def queue_position(self):
-        if self.event.max_participants is not None:
-            try:
-                return list(self.event.queue).index(self) + 1
-            except ValueError:
-                pass
-        return None
+        if hasattr(self, "_queue_position"):
+            return self._queue_position
+        if (
+            self.pk is None
+            or self.date_cancelled is not None
+            or self.event.max_participants is None
+        ):
+            return None
+        ahead = EventRegistration.objects.filter(
+            _registrations_ahead_filter(self.event_id, self.date, self.pk)
+        ).count()
+        position = ahead + 1 - self.event.max_participants
+        return position if position > 0 else None
+
+    @queue_position.setter
+    def queue_position(self, value):
+        # Set by ``EventRegistrationQuerySet.with_queue_position``
+        self._queue_position = value
 
     @property
     def is_invited(self):
@@ -118,18 +245,6 @@ class EventRegistration(models.Model):
                 }
             )
 
-    def save(self, **kwargs):
-        super().save(**kwargs)
-
-        if self.event.start_reminder and self.date_cancelled:
-            self.event.start_reminder.users.remove(self.member)
-        elif (
-            self.event.start_reminder
-            and self.member is not None
-            and not self.event.start_reminder.users.filter(pk=self.member.pk).exists()
-        ):
-            self.event.start_reminder.users.add(self.member)
-
     def __str__(self):
         if self.member:
             return "{}: {}".format(self.member.get_full_name(), self.event)
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from . import Event, EventRegistration
@@ -66,6 +67,75 @@ class RegistrationInformationField(models.Model):
         field_value.value = value
         field_value.save()
 
+    @classmethod
+    def value_models(cls):
+        """Return the models that store the values of each field type."""
+        return {
+            cls.BOOLEAN_FIELD: BooleanRegistrationInformation,
+            cls.TEXT_FIELD: TextRegistrationInformation,
+            cls.INTEGER_FIELD: IntegerRegistrationInformation,
+        }
+
+    @classmethod
+    def get_values_for_registrations(cls, registrations):
+        """Load the values of all information fields of registrations in bulk.
+
+        This uses one query per value table, regardless of the number of
+        registrations and fields.
+
+        :param registrations: the registrations
+        :return: a dictionary mapping registration pks to a dictionary
+                 mapping field pks to their value
+        """
+        registration_ids = [registration.pk for registration in registrations]
+        values = {registration_id: {} for registration_id in registration_ids}
+        for value_model in cls.value_models().values():
+            for registration_id, field_id, value in value_model.objects.filter(
+                registration__in=registration_ids
+            ).values_list("registration", "field", "value"):
+                values[registration_id][field_id] = value
+        return values
+
+    @classmethod
+    def set_values_for_registration(cls, registration, field_values):
+        """Store the values of multiple information fields of a registration.
+
+        Existing values are updated and missing values are created in bulk,
+        in one transaction.
+
+        :param registration: the registration
+        :param field_values: a dictionary mapping fields to their new value
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            for field_type, value_model in cls.value_models().items():
+                values = {
+                    field.pk: value
+                    for field, value in field_values.items()
+                    if field.type == field_type
+                }
+                if not values:
+                    continue
+
+                existing = list(
+                    value_model.objects.select_for_update().filter(
+                        registration=registration, field__in=values.keys()
+                    )
+                )
+                for field_value in existing:
+                    field_value.value = values[field_value.field_id]
+                    field_value.changed = now
+                value_model.objects.bulk_update(existing, ["value", "changed"])
+
+                existing_field_ids = {field_value.field_id for field_value in existing}
+                value_model.objects.bulk_create(
+                    value_model(
+                        registration=registration, field_id=field_id, value=value
+                    )
+                    for field_id, value in values.items()
+                    if field_id not in existing_field_ids
+                )
+
     def __str__(self):
         return "{} ({})".format(self.name, dict(self.FIELD_TYPES)[self.type])
 
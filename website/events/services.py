@@ -1,8 +1,9 @@
 from collections import OrderedDict
 
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.utils import timezone
 from django.utils.datetime_safe import date
+from django.utils.functional import SimpleLazyObject
 from django.utils.translation import gettext_lazy as _
 
 from events import emails
@@ -86,35 +87,140 @@ def event_permissions(member, event, name=None):
     except EventRegistration.DoesNotExist:
         pass
 
-    perms["create_registration"] = (
-        (registration is None or registration.date_cancelled is not None)
-        and (
-            event.registration_allowed
-            or (event.optional_registration_allowed and not event.registration_required)
+    perms.update(
+        _registration_permissions(
+            event,
+            registration,
+            name,
+            SimpleLazyObject(lambda: event.has_fields),
+            name or SimpleLazyObject(lambda: member.can_attend_events),
         )
-        and (name or member.can_attend_events)
     )
-    perms["cancel_registration"] = (
-        registration is not None
-        and registration.date_cancelled is None
-        and (
-            event.cancellation_allowed
-            or name
-            or (event.optional_registration_allowed and not event.registration_required)
-        )
-        and registration.payment is None
+    return perms
+
+
+def _registration_permissions(event, registration, name, has_fields, can_attend_events):
+    """Return the registration permissions for a (possibly missing) registration.
+
+    :param event: the event
+    :param registration: the registration, or None
+    :param name: the name of a non member registration
+    :param has_fields: whether the event has registration information fields
+    :param can_attend_events: whether the registration may attend events
+    :return: the registration part of the permission dictionary
+    """
+    registration_allowed = event.registration_allowed or (
+        event.optional_registration_allowed and not event.registration_required
     )
-    perms["update_registration"] = (
-        registration is not None
-        and registration.date_cancelled is None
-        and event.has_fields
-        and (
-            event.registration_allowed
-            or (event.optional_registration_allowed and not event.registration_required)
-        )
-        and (name or member.can_attend_events)
+    return {
+        "create_registration": bool(
+            (registration is None or registration.date_cancelled is not None)
+            and registration_allowed
+            and can_attend_events
+        ),
+        "cancel_registration": bool(
+            registration is not None
+            and registration.date_cancelled is None
+            and (
+                event.cancellation_allowed
+                or name
+                or (
+                    event.optional_registration_allowed
+                    and not event.registration_required
+                )
+            )
+            and registration.payment is None
+        ),
+        "update_registration": bool(
+            registration is not None
+            and registration.date_cancelled is None
+            and has_fields
+            and registration_allowed
+            and can_attend_events
+        ),
+    }
+
+
+def event_states(member, events):
+    """Resolve the state of a list of events for a user with a fixed number of queries.
+
+    This computes the registration of the user, their permissions, the
+    number of participants and whether the event has registration
+    information fields for all events at once, instead of running a few
+    queries per event.
+
+    :param member: the user
+    :param events: the events
+    :return: a dictionary mapping event pks to a dictionary with the keys
+             ``registration``, ``permissions``, ``num_participants`` and
+             ``has_fields``
+    """
+    events = list(events)
+    event_ids = [event.pk for event in events]
+
+    participant_counts = dict(
+        EventRegistration.objects.filter(event__in=event_ids, date_cancelled=None)
+        .order_by()
+        .values("event")
+        .annotate(count=Count("pk"))
+        .values_list("event", "count")
     )
-    return perms
+    events_with_fields = set(
+        RegistrationInformationField.objects.filter(event__in=event_ids)
+        .order_by()
+        .values_list("event", flat=True)
+    )
+
+    registrations = {}
+    organiser_ids = set()
+    overrides_organiser = False
+    authenticated = bool(member) and member.is_authenticated
+    if authenticated:
+        registrations = {
+            registration.event_id: registration
+            for registration in EventRegistration.objects.with_queue_position()
+            .filter(event__in=event_ids, member=member)
+            .select_related("payment")
+        }
+        overrides_organiser = member.is_superuser or member.has_perm(
+            "events.override_organiser"
+        )
+        if not overrides_organiser:
+            organiser_ids = set(member.get_member_groups().values_list("pk", flat=True))
+    can_attend_events = SimpleLazyObject(lambda: member.can_attend_events)
+
+    states = {}
+    for event in events:
+        registration = registrations.get(event.pk)
+        if registration is not None:
+            registration.event = event
+        has_fields = event.pk in events_with_fields
+
+        num_participants = participant_counts.get(event.pk, 0)
+        if event.max_participants and num_participants > event.max_participants:
+            num_participants = event.max_participants
+
+        permissions = {
+            "create_registration": False,
+            "cancel_registration": False,
+            "update_registration": False,
+            "manage_event": authenticated
+            and (overrides_organiser or event.organiser_id in organiser_ids),
+        }
+        if authenticated:
+            permissions.update(
+                _registration_permissions(
+                    event, registration, None, has_fields, can_attend_events
+                )
+            )
+
+        states[event.pk] = {
+            "registration": registration,
+            "permissions": permissions,
+            "num_participants": num_participants,
+            "has_fields": has_fields,
+        }
+    return states
 
 
 def is_organiser(member, event):
@@ -228,10 +334,22 @@ def update_registration(
     if not (permissions["update_registration"] or permissions["manage_event"]):
         raise RegistrationError(_("You are not allowed to update this registration."))
 
+    field_values = [
+        (int(field_id.replace("info_field_", "")), field_value)
+        for field_id, field_value in field_values
+    ]
+    fields = RegistrationInformationField.objects.in_bulk(
+        [field_id for field_id, _field_value in field_values]
+    )
+
+    values = {}
     for field_id, field_value in field_values:
-        field = RegistrationInformationField.objects.get(
-            id=field_id.replace("info_field_", "")
-        )
+        try:
+            field = fields[field_id]
+        except KeyError as error:
+            raise RegistrationInformationField.DoesNotExist(
+                "RegistrationInformationField matching query does not exist."
+            ) from error
 
         if (
             field.type == RegistrationInformationField.INTEGER_FIELD
@@ -249,7 +367,31 @@ def update_registration(
         ):
             field_value = ""
 
-        field.set_value_for(registration, field_value)
+        values[field] = field_value
+
+    RegistrationInformationField.set_values_for_registration(registration, values)
+
+
+def load_information_fields(event, registrations):
+    """Load the information fields of registrations of an event in bulk.
+
+    This sets ``information_fields`` on every registration using one query
+    for the fields and one per value table, instead of a query per field
+    per registration.
+
+    :param event: the event
+    :param registrations: the registrations of the event
+    :return: the registrations as a list
+    """
+    registrations = list(registrations)
+    fields = list(event.registrationinformationfield_set.all())
+    values = RegistrationInformationField.get_values_for_registrations(registrations)
+    for registration in registrations:
+        registration.information_fields = [
+            {"field": field, "value": values[registration.pk].get(field.pk)}
+            for field in fields
+        ]
+    return registrations
 
 
 def registration_fields(request, member=None, event=None, registration=None, name=None):
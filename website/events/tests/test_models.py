@@ -5,7 +5,12 @@ from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from activemembers.models import Committee
-from events.models import Event, EventRegistration
+from events.models import (
+    Event,
+    EventRegistration,
+    RegistrationInformationField,
+    TextRegistrationInformation,
+)
 from mailinglists.models import MailingList
 from members.models import Member
 
@@ -278,6 +283,67 @@ class RegistrationTest(TestCase):
         self.assertEqual(self.r1.queue_position, None)
         self.assertEqual(self.r2.queue_position, 1)
 
+    def test_with_queue_position(self):
+        r3 = EventRegistration.objects.create(event=self.event, name="test")
+        r4 = EventRegistration.objects.create(event=self.event, name="test 2")
+        self.r2.date_cancelled = timezone.now()
+        self.r2.save()
+
+        with self.subTest("No participant limit"), self.assertNumQueries(1):
+            positions = {
+                r.pk: r.queue_position
+                for r in EventRegistration.objects.with_queue_position()
+            }
+        self.assertEqual(
+            positions, {self.r1.pk: None, self.r2.pk: None, r3.pk: None, r4.pk: None}
+        )
+
+        self.event.max_participants = 1
+        self.event.save()
+
+        with self.subTest("Waiting list"), self.assertNumQueries(1):
+            positions = {
+                r.pk: r.queue_position
+                for r in EventRegistration.objects.with_queue_position()
+            }
+        self.assertEqual(
+            positions, {self.r1.pk: None, self.r2.pk: None, r3.pk: 1, r4.pk: 2}
+        )
+
+        with self.subTest("Filtered queryset"):
+            registration = (
+                EventRegistration.objects.with_queue_position().filter(pk=r4.pk).get()
+            )
+            self.assertEqual(registration.queue_position, 2)
+            self.assertEqual(EventRegistration.objects.get(pk=r4.pk).queue_position, 2)
+
+    def test_with_late_cancellation(self):
+        r3 = EventRegistration.objects.create(event=self.event, name="test")
+        EventRegistration.objects.create(event=self.event, name="test 2")
+        self.r1.date_cancelled = timezone.now()
+        self.r1.save()
+        r3.date_cancelled = timezone.now()
+        r3.save()
+
+        for max_participants, cancel_deadline in [
+            (None, None),
+            (None, timezone.now() - datetime.timedelta(hours=1)),
+            (None, timezone.now() + datetime.timedelta(hours=1)),
+            (1, timezone.now() - datetime.timedelta(hours=1)),
+            (3, timezone.now() - datetime.timedelta(hours=1)),
+        ]:
+            self.event.max_participants = max_participants
+            self.event.cancel_deadline = cancel_deadline
+            self.event.save()
+            with self.subTest(
+                max_participants=max_participants, cancel_deadline=cancel_deadline
+            ):
+                registrations = EventRegistration.objects.with_late_cancellation()
+                self.assertEqual(
+                    {r.pk: bool(r.is_late_cancellation()) for r in registrations},
+                    {r.pk: r.late_cancellation for r in registrations},
+                )
+
     def test_registration_either_name_or_member(self):
         self.r2.delete()
         self.r1.clean()
@@ -303,3 +369,51 @@ class RegistrationTest(TestCase):
         # Test situation where the event status is REGISTRATION_OPEN_NO_CANCEL
         self.assertTrue(self.r1.event.registration_allowed)
         self.assertTrue(self.r1.would_cancel_after_deadline())
+
+    def test_information_field_values(self):
+        text_field = RegistrationInformationField.objects.create(
+            event=self.event,
+            type=RegistrationInformationField.TEXT_FIELD,
+            name="text",
+            required=False,
+        )
+        boolean_field = RegistrationInformationField.objects.create(
+            event=self.event,
+            type=RegistrationInformationField.BOOLEAN_FIELD,
+            name="boolean",
+            required=False,
+        )
+        integer_field = RegistrationInformationField.objects.create(
+            event=self.event,
+            type=RegistrationInformationField.INTEGER_FIELD,
+            name="integer",
+            required=False,
+        )
+        text_field.set_value_for(self.r1, "old")
+
+        with self.assertNumQueries(6):
+            RegistrationInformationField.set_values_for_registration(
+                self.r1, {text_field: "new", boolean_field: True}
+            )
+        RegistrationInformationField.set_values_for_registration(
+            self.r2, {integer_field: 42}
+        )
+
+        with self.assertNumQueries(3):
+            values = RegistrationInformationField.get_values_for_registrations(
+                [self.r1, self.r2]
+            )
+        self.assertEqual(
+            values,
+            {
+                self.r1.pk: {text_field.pk: "new", boolean_field.pk: True},
+                self.r2.pk: {integer_field.pk: 42},
+            },
+        )
+        self.assertEqual(
+            TextRegistrationInformation.objects.filter(registration=self.r1).count(), 1
+        )
+        self.assertEqual(
+            [field["value"] for field in self.r1.information_fields],
+            ["new", True, None],
+        )
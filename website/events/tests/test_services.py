@@ -2,8 +2,10 @@ from datetime import timedelta, datetime
 from unittest import mock
 
 from django.contrib.auth.models import AnonymousUser, Permission
+from django.db import connection
 from django.http import HttpRequest
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from freezegun import freeze_time
 
@@ -161,6 +163,68 @@ class ServicesTest(TestCase):
             services.event_permissions(self.member, self.event),
         )
 
+    def test_event_states(self):
+        self.event.registration_start = timezone.now() - timedelta(hours=1)
+        self.event.registration_end = timezone.now() + timedelta(hours=1)
+        self.event.max_participants = 1
+        self.event.save()
+        other_event = Event.objects.create(
+            organiser=Committee.objects.exclude(pk=self.committee.pk).first(),
+            title="other event",
+            description="desc",
+            published=True,
+            start=(timezone.now() + timedelta(hours=1)),
+            end=(timezone.now() + timedelta(hours=2)),
+            registration_start=timezone.now() - timedelta(hours=1),
+            registration_end=timezone.now() + timedelta(hours=1),
+            location="test location",
+            map_location="test map location",
+            price=0.00,
+            fine=0.00,
+        )
+        RegistrationInformationField.objects.create(
+            event=other_event,
+            type=RegistrationInformationField.BOOLEAN_FIELD,
+            name="test",
+            required=False,
+        )
+        EventRegistration.objects.create(event=self.event, name="test")
+        registration = EventRegistration.objects.create(
+            event=self.event, member=self.member
+        )
+        MemberGroupMembership.objects.create(member=self.member, group=self.committee)
+        events = [self.event, other_event]
+
+        # Fill the shared cache of the member group permissions
+        Member.objects.get(pk=self.member.pk).get_group_permissions()
+        member = Member.objects.get(pk=self.member.pk)
+        with CaptureQueriesContext(connection) as single_event:
+            services.event_states(member, [other_event])
+        with CaptureQueriesContext(connection) as all_events:
+            states = services.event_states(self.member, events)
+        self.assertEqual(len(single_event), len(all_events))
+
+        self.assertEqual(states[self.event.pk]["registration"], registration)
+        self.assertEqual(states[self.event.pk]["registration"].queue_position, 1)
+        self.assertIsNone(states[other_event.pk]["registration"])
+        self.assertEqual(states[self.event.pk]["num_participants"], 1)
+        self.assertEqual(states[other_event.pk]["num_participants"], 0)
+        self.assertFalse(states[self.event.pk]["has_fields"])
+        self.assertTrue(states[other_event.pk]["has_fields"])
+        for event in events:
+            with self.subTest(event=event):
+                self.assertEqual(
+                    states[event.pk]["permissions"],
+                    services.event_permissions(self.member, event),
+                )
+
+        states = services.event_states(None, events)
+        self.assertIsNone(states[self.event.pk]["registration"])
+        self.assertEqual(
+            states[self.event.pk]["permissions"],
+            services.event_permissions(None, self.event),
+        )
+
     def test_is_organiser(self):
         self.assertFalse(services.is_organiser(AnonymousUser(), self.event))
 
@@ -14,7 +14,7 @@ from events import services
 from events.exceptions import RegistrationError
 from payments.models import Payment
 from .forms import FieldsForm
-from .models import Event, EventRegistration
+from .models import Event
 
 
 class EventIndex(TemplateView):
@@ -49,18 +49,15 @@ class EventDetail(DetailView):
         context["payment_method_tpay"] = Payment.TPAY
 
         event = context["event"]
+        state = services.event_states(self.request.member, [event])[event.pk]
         if event.max_participants:
-            perc = 100.0 * len(event.participants) / event.max_participants
+            perc = 100.0 * state["num_participants"] / event.max_participants
             context["registration_percentage"] = perc
 
-        try:
-            context["registration"] = EventRegistration.objects.get(
-                event=event, member=self.request.member
-            )
-        except (EventRegistration.DoesNotExist, TypeError):
-            pass
+        if state["registration"] is not None:
+            context["registration"] = state["registration"]
 
-        context["permissions"] = services.event_permissions(self.request.member, event)
+        context["permissions"] = state["permissions"]
 
         context["date_now"] = timezone.now()
 
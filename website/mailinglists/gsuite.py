@@ -1,13 +1,17 @@
 """GSuite syncing helpers defined by the mailinglists package."""
 import logging
-from time import sleep
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import monotonic, sleep
 from typing import List
 
 from django.conf import settings
+from django.db import transaction
 from django.utils.datastructures import ImmutableList
 from googleapiclient.errors import HttpError
 
-from mailinglists.models import MailingList
+from mailinglists.models import MailingList, SyncedGroup
 from mailinglists.services import get_automatic_lists
 from utils.google_api import get_directory_api, get_groups_settings_api
 
@@ -15,6 +19,13 @@ logger = logging.getLogger(__name__)
 
 
 class GSuiteSyncService:
+    # Maximum number of requests sent in a single batch request
+    batch_size = 100
+    # Statuses of requests that are retried with an exponential backoff
+    retry_statuses = (429, 500, 502, 503)
+    max_retries = 5
+    backoff = 1
+
     class GroupData:
         def __init__(
             self,
@@ -324,22 +335,7 @@ class GSuiteSyncService:
             lists = self._get_default_lists()
 
         try:
-            groups_response = (
-                self.directory_api.groups()
-                .list(domain=settings.GSUITE_DOMAIN)
-                .execute()
-            )
-            groups_list = groups_response.get("groups", [])
-            while "nextPageToken" in groups_response:
-                groups_response = (
-                    self.directory_api.groups()
-                    .list(
-                        domain=settings.GSUITE_DOMAIN,
-                        pageToken=groups_response["nextPageToken"],
-                    )
-                    .execute()
-                )
-                groups_list += groups_response.get("groups", [])
+            groups_list = self._list_groups(self.directory_api)
             existing_groups = [
                 g["name"] for g in groups_list if int(g["directMembersCount"]) > 0
             ]
@@ -363,3 +359,453 @@ class GSuiteSyncService:
 
         for ml in remove_list:
             self.delete_group(ml)
+
+    @staticmethod
+    def _list_groups(directory_api):
+        """Return all groups that exist in GSuite.
+
+        :param directory_api: the directory API to use
+        """
+        groups_response = (
+            directory_api.groups().list(domain=settings.GSUITE_DOMAIN).execute()
+        )
+        groups_list = groups_response.get("groups", [])
+        while "nextPageToken" in groups_response:
+            groups_response = (
+                directory_api.groups()
+                .list(
+                    domain=settings.GSUITE_DOMAIN,
+                    pageToken=groups_response["nextPageToken"],
+                )
+                .execute()
+            )
+            groups_list += groups_response.get("groups", [])
+        return groups_list
+
+    def sync_mailinglist_changes(self, lists: List[GroupData] = None, max_workers=4):
+        """Sync the changes to the mailing lists since the previous sync with GSuite.
+
+        The changes are computed from the state of every list as pushed by
+        the previous sync, so lists that did not change are skipped without
+        contacting GSuite. The changes of the other lists are sent in batch
+        requests, for at most ``max_workers`` lists at the same time. Lists
+        that have not been synced before, or failed to sync, are compared to
+        the members and aliases that exist in GSuite instead.
+
+        :param lists: optional parameter to determine which lists to sync
+        :param max_workers: the number of lists that are synced concurrently
+        :return: a report with the action, duration, number of HTTP requests
+                 and number of errors of every list
+        """
+        if lists is None:
+            lists = self._get_default_lists()
+
+        synced_groups = SyncedGroup.objects.in_bulk(field_name="name")
+        report = []
+        changes = []
+        for group in lists:
+            synced_group = synced_groups.pop(group.name, None)
+            old = self._synced_to_group(synced_group) if synced_group else None
+            if len(group.addresses) == 0:
+                if old is not None:
+                    changes.append((old, None))
+            elif old is not None and self._group_state(old) == self._group_state(group):
+                report.append(
+                    {
+                        "name": group.name,
+                        "action": "unchanged",
+                        "duration": 0,
+                        "calls": 0,
+                        "errors": 0,
+                    }
+                )
+            else:
+                changes.append((old, group))
+        changes += [
+            (self._synced_to_group(synced_group), None)
+            for synced_group in synced_groups.values()
+        ]
+
+        remote_groups = None
+        if any(old is None for old, _group in changes):
+            try:
+                remote_groups = {
+                    g["name"] for g in self._list_groups(self.directory_api)
+                }
+            except HttpError as e:
+                logger.error("Could not get the existing groups: %s", e.content)
+                return report
+
+        # The API clients are not thread-safe, so every worker builds its own
+        worker = threading.local()
+
+        def sync_group_changes(change):
+            if not hasattr(worker, "apis"):
+                worker.apis = (self.directory_api, self.groups_settings_api)
+            return self._sync_group_changes(*change, remote_groups, *worker.apis)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(sync_group_changes, changes))
+
+        with transaction.atomic():
+            for (old, group), result in zip(changes, results):
+                report.append(result)
+                name = old.name if group is None else group.name
+                if group is None or result["errors"] > 0:
+                    # Lists that failed are compared to GSuite in the next sync
+                    SyncedGroup.objects.filter(name=name).delete()
+                else:
+                    SyncedGroup.objects.update_or_create(
+                        name=name,
+                        defaults={
+                            "description": group.description,
+                            "moderated": group.moderated,
+                            "aliases": list(group.aliases),
+                            "addresses": group.addresses,
+                        },
+                    )
+
+        for result in report:
+            logger.info(
+                "List %s %s in %.2fs with %d requests and %d errors",
+                result["name"],
+                result["action"],
+                result["duration"],
+                result["calls"],
+                result["errors"],
+            )
+        return report
+
+    @staticmethod
+    def _group_state(group: GroupData):
+        """Return everything of a group that is synced, for comparing groups."""
+        return (
+            group.description,
+            group.moderated,
+            sorted(set(group.aliases)),
+            group.addresses,
+        )
+
+    @staticmethod
+    def _synced_to_group(synced_group: SyncedGroup):
+        """Convert the stored state of a synced group to a GSuite Group data obj."""
+        return GSuiteSyncService.GroupData(
+            moderated=synced_group.moderated,
+            name=synced_group.name,
+            description=synced_group.description,
+            aliases=synced_group.aliases,
+            addresses=synced_group.addresses,
+        )
+
+    def _sync_group_changes(
+        self, old, group, remote_groups, directory_api, groups_settings_api
+    ):
+        """Push the changes between the old and new state of a group to GSuite.
+
+        :param old: the group data as pushed by the previous sync, or None
+        :param group: the new group data, or None if the group should be archived
+        :param remote_groups: the names of the groups that exist in GSuite,
+                              only required when ``old`` is None
+        :param directory_api: the directory API to use
+        :param groups_settings_api: the groups settings API to use
+        :return: the report of this group
+        """
+        start = monotonic()
+        stats = {"calls": 0, "errors": 0}
+        try:
+            if group is None:
+                action = "archived"
+                self._execute(
+                    groups_settings_api.groups().patch(
+                        groupUniqueId=f"{old.name}@{settings.GSUITE_DOMAIN}",
+                        body={
+                            "archiveOnly": "true",
+                            "whoCanPostMessage": "NONE_CAN_POST",
+                        },
+                    ),
+                    stats,
+                )
+                self._update_group_members_batch(
+                    directory_api, old.name, old.addresses, [], stats
+                )
+                self._update_group_aliases_batch(
+                    directory_api, old.name, old.aliases, [], stats
+                )
+            else:
+                group_key = f"{group.name}@{settings.GSUITE_DOMAIN}"
+                old_addresses, old_aliases = [], []
+                managers = []
+                if old is None and group.name not in remote_groups:
+                    action = "created"
+                    self._execute(
+                        directory_api.groups().insert(
+                            body={
+                                "email": group_key,
+                                "name": group.name,
+                                "description": group.description,
+                            },
+                        ),
+                        stats,
+                    )
+                elif old is None:
+                    action = "updated"
+                    members = self._list_group_members(directory_api, group, stats)
+                    old_addresses = [
+                        m["email"] for m in members if m["role"] == "MEMBER"
+                    ]
+                    managers = [m["email"] for m in members if m["role"] == "MANAGER"]
+                    old_aliases = [
+                        a["alias"].split("@")[0]
+                        for a in self._execute(
+                            directory_api.groups().aliases().list(groupKey=group_key),
+                            stats,
+                        ).get("aliases", [])
+                    ]
+                else:
+                    action = "updated"
+                    old_addresses, old_aliases = old.addresses, old.aliases
+
+                if (
+                    old is None
+                    or old.description != group.description
+                    or old.moderated != group.moderated
+                ):
+                    if action == "updated":
+                        self._execute(
+                            directory_api.groups().update(
+                                groupKey=group_key,
+                                body={
+                                    "email": group_key,
+                                    "name": group.name,
+                                    "description": group.description,
+                                },
+                            ),
+                            stats,
+                        )
+                    # New groups might not be available immediately
+                    self._execute(
+                        groups_settings_api.groups().update(
+                            groupUniqueId=group_key,
+                            body=self._group_settings(group.moderated),
+                        ),
+                        stats,
+                        retry_statuses=self.retry_statuses + (404,),
+                    )
+
+                self._update_group_members_batch(
+                    directory_api,
+                    group.name,
+                    old_addresses,
+                    [x for x in group.addresses if x not in managers],
+                    stats,
+                    created=action == "created",
+                )
+                self._update_group_aliases_batch(
+                    directory_api,
+                    group.name,
+                    old_aliases,
+                    group.aliases,
+                    stats,
+                    created=action == "created",
+                )
+        except HttpError as e:
+            action = "failed"
+            stats["errors"] += 1
+            logger.error(
+                "Could not sync list %s: %s",
+                group.name if group else old.name,
+                e.content,
+            )
+
+        return {
+            "name": group.name if group else old.name,
+            "action": action,
+            "duration": monotonic() - start,
+            **stats,
+        }
+
+    def _list_group_members(self, directory_api, group, stats):
+        """Return all members of a group that exist in GSuite."""
+        members_response = self._execute(
+            directory_api.members().list(
+                groupKey=f"{group.name}@{settings.GSUITE_DOMAIN}"
+            ),
+            stats,
+        )
+        members_list = members_response.get("members", [])
+        while "nextPageToken" in members_response:
+            members_response = self._execute(
+                directory_api.members().list(
+                    groupKey=f"{group.name}@{settings.GSUITE_DOMAIN}",
+                    pageToken=members_response["nextPageToken"],
+                ),
+                stats,
+            )
+            members_list += members_response.get("members", [])
+        return members_list
+
+    def _update_group_members_batch(
+        self, directory_api, name, old_addresses, new_addresses, stats, created=False
+    ):
+        """Update the members of a group based on the old and new addresses.
+
+        Members that were already removed or added are not counted as errors.
+        """
+        group_key = f"{name}@{settings.GSUITE_DOMAIN}"
+        self._execute_batch(
+            directory_api,
+            {
+                f"delete-{address}": lambda address=address: (
+                    directory_api.members().delete(
+                        groupKey=group_key, memberKey=address
+                    )
+                )
+                for address in set(old_addresses) - set(new_addresses)
+            },
+            stats,
+            ignore_statuses=(404,),
+        )
+        self._execute_batch(
+            directory_api,
+            {
+                f"insert-{address}": lambda address=address: (
+                    directory_api.members().insert(
+                        groupKey=group_key, body={"email": address, "role": "MEMBER"}
+                    )
+                )
+                for address in set(new_addresses) - set(old_addresses)
+            },
+            stats,
+            ignore_statuses=(409,),
+            # New groups might not be available immediately
+            retry_statuses=self.retry_statuses + ((404,) if created else ()),
+        )
+
+    def _update_group_aliases_batch(
+        self, directory_api, name, old_aliases, new_aliases, stats, created=False
+    ):
+        """Update the aliases of a group based on the old and new aliases.
+
+        Aliases that were already removed or added are not counted as errors.
+        """
+        group_key = f"{name}@{settings.GSUITE_DOMAIN}"
+        self._execute_batch(
+            directory_api,
+            {
+                f"delete-{alias}": lambda alias=alias: (
+                    directory_api.groups()
+                    .aliases()
+                    .delete(
+                        groupKey=group_key, alias=f"{alias}@{settings.GSUITE_DOMAIN}"
+                    )
+                )
+                for alias in set(old_aliases) - set(new_aliases)
+            },
+            stats,
+            ignore_statuses=(404,),
+        )
+        self._execute_batch(
+            directory_api,
+            {
+                f"insert-{alias}": lambda alias=alias: (
+                    directory_api.groups()
+                    .aliases()
+                    .insert(
+                        groupKey=group_key,
+                        body={"alias": f"{alias}@{settings.GSUITE_DOMAIN}"},
+                    )
+                )
+                for alias in set(new_aliases) - set(old_aliases)
+            },
+            stats,
+            ignore_statuses=(409,),
+            retry_statuses=self.retry_statuses + ((404,) if created else ()),
+        )
+
+    def _execute(self, request, stats, retry_statuses=None):
+        """Execute a single request, retrying it with an exponential backoff.
+
+        :param request: the request
+        :param stats: the statistics of the current sync, updated in place
+        :param retry_statuses: the statuses of responses that are retried
+        :return: the response
+        """
+        if retry_statuses is None:
+            retry_statuses = self.retry_statuses
+        for attempt in range(self.max_retries):
+            stats["calls"] += 1
+            try:
+                return request.execute()
+            except HttpError as e:
+                if e.resp.status not in retry_statuses:
+                    raise
+                sleep(self.backoff * 2 ** attempt)
+        stats["calls"] += 1
+        return request.execute()
+
+    @staticmethod
+    def _store_exception(exceptions, request_id, _response, exception):
+        """Store the exception of a request in a batch request, or None if it succeeded."""
+        exceptions[request_id] = exception
+
+    def _execute_batch(
+        self, directory_api, requests, stats, ignore_statuses=(), retry_statuses=None
+    ):
+        """Execute requests in batch requests, retrying failed requests with an exponential backoff.
+
+        Errors are logged and counted, but do not stop the other requests.
+
+        :param directory_api: the directory API to use
+        :param requests: a dictionary mapping request ids to functions
+                         that construct the request
+        :param stats: the statistics of the current sync, updated in place
+        :param ignore_statuses: the statuses of responses that are not errors
+        :param retry_statuses: the statuses of responses that are retried
+        """
+        if retry_statuses is None:
+            retry_statuses = self.retry_statuses
+        pending = list(requests.items())
+        for attempt in range(self.max_retries + 1):
+            failed = []
+            for i in range(0, len(pending), self.batch_size):
+                chunk = pending[i : i + self.batch_size]
+                exceptions = {}
+                batch = directory_api.new_batch_http_request(
+                    callback=partial(self._store_exception, exceptions)
+                )
+                for request_id, request in chunk:
+                    batch.add(request(), request_id=request_id)
+
+                stats["calls"] += 1
+                try:
+                    batch.execute()
+                except HttpError as e:
+                    exceptions = {request_id: e for request_id, _request in chunk}
+
+                for request_id, request in chunk:
+                    exception = exceptions.get(request_id)
+                    status = getattr(getattr(exception, "resp", None), "status", None)
+                    if exception is None or status in ignore_statuses:
+                        continue
+                    if status in retry_statuses:
+                        failed.append((request_id, request))
+                    else:
+                        stats["errors"] += 1
+                        logger.error(
+                            "Could not execute request %s: %s",
+                            request_id,
+                            getattr(exception, "content", exception),
+                        )
+
+            if not failed:
+                return
+            if attempt < self.max_retries:
+                sleep(self.backoff * 2 ** attempt)
+            pending = failed
+
+        stats["errors"] += len(pending)
+        logger.error(
+            "Could not execute requests %s after %d retries",
+            ", ".join(request_id for request_id, _request in pending),
+            self.max_retries,
+        )
@@ -0,0 +1,31 @@
+"""Incremental mailing list syncing management command."""
+import logging
+
+from django.core.management.base import BaseCommand
+
+from mailinglists.gsuite import GSuiteSyncService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """This command can be run periodically to sync the changes to the mailinglists available via GSuite."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of lists to sync at the same time",
+        )
+
+    def handle(self, *args, **options):
+        """Sync the changed mailing lists."""
+        sync_service = GSuiteSyncService()
+        report = sync_service.sync_mailinglist_changes(max_workers=options["workers"])
+        for result in report:
+            if result["action"] != "unchanged":
+                self.stdout.write(
+                    "{name}: {action} in {duration:.2f}s, "
+                    "{calls} requests, {errors} errors".format(**result)
+                )
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.7 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailinglists', '0016_auto_20191030_2214'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncedGroup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Name')),
+                ('description', models.TextField(blank=True, verbose_name='Description')),
+                ('moderated', models.BooleanField(default=False, verbose_name='Moderated')),
+                ('aliases', models.JSONField(default=list, verbose_name='Aliases')),
+                ('addresses', models.JSONField(default=list, verbose_name='Addresses')),
+                ('synced_at', models.DateTimeField(auto_now=True, verbose_name='Synced at')),
+            ],
+            options={
+                'verbose_name': 'Synced GSuite group',
+                'verbose_name_plural': 'Synced GSuite groups',
+            },
+        ),
+    ]
@@ -192,3 +192,29 @@ class ListAlias(models.Model):
 
         verbose_name = _("List alias")
         verbose_name_plural = _("List aliases")
+
+
+class SyncedGroup(models.Model):
+    """Model describing the state of a GSuite group as last pushed by the sync."""
+
+    name = models.CharField(verbose_name=_("Name"), max_length=100, unique=True)
+
+    description = models.TextField(verbose_name=_("Description"), blank=True)
+
+    moderated = models.BooleanField(verbose_name=_("Moderated"), default=False)
+
+    aliases = models.JSONField(verbose_name=_("Aliases"), default=list)
+
+    addresses = models.JSONField(verbose_name=_("Addresses"), default=list)
+
+    synced_at = models.DateTimeField(verbose_name=_("Synced at"), auto_now=True)
+
+    def __str__(self):
+        """Return the name of the group."""
+        return self.name
+
+    class Meta:
+        """Meta class for SyncedGroup."""
+
+        verbose_name = _("Synced GSuite group")
+        verbose_name_plural = _("Synced GSuite groups")
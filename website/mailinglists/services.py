@@ -62,7 +62,9 @@ def get_automatic_lists():
             "description": "Automatic moderated mailinglist that can be used "
             "to send mail to all members",
             "addresses": _get_members_email_addresses(
-                Member.all_with_membership("member")
+                Member.objects.with_current_membership(
+                    Membership.MEMBER
+                ).select_related("profile")
             ),
             "moderated": True,
         },
@@ -72,7 +74,9 @@ def get_automatic_lists():
             "description": "Automatic moderated mailinglist that can be used "
             "to send mail to all benefactors",
             "addresses": _get_members_email_addresses(
-                Member.all_with_membership(Membership.BENEFACTOR)
+                Member.objects.with_current_membership(
+                    Membership.BENEFACTOR
+                ).select_related("profile")
             ),
             "moderated": True,
         },
@@ -82,7 +86,9 @@ def get_automatic_lists():
             "description": "Automatic moderated mailinglist that can be used "
             "to send mail to all honorary members",
             "addresses": _get_members_email_addresses(
-                Member.all_with_membership("honorary")
+                Member.objects.with_current_membership(
+                    Membership.HONORARY
+                ).select_related("profile")
             ),
             "moderated": True,
         },
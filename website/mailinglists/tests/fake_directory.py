@@ -0,0 +1,175 @@
+"""A local stand-in for the GSuite Directory API that records all requests."""
+import threading
+
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+
+class FakeRequest:
+    def __init__(self, api, method, kwargs):
+        self.api = api
+        self.method = method
+        self.kwargs = kwargs
+
+    def execute(self):
+        with self.api.lock:
+            self.api.http_requests += 1
+        return self.api.handle(self.method, self.kwargs)
+
+
+class FakeBatchRequest:
+    def __init__(self, api, callback):
+        self.api = api
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        with self.api.lock:
+            self.api.http_requests += 1
+        for request_id, request in self.requests:
+            try:
+                response = self.api.handle(request.method, request.kwargs)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+            else:
+                self.callback(request_id, response, None)
+
+
+class FakeResource:
+    def __init__(self, api, path):
+        self.api = api
+        self.path = path
+
+    def aliases(self):
+        return FakeResource(self.api, f"{self.path}.aliases")
+
+    def __getattr__(self, method):
+        return lambda **kwargs: FakeRequest(self.api, f"{self.path}.{method}", kwargs)
+
+
+class FakeDirectoryApi:
+    """Directory API that keeps groups in memory.
+
+    All requests are recorded in ``calls`` as ``(method, kwargs)`` tuples and
+    the number of HTTP requests, where a batch request counts as one, is
+    kept in ``http_requests``. Errors can be injected by adding statuses to
+    ``failures[method]``, which are raised by the next calls of that method.
+    """
+
+    def __init__(self, groups=None):
+        self.lock = threading.RLock()
+        self.groups_data = {}
+        self.calls = []
+        self.http_requests = 0
+        self.failures = {}
+        for email, data in (groups or {}).items():
+            self.groups_data[email] = {
+                "name": email.split("@")[0],
+                "description": "",
+                "members": dict(data.get("members", {})),
+                "aliases": set(data.get("aliases", [])),
+            }
+
+    def groups(self):
+        return FakeResource(self, "groups")
+
+    def members(self):
+        return FakeResource(self, "members")
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatchRequest(self, callback)
+
+    def reset_calls(self):
+        self.calls = []
+        self.http_requests = 0
+
+    def methods_called(self):
+        return [method for method, _kwargs in self.calls]
+
+    @staticmethod
+    def _error(status):
+        return HttpError(Response({"status": status}), bytes())
+
+    def _group(self, key):
+        try:
+            return self.groups_data[key]
+        except KeyError as e:
+            raise self._error(404) from e
+
+    def handle(self, method, kwargs):
+        with self.lock:
+            self.calls.append((method, kwargs))
+            if self.failures.get(method):
+                raise self._error(self.failures[method].pop(0))
+            return getattr(self, "_" + method.replace(".", "_"))(**kwargs)
+
+    def _groups_list(self, domain, pageToken=None):
+        return {
+            "groups": [
+                {
+                    "name": group["name"],
+                    "email": email,
+                    "directMembersCount": str(len(group["members"])),
+                }
+                for email, group in self.groups_data.items()
+            ]
+        }
+
+    def _groups_insert(self, body):
+        if body["email"] in self.groups_data:
+            raise self._error(409)
+        self.groups_data[body["email"]] = {
+            "name": body["name"],
+            "description": body["description"],
+            "members": {},
+            "aliases": set(),
+        }
+        return body
+
+    def _groups_update(self, groupKey, body):
+        group = self._group(groupKey)
+        group["name"] = body["name"]
+        group["description"] = body["description"]
+        return body
+
+    def _groups_aliases_list(self, groupKey):
+        aliases = self._group(groupKey)["aliases"]
+        return {"aliases": [{"alias": alias} for alias in sorted(aliases)]}
+
+    def _groups_aliases_insert(self, groupKey, body):
+        aliases = self._group(groupKey)["aliases"]
+        if body["alias"] in aliases:
+            raise self._error(409)
+        aliases.add(body["alias"])
+        return body
+
+    def _groups_aliases_delete(self, groupKey, alias):
+        aliases = self._group(groupKey)["aliases"]
+        if alias not in aliases:
+            raise self._error(404)
+        aliases.remove(alias)
+
+    def _members_list(self, groupKey, pageToken=None):
+        members = self._group(groupKey)["members"]
+        return {
+            "members": [
+                {"email": email, "role": role}
+                for email, role in sorted(members.items())
+            ]
+        }
+
+    def _members_insert(self, groupKey, body):
+        members = self._group(groupKey)["members"]
+        if body["email"] in members:
+            raise self._error(409)
+        members[body["email"]] = body["role"]
+        return body
+
+    def _members_delete(self, groupKey, memberKey):
+        members = self._group(groupKey)["members"]
+        if memberKey not in members:
+            raise self._error(404)
+        del members[memberKey]
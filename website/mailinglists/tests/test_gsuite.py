@@ -1,4 +1,5 @@
 """Test for the GSuite sync in the mailinglists package."""
+from threading import Barrier, get_ident
 from unittest import mock
 from unittest.mock import MagicMock
 
@@ -8,7 +9,8 @@ from googleapiclient.errors import HttpError
 from httplib2 import Response
 
 from mailinglists.gsuite import GSuiteSyncService
-from mailinglists.models import MailingList, ListAlias, VerbatimAddress
+from mailinglists.models import MailingList, ListAlias, VerbatimAddress, SyncedGroup
+from mailinglists.tests.fake_directory import FakeDirectoryApi
 
 
 def assert_not_called_with(self, *args, **kwargs):
@@ -489,3 +491,160 @@ class GSuiteSyncTestCase(TestCase):
         self.sync_service.create_group = original_create
         self.sync_service.update_group = original_update
         self.sync_service.delete_group = original_delete
+
+
+@override_settings(SUSPEND_SIGNALS=True)
+class GSuiteIncrementalSyncTestCase(TestCase):
+    def setUp(self):
+        self.domain = settings.GSUITE_DOMAIN
+        self.settings_api = MagicMock()
+        self.directory_api = FakeDirectoryApi(
+            {
+                f"existing@{self.domain}": {
+                    "members": {
+                        "old@example.com": "MEMBER",
+                        "manager@example.com": "MANAGER",
+                    },
+                    "aliases": [f"oldalias@{self.domain}"],
+                },
+            }
+        )
+        self.sync_service = GSuiteSyncService(self.settings_api, self.directory_api)
+        self.sync_service.backoff = 0
+        self.lists = [
+            GSuiteSyncService.GroupData(
+                name="existing",
+                aliases=["alias"],
+                addresses=["a@example.com", "manager@example.com"],
+            ),
+            GSuiteSyncService.GroupData(name="new", addresses=["b@example.com"]),
+            GSuiteSyncService.GroupData(name="empty", addresses=[]),
+        ]
+
+    def _members(self, name):
+        return self.directory_api.groups_data[f"{name}@{self.domain}"]["members"]
+
+    def _actions(self, report):
+        return {result["name"]: result["action"] for result in report}
+
+    def test_first_sync(self):
+        report = self.sync_service.sync_mailinglist_changes(self.lists)
+
+        self.assertEqual(
+            self._actions(report), {"existing": "updated", "new": "created"}
+        )
+        self.assertEqual(
+            self._members("existing"),
+            {"a@example.com": "MEMBER", "manager@example.com": "MANAGER"},
+        )
+        self.assertEqual(
+            self.directory_api.groups_data[f"existing@{self.domain}"]["aliases"],
+            {f"alias@{self.domain}"},
+        )
+        self.assertEqual(self._members("new"), {"b@example.com": "MEMBER"})
+        self.assertNotIn(f"empty@{self.domain}", self.directory_api.groups_data)
+        self.assertEqual(
+            set(SyncedGroup.objects.values_list("name", flat=True)), {"existing", "new"}
+        )
+
+    def test_unchanged_lists_are_skipped(self):
+        self.sync_service.sync_mailinglist_changes(self.lists)
+        self.directory_api.reset_calls()
+        self.settings_api.reset_mock()
+
+        report = self.sync_service.sync_mailinglist_changes(self.lists)
+
+        self.assertEqual(
+            self._actions(report), {"existing": "unchanged", "new": "unchanged"}
+        )
+        self.assertEqual(self.directory_api.http_requests, 0)
+        self.settings_api.groups.assert_not_called()
+
+    def test_changes_are_batched(self):
+        self.sync_service.sync_mailinglist_changes(self.lists)
+        self.directory_api.reset_calls()
+
+        self.lists[1] = GSuiteSyncService.GroupData(
+            name="new", addresses=["c@example.com", "d@example.com", "e@example.com"]
+        )
+        report = self.sync_service.sync_mailinglist_changes(self.lists)
+
+        self.assertEqual(
+            self._actions(report), {"existing": "unchanged", "new": "updated"}
+        )
+        # One batch request to remove and one to add members
+        self.assertEqual(self.directory_api.http_requests, 2)
+        self.assertEqual(report[-1]["calls"], 2)
+        self.assertEqual(
+            sorted(self.directory_api.methods_called()),
+            ["members.delete"] + ["members.insert"] * 3,
+        )
+        self.assertEqual(
+            set(self._members("new")),
+            {"c@example.com", "d@example.com", "e@example.com"},
+        )
+
+    def test_removed_lists_are_archived(self):
+        self.sync_service.sync_mailinglist_changes(self.lists)
+        self.settings_api.reset_mock()
+
+        report = self.sync_service.sync_mailinglist_changes(self.lists[:1])
+
+        self.assertEqual(self._actions(report)["new"], "archived")
+        self.assertEqual(self._members("new"), {})
+        self.settings_api.groups().patch.assert_called_once_with(
+            groupUniqueId=f"new@{self.domain}",
+            body={"archiveOnly": "true", "whoCanPostMessage": "NONE_CAN_POST"},
+        )
+        self.assertFalse(SyncedGroup.objects.filter(name="new").exists())
+
+    @mock.patch("mailinglists.gsuite.logger")
+    def test_failed_requests(self, logger_mock):
+        with self.subTest("Retried"):
+            self.directory_api.failures["members.insert"] = [503, 429]
+            report = self.sync_service.sync_mailinglist_changes(self.lists)
+
+            self.assertEqual(sum(result["errors"] for result in report), 0)
+            self.assertIn("b@example.com", self._members("new"))
+
+        with self.subTest("Failed"):
+            self.lists[1] = GSuiteSyncService.GroupData(
+                name="new", addresses=["c@example.com"]
+            )
+            self.directory_api.failures["members.insert"] = [400]
+            report = self.sync_service.sync_mailinglist_changes(self.lists)
+
+            self.assertEqual(self._actions(report)["new"], "updated")
+            self.assertEqual(report[-1]["errors"], 1)
+            logger_mock.error.assert_called()
+            # The list is compared to GSuite again in the next sync
+            self.assertFalse(SyncedGroup.objects.filter(name="new").exists())
+
+    @mock.patch("mailinglists.gsuite.get_groups_settings_api")
+    @mock.patch("mailinglists.gsuite.get_directory_api")
+    def test_api_clients_per_worker(self, directory_mock, settings_mock):
+        directory_mock.side_effect = MagicMock
+        settings_mock.side_effect = MagicMock
+        sync_service = GSuiteSyncService()
+        barrier = Barrier(2, timeout=10)
+        clients = {}
+
+        def sync_group_changes(old, group, remote_groups, *apis):
+            barrier.wait()
+            clients.setdefault(get_ident(), set()).add(apis)
+            return {
+                "name": group.name,
+                "action": "updated",
+                "duration": 0,
+                "calls": 0,
+                "errors": 1,
+            }
+
+        sync_service._sync_group_changes = sync_group_changes
+        sync_service.sync_mailinglist_changes(self.lists * 2, max_workers=2)
+
+        self.assertEqual(len(clients), 2)
+        self.assertTrue(all(len(apis) == 1 for apis in clients.values()))
+        first, second = (apis.pop() for apis in clients.values())
+        self.assertIsNot(first[0], second[0])
+        self.assertIsNot(first[1], second[1])
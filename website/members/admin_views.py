@@ -19,7 +19,9 @@ class IbanExportView(View):
         header_fields = ["name", "username", "iban", "bic"]
         rows = []
 
-        members = Member.current_members.filter(profile__auto_renew=True)
+        members = Member.current_members.filter(
+            profile__auto_renew=True
+        ).with_latest_membership()
 
         for member in members:
             if (
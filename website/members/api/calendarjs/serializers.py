@@ -1,17 +1,20 @@
 from rest_framework.reverse import reverse
 
-from members.models import Member
+from members.models import Member, Membership
 from thaliawebsite.api.calendarjs.serializers import CalenderJSSerializer
 
 
 class MemberBirthdaySerializer(CalenderJSSerializer):
-    """Serializer that renders the member birthdays to the CalendarJS format."""
+    """Serializer that renders the member birthdays to the CalendarJS format.
+
+    The birthdays are the rows of ``CalendarJSBirthdayListView._get_birthdays``.
+    """
 
     class Meta(CalenderJSSerializer.Meta):
         model = Member
 
     def _start(self, instance):
-        return instance.profile.birthday
+        return instance["birthday"]
 
     def _end(self, instance):
         pass
@@ -23,20 +26,18 @@ class MemberBirthdaySerializer(CalenderJSSerializer):
         return True
 
     def _url(self, instance):
-        return reverse("members:profile", kwargs={"pk": instance.pk})
+        return reverse("members:profile", kwargs={"pk": instance["pk"]})
 
     def _title(self, instance):
-        return instance.profile.display_name()
+        return instance["name"]
 
     def _description(self, instance):
-        membership = instance.current_membership
-        if membership and membership.type == "honorary":
-            return membership.get_type_display()
+        if instance["honorary"]:
+            return dict(Membership.MEMBERSHIP_TYPES)[Membership.HONORARY]
         return ""
 
     def _class_names(self, instance):
         class_names = ["birthday-event"]
-        membership = instance.current_membership
-        if membership and membership.type == "honorary":
+        if instance["honorary"]:
             class_names.append("honorary")
         return class_names
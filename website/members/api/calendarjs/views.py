@@ -1,12 +1,13 @@
-import copy
-
 from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
 from members.api.calendarjs.serializers import MemberBirthdaySerializer
-from members.models import Member
+from members.models import Member, Membership
+from utils import cache
 from utils.snippets import extract_date_range
 
+BIRTHDAYS_CACHE_TIMEOUT = 60 * 15
+
 
 class CalendarJSBirthdayListView(ListAPIView):
     """Define a custom route that outputs the correctly formatted events information for CalendarJS, published events only."""
@@ -15,33 +16,56 @@ class CalendarJSBirthdayListView(ListAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = None
 
-    def _get_birthdays(self, member, start, end):
-        birthdays = []
+    @staticmethod
+    def _get_birthdays(member, start, end):
+        """Get the birthdays of a member in a range as lightweight rows."""
+        row = {
+            "pk": member.pk,
+            "name": member.profile.display_name(),
+            "honorary": member.latest_membership.type == Membership.HONORARY,
+        }
+        birthday = member.profile.birthday
 
-        start_year = max(start.year, member.profile.birthday.year)
-        for year in range(start_year, end.year + 1):
-            bday = copy.deepcopy(member)
+        birthdays = []
+        for year in range(max(start.year, birthday.year), end.year + 1):
             try:
-                bday.profile.birthday = bday.profile.birthday.replace(year=year)
-            except ValueError as e:
-                if bday.profile.birthday.month == 2 and bday.profile.birthday.day == 29:
-                    bday.profile.birthday = bday.profile.birthday.replace(
-                        year=year, day=28
-                    )
-                else:
-                    raise e
-            if start.date() <= bday.profile.birthday <= end.date():
-                birthdays.append(bday)
+                date = birthday.replace(year=year)
+            except ValueError:
+                # Birthdays on leap days are on the 28th in other years
+                date = birthday.replace(year=year, day=28)
+            if start.date() <= date <= end.date():
+                birthdays.append({**row, "birthday": date})
         return birthdays
 
     def get_queryset(self):
         start, end = extract_date_range(self.request)
 
-        queryset = Member.current_members.with_birthdays_in_range(start, end).filter(
-            profile__show_birthday=True
-        )
-
-        all_birthdays = [self._get_birthdays(m, start, end) for m in queryset.all()]
-        birthdays = [x for sublist in all_birthdays for x in sublist]
+        def _get_birthdays():
+            queryset = (
+                Member.current_members.with_birthdays_in_range(start, end)
+                .filter(profile__show_birthday=True)
+                .with_latest_membership()
+                .select_related("profile")
+                .only(
+                    "first_name",
+                    "last_name",
+                    "username",
+                    "profile__birthday",
+                    "profile__display_name_preference",
+                    "profile__initials",
+                    "profile__nickname",
+                    "profile__photo",
+                )
+            )
+            return [
+                birthday
+                for member in queryset
+                for birthday in self._get_birthdays(member, start, end)
+            ]
 
-        return birthdays
+        return cache.get_or_set(
+            f"members_birthdays_{start.isoformat()}_{end.isoformat()}",
+            _get_birthdays,
+            tags=["members_birthdays"],
+            timeout=BIRTHDAYS_CACHE_TIMEOUT,
+        )
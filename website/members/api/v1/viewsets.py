@@ -39,8 +39,8 @@ class MemberViewset(viewsets.ReadOnlyModelViewSet, mixins.UpdateModelMixin):
 
     def get_queryset(self):
         if self.action == "list":
-            return Member.current_members.get_queryset()
-        return Member.objects.all()
+            return Member.current_members.with_latest_membership()
+        return Member.objects.with_latest_membership()
 
     def is_self_reference(self):
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
@@ -24,7 +24,7 @@ class MemberListView(ListAPIView):
     """Returns an overview of all members."""
 
     serializer_class = MemberListSerializer
-    queryset = Member.current_members.all()
+    queryset = Member.current_members.with_latest_membership()
     permission_classes = [
         IsAuthenticatedOrTokenHasScope,
     ]
@@ -49,7 +49,7 @@ class MemberDetailView(RetrieveAPIView):
     """Returns details of a member."""
 
     serializer_class = MemberSerializer
-    queryset = Member.current_members.all()
+    queryset = Member.current_members.with_latest_membership()
     permission_classes = [
         IsAuthenticatedOrTokenHasScope,
     ]
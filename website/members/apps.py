@@ -6,3 +6,12 @@ from django.utils.translation import gettext_lazy as _
 class MembersConfig(AppConfig):
     name = "members"
     verbose_name = _("Members")
+
+    def ready(self):
+        """Invalidate the cached birthdays when members change."""
+        # pylint: disable=import-outside-toplevel
+        from utils.cache import invalidate_on_change
+        from .models import Member, Membership, Profile
+
+        for model in (Member, Membership, Profile):
+            invalidate_on_change(model, "members_birthdays")
@@ -13,6 +13,7 @@ from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from members.models import Member, Membership
+from outbox import services as outbox_services
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,8 @@ logger = logging.getLogger(__name__)
 def send_membership_announcement(dry_run=False):
     """Send an email to all members with a never ending membership excluding honorary members.
 
+    The emails are queued in the outbox.
+
     :param dry_run: does not really send emails if True
     """
     members = (
@@ -30,91 +33,93 @@ def send_membership_announcement(dry_run=False):
         .distinct()
     )
 
-    with mail.get_connection() as connection:
-        for member in members:
-            logger.info("Sent email to %s (%s)", member.get_full_name(), member.email)
-            if not dry_run:
-                email_body = loader.render_to_string(
-                    "members/email/membership_announcement.txt",
-                    {"name": member.get_full_name()},
-                )
-                mail.EmailMessage(
-                    "[THALIA] {}".format(_("Membership announcement")),
-                    email_body,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [member.email],
-                    bcc=[settings.BOARD_NOTIFICATION_ADDRESS],
-                    connection=connection,
-                ).send()
-
-        if not dry_run:
-            mail.mail_managers(
-                _("Membership announcement sent"),
-                loader.render_to_string(
-                    "members/email/membership_announcement_notification.txt",
-                    {"members": members},
-                ),
-                connection=connection,
+    template = get_template("members/email/membership_announcement.txt")
+    subject = "[THALIA] {}".format(_("Membership announcement"))
+    messages = []
+    for member in members:
+        logger.info("Queued email to %s (%s)", member.get_full_name(), member.email)
+        messages.append(
+            mail.EmailMessage(
+                subject,
+                template.render({"name": member.get_full_name()}),
+                settings.DEFAULT_FROM_EMAIL,
+                [member.email],
+                bcc=[settings.BOARD_NOTIFICATION_ADDRESS],
             )
+        )
+
+    if not dry_run:
+        outbox_services.queue_messages(messages)
+        mail.mail_managers(
+            _("Membership announcement sent"),
+            loader.render_to_string(
+                "members/email/membership_announcement_notification.txt",
+                {"members": members},
+            ),
+        )
 
 
 def send_information_request(dry_run=False):
     """Send an email to all members to have them check their personal information.
 
+    The emails are queued in the outbox.
+
     :param dry_run: does not really send emails if True
     """
-    members = Member.current_members.all().exclude(email="")
-
-    with mail.get_connection() as connection:
-        for member in members:
-            logger.info("Sent email to %s (%s)", member.get_full_name(), member.email)
-            if not dry_run:
-
-                email_context = {
-                    k: x if x else ""
-                    for k, x in {
-                        "name": member.first_name,
-                        "username": member.username,
-                        "full_name": member.get_full_name(),
-                        "address_street": member.profile.address_street,
-                        "address_street2": member.profile.address_street2,
-                        "address_postal_code": member.profile.address_postal_code,
-                        "address_city": member.profile.address_city,
-                        "address_country": member.profile.get_address_country_display(),
-                        "phone_number": member.profile.phone_number,
-                        "birthday": member.profile.birthday,
-                        "email": member.email,
-                        "student_number": member.profile.student_number,
-                        "starting_year": member.profile.starting_year,
-                        "programme": member.profile.get_programme_display(),
-                    }.items()
-                }
-                html_template = get_template("members/email/information_check.html")
-                text_template = get_template("members/email/information_check.txt")
-                subject = "[THALIA] " + _("Membership information check")
-                html_message = html_template.render(email_context)
-                text_message = text_template.render(email_context)
-
-                msg = EmailMultiAlternatives(
-                    subject, text_message, settings.DEFAULT_FROM_EMAIL, [member.email],
-                )
-                msg.attach_alternative(html_message, "text/html")
-                msg.send()
-
-        if not dry_run:
-            mail.mail_managers(
-                _("Membership information check sent"),
-                loader.render_to_string(
-                    "members/email/information_check_notification.txt",
-                    {"members": members},
-                ),
-                connection=connection,
-            )
+    members = Member.current_members.all().exclude(email="").select_related("profile")
+
+    html_template = get_template("members/email/information_check.html")
+    text_template = get_template("members/email/information_check.txt")
+    subject = "[THALIA] " + _("Membership information check")
+    messages = []
+    for member in members:
+        logger.info("Queued email to %s (%s)", member.get_full_name(), member.email)
+        profile = member.profile
+        email_context = {
+            k: x if x else ""
+            for k, x in {
+                "name": member.first_name,
+                "username": member.username,
+                "full_name": member.get_full_name(),
+                "address_street": profile.address_street,
+                "address_street2": profile.address_street2,
+                "address_postal_code": profile.address_postal_code,
+                "address_city": profile.address_city,
+                "address_country": profile.get_address_country_display(),
+                "phone_number": profile.phone_number,
+                "birthday": profile.birthday,
+                "email": member.email,
+                "student_number": profile.student_number,
+                "starting_year": profile.starting_year,
+                "programme": profile.get_programme_display(),
+            }.items()
+        }
+
+        msg = EmailMultiAlternatives(
+            subject,
+            text_template.render(email_context),
+            settings.DEFAULT_FROM_EMAIL,
+            [member.email],
+        )
+        msg.attach_alternative(html_template.render(email_context), "text/html")
+        messages.append(msg)
+
+    if not dry_run:
+        outbox_services.queue_messages(messages)
+        mail.mail_managers(
+            _("Membership information check sent"),
+            loader.render_to_string(
+                "members/email/information_check_notification.txt",
+                {"members": members},
+            ),
+        )
 
 
 def send_expiration_announcement(dry_run=False):
     """Send an email to all members whose membership will end in the next 31 days to warn them about this.
 
+    The emails are queued in the outbox.
+
     :param dry_run: does not really send emails if True
     """
     expiry_date = timezone.now() + timedelta(days=31)
@@ -125,48 +130,42 @@ def send_expiration_announcement(dry_run=False):
         .distinct()
     )
 
-    with mail.get_connection() as connection:
-        for member in members:
-            logger.info("Sent email to %s (%s)", member.get_full_name(), member.email)
-            if not dry_run:
-
-                email_body = loader.render_to_string(
-                    "members/email/expiration_announcement.txt",
-                    {
-                        "name": member.get_full_name(),
-                        "membership_price": floatformat(
-                            settings.MEMBERSHIP_PRICES["year"], 2
-                        ),
-                        "renewal_url": "{}{}".format(
-                            settings.BASE_URL, reverse("registrations:renew")
-                        ),
-                    },
-                )
-                mail.EmailMessage(
-                    "[THALIA] {}".format(_("Membership expiration announcement")),
-                    email_body,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [member.email],
-                    bcc=[settings.BOARD_NOTIFICATION_ADDRESS],
-                    connection=connection,
-                ).send()
-
-        if not dry_run:
-            mail.mail_managers(
-                _("Membership expiration announcement sent"),
-                loader.render_to_string(
-                    "members/email/expiration_announcement_notification.txt",
-                    {"members": members},
-                ),
-                connection=connection,
+    template = get_template("members/email/expiration_announcement.txt")
+    subject = "[THALIA] {}".format(_("Membership expiration announcement"))
+    context = {
+        "membership_price": floatformat(settings.MEMBERSHIP_PRICES["year"], 2),
+        "renewal_url": "{}{}".format(settings.BASE_URL, reverse("registrations:renew")),
+    }
+    messages = []
+    for member in members:
+        logger.info("Queued email to %s (%s)", member.get_full_name(), member.email)
+        messages.append(
+            mail.EmailMessage(
+                subject,
+                template.render({**context, "name": member.get_full_name()}),
+                settings.DEFAULT_FROM_EMAIL,
+                [member.email],
+                bcc=[settings.BOARD_NOTIFICATION_ADDRESS],
             )
+        )
 
+    if not dry_run:
+        outbox_services.queue_messages(messages)
+        mail.mail_managers(
+            _("Membership expiration announcement sent"),
+            loader.render_to_string(
+                "members/email/expiration_announcement_notification.txt",
+                {"members": members},
+            ),
+        )
 
-def send_welcome_message(user, password):
+
+def send_welcome_message(user, password, connection=None):
     """Send an email to a new mail welcoming them.
 
     :param user: the new user
     :param password: randomly generated password
+    :param connection: optional mail connection to reuse
     """
     email_body = loader.render_to_string(
         "members/email/welcome.txt",
@@ -177,7 +176,9 @@ def send_welcome_message(user, password):
             "url": settings.BASE_URL,
         },
     )
-    user.email_user(_("Welcome to Study Association Thalia"), email_body)
+    user.email_user(
+        _("Welcome to Study Association Thalia"), email_body, connection=connection
+    )
 
 
 def send_email_change_confirmation_messages(change_request):
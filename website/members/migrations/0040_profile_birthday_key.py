@@ -0,0 +1,27 @@
+# Generated by Django 3.2.7 on 2026-10-18 19:01
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay, ExtractMonth
+
+
+def set_birthday_keys(apps, schema_editor):
+    Profile = apps.get_model("members", "Profile")
+    Profile.objects.exclude(birthday=None).update(
+        birthday_key=ExtractMonth("birthday") * 100 + ExtractDay("birthday")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0039_remove_profile_language'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='birthday_key',
+            field=models.PositiveSmallIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(set_birthday_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.7 on 2026-10-18 19:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0040_profile_birthday_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConscriboRelation',
+            fields=[
+                ('member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='conscribo_relation', serialize=False, to='members.member', verbose_name='member')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='fingerprint')),
+                ('synced_at', models.DateTimeField(auto_now=True, verbose_name='synced at')),
+            ],
+            options={
+                'verbose_name': 'Conscribo relation',
+                'verbose_name_plural': 'Conscribo relations',
+            },
+        ),
+    ]
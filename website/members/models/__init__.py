@@ -2,3 +2,4 @@ from .member import *
 from .profile import *
 from .membership import *
 from .email_change import *
+from .conscribo_relation import *
@@ -0,0 +1,25 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ConscriboRelation(models.Model):
+    """Describes the last relation of a member pushed to Conscribo."""
+
+    member = models.OneToOneField(
+        "members.Member",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="conscribo_relation",
+        verbose_name=_("member"),
+    )
+
+    fingerprint = models.CharField(_("fingerprint"), max_length=64)
+
+    synced_at = models.DateTimeField(_("synced at"), auto_now=True)
+
+    def __str__(self):
+        return _("Conscribo relation of {}").format(self.member_id)
+
+    class Meta:
+        verbose_name = _("Conscribo relation")
+        verbose_name_plural = _("Conscribo relations")
@@ -1,22 +1,64 @@
 # pylint: disable=imported-auth-user
 
+import calendar
 import logging
-import operator
-from datetime import timedelta
-from functools import reduce
 
 from django.contrib.auth.models import User, UserManager
-from django.db.models import Q
+from django.db.models import OuterRef, Q, QuerySet, Subquery
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from activemembers.models import MemberGroup, MemberGroupMembership
+from .membership import Membership
+from .profile import birthday_key
 
 logger = logging.getLogger(__name__)
 
 
-class MemberManager(UserManager):
+class MemberQuerySet(QuerySet):
+    def with_latest_membership(self):
+        """Annotate the most recent membership of every member.
+
+        The membership is available without extra queries through
+        ``latest_membership`` and ``current_membership``.
+
+        :return: the annotated queryset
+        :rtype: Queryset
+        """
+        latest = Membership.objects.filter(user=OuterRef("pk")).order_by(
+            "-since", "-pk"
+        )
+        return self.annotate(
+            latest_membership_id=Subquery(latest.values("pk")[:1]),
+            latest_membership_type=Subquery(latest.values("type")[:1]),
+            latest_membership_since=Subquery(latest.values("since")[:1]),
+            latest_membership_until=Subquery(latest.values("until")[:1]),
+        )
+
+    def with_current_membership(self, membership_type=None):
+        """Select the members whose most recent membership is currently active.
+
+        This selects the same members as checking ``current_membership`` on
+        every member, in a single query.
+
+        :param membership_type: only select memberships of this type, optional
+        :return: the filtered queryset, annotated with the latest membership
+        :rtype: Queryset
+        """
+        queryset = self.with_latest_membership().filter(
+            Q(latest_membership_id__isnull=False)
+            & (
+                Q(latest_membership_until__isnull=True)
+                | Q(latest_membership_until__gt=timezone.now().date())
+            )
+        )
+        if membership_type is not None:
+            queryset = queryset.filter(latest_membership_type=membership_type)
+        return queryset
+
+
+class MemberManager(UserManager.from_queryset(MemberQuerySet)):
     """Get all members, i.e. all users with a profile."""
 
     def get_queryset(self):
@@ -74,15 +116,27 @@ class CurrentMemberManager(MemberManager):
             # Everyone that's born before to_date has a birthday
             return queryset
 
-        delta = to_date - from_date
-        dates = [from_date + timedelta(days=i) for i in range(delta.days + 1)]
-        monthdays = [
-            {"profile__birthday__month": d.month, "profile__birthday__day": d.day}
-            for d in dates
-        ]
-        # Don't get me started (basically, we are making a giant OR query with
-        # all days and months that are in the range)
-        query = reduce(operator.or_, [Q(**d) for d in monthdays])
+        from_key = birthday_key(from_date)
+        to_key = birthday_key(to_date)
+        if from_date.year == to_date.year:
+            query = Q(profile__birthday_key__range=(from_key, to_key))
+        elif from_key > to_key:
+            # The range wraps around the end of the year
+            query = Q(profile__birthday_key__gte=from_key) | Q(
+                profile__birthday_key__lte=to_key
+            )
+        else:
+            # The range covers all days of the year
+            return queryset
+
+        for year in range(from_date.year, to_date.year + 1):
+            if not calendar.isleap(year) and (from_date.year, from_key) <= (
+                year,
+                228,
+            ) <= (to_date.year, to_key):
+                # Birthdays on leap days are on the 28th in other years
+                query |= Q(profile__birthday_key=229)
+
         return queryset.filter(query)
 
 
@@ -113,16 +167,26 @@ class Member(User):
     @property
     def latest_membership(self):
         """Get the most recent membership of this user."""
-        if not self.membership_set.exists():
-            return None
-        return self.membership_set.latest("since")
+        if hasattr(self, "latest_membership_id"):
+            # Annotated by MemberQuerySet.with_latest_membership
+            if self.latest_membership_id is None:
+                return None
+            membership = Membership(
+                pk=self.latest_membership_id,
+                user_id=self.pk,
+                type=self.latest_membership_type,
+                since=self.latest_membership_since,
+                until=self.latest_membership_until,
+            )
+            membership._state.adding = False
+            membership._state.db = self._state.db
+            return membership
+        return self.membership_set.order_by("-since", "-pk").first()
 
     @property
     def earliest_membership(self):
         """Get the earliest membership of this user."""
-        if not self.membership_set.exists():
-            return None
-        return self.membership_set.earliest("since")
+        return self.membership_set.order_by("since").first()
 
     def has_been_member(self):
         """Has this user ever been a member?."""
@@ -151,11 +215,7 @@ class Member(User):
         :return: List of users
         :rtype: [Member]
         """
-        return [
-            x
-            for x in cls.objects.all()
-            if x.current_membership and x.current_membership.type == membership_type
-        ]
+        return list(cls.objects.with_current_membership(membership_type))
 
     @property
     def can_attend_events(self):
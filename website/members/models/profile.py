@@ -16,6 +16,20 @@ from utils import countries
 logger = logging.getLogger(__name__)
 
 
+def birthday_key(date):
+    """Get the key of a birthday that orders dates by their day of the year.
+
+    The key does not depend on the year, so leap days have their own key.
+
+    >>> from datetime import date
+    >>> birthday_key(date(2000, 2, 29))
+    229
+    >>> birthday_key(date(2001, 12, 31))
+    1231
+    """
+    return date.month * 100 + date.day
+
+
 def _profile_image_path(_instance, _filename):
     """Set the upload path for profile images.
 
@@ -24,7 +38,7 @@ def _profile_image_path(_instance, _filename):
     Also makes sure any user-picked filenames don't survive
 
     >>> _profile_image_path(None, "bla.jpg")
-    public/avatars/...
+    'public/avatars/...'
     >>> "swearword" in _profile_image_path(None, "swearword.jpg")
     False
     """
@@ -143,6 +157,10 @@ class Profile(models.Model):
 
     birthday = models.DateField(verbose_name=_("Birthday"), null=True)
 
+    birthday_key = models.PositiveSmallIntegerField(
+        null=True, editable=False, db_index=True,
+    )
+
     show_birthday = models.BooleanField(
         verbose_name=_("Display birthday"),
         help_text=_(
@@ -309,6 +327,7 @@ class Profile(models.Model):
             raise ValidationError(errors)
 
     def save(self, **kwargs):
+        self.birthday_key = birthday_key(self.birthday) if self.birthday else None
         super().save(**kwargs)
         storage = DefaultStorage()
 
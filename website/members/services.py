@@ -1,15 +1,22 @@
 """Services defined in the members package."""
+import hashlib
+import json
+import logging
 from datetime import date, datetime
 from typing import Callable, List, Dict, Any
 
 from django.conf import settings
 from django.db.models import Q, Count
-from django.utils import timezone
+from django.template.defaultfilters import date as date_filter
+from django.utils import timezone, translation
 
 from members import emails
-from members.models import Membership, Member
+from members.models import ConscriboRelation, Membership, Member
+from utils.conscribo.objects import Command as ApiCommand
 from utils.snippets import datetime_to_lectureyear
 
+logger = logging.getLogger(__name__)
+
 
 def _member_group_memberships(
     member: Member, condition: Callable[[Membership], bool]
@@ -210,7 +217,8 @@ def execute_data_minimisation(dry_run=False, members=None) -> List[Member]:
             & Q(membership_count__gt=0)
         )
         .distinct()
-        .prefetch_related("membership_set", "profile")
+        .with_latest_membership()
+        .select_related("profile")
     )
     deletion_period = timezone.now().date() - timezone.timedelta(days=31)
     processed_members = []
@@ -236,3 +244,162 @@ def execute_data_minimisation(dry_run=False, members=None) -> List[Member]:
                 profile.save()
 
     return processed_members
+
+
+def _conscribo_relation_fields(member) -> Dict:
+    """Get the fields of the Conscribo relation of a member.
+
+    The bank accounts of the member must be prefetched.
+    """
+    profile = member.profile
+    accounts = member.bank_accounts.all()
+
+    if accounts:
+        account = accounts[len(accounts) - 1]
+        mandate_no = account.mandate_no
+        mandate_date = date_filter(account.created_at, "Y-m-d")
+        bank_account = {
+            "name": account.name,
+            "bic": account.bic or "",
+            "iban": account.iban,
+        }
+    else:
+        mandate_no = ""
+        mandate_date = ""
+        bank_account = {
+            "name": "",
+            "bic": "",
+            "iban": "",
+        }
+
+    return {
+        "website_id": member.pk,
+        "voornaam": member.first_name,
+        "naam": member.last_name[:100],  # api maxlength: 100
+        "einddatum_lidmaatschap": date_filter(member.current_membership.until, "Y-m-d"),
+        "e_mailadres": member.email,
+        "eerste_adresregel": profile.address_street,
+        "tweede_adresregel": profile.address_street2,
+        "postcode": profile.address_postal_code,
+        "plaats": profile.address_city,
+        "land": profile.get_address_country_display(),
+        "bankrekeningnummer": bank_account,
+        "machtigingskenmerk": mandate_no,
+        "machtigingsdatum": mandate_date,
+    }
+
+
+def _fingerprint(fields) -> str:
+    return hashlib.sha256(
+        json.dumps(fields, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def sync_conscribo_relations(api, chunk_size=100, retries=3) -> Dict[str, int]:
+    """Push the relations of the current members to Conscribo.
+
+    Only relations of which the fields changed since the last successful
+    push, or that are missing in Conscribo, are replaced. Relations of
+    people that are no longer members are deleted. The fingerprints of
+    the pushed relations are saved after every chunk, so an interrupted
+    sync continues where it stopped.
+
+    :param api: the ``ConscriboApi`` to use
+    :param chunk_size: the maximum number of relations per request
+    :param retries: the number of retries of a failed request
+    :return: the number of replaced, deleted, unchanged and failed relations
+    """
+    relations_response = api.single_request(
+        "listRelations",
+        entityType="lid_2",
+        requestedFields={"fieldName": ["website_id", "code"]},
+    )
+    relations_response.raise_for_status()
+    relations_response = relations_response.data
+
+    current_relations = {}
+    if len(relations_response.get("relations")) > 0:
+        current_relations = {
+            int(r.get("website_id")): r.get("code", None)
+            for r in relations_response.get("relations").values()
+            if r.get("website_id", "") != ""
+        }
+
+    fingerprints = dict(
+        ConscriboRelation.objects.values_list("member_id", "fingerprint")
+    )
+    stats = {"replaced": 0, "deleted": 0, "unchanged": 0, "failed": 0}
+
+    replaced = []
+    with translation.override("nl"):
+        for member in (
+            Member.current_members.with_latest_membership()
+            .select_related("profile")
+            .prefetch_related("bank_accounts")
+        ):
+            code = current_relations.pop(member.pk, None)
+            fields = _conscribo_relation_fields(member)
+            fingerprint = _fingerprint(fields)
+            if code is not None and fingerprints.get(member.pk) == fingerprint:
+                stats["unchanged"] += 1
+                continue
+
+            replaced.append(
+                (
+                    member.pk,
+                    fingerprint,
+                    ApiCommand(
+                        command="ReplaceRelation",
+                        entityType="lid_2",
+                        fields=fields,
+                        code=code,
+                    ),
+                )
+            )
+
+    done = 0
+    for commands, results in api.chunked_request(
+        [command for _, _, command in replaced], chunk_size, retries
+    ):
+        relations = []
+        for (pk, fingerprint, _), result in zip(
+            replaced[done : done + len(commands)], results
+        ):
+            if result is not None and result.success:
+                relations.append(
+                    ConscriboRelation(member_id=pk, fingerprint=fingerprint)
+                )
+            else:
+                logger.debug(result and result.notifications)
+        done += len(commands)
+
+        ConscriboRelation.objects.filter(
+            member_id__in=[r.member_id for r in relations]
+        ).delete()
+        ConscriboRelation.objects.bulk_create(relations)
+        stats["replaced"] += len(relations)
+        stats["failed"] += len(commands) - len(relations)
+
+    deleted = list(current_relations.items())
+    done = 0
+    for commands, results in api.chunked_request(
+        [
+            ApiCommand(command="DeleteRelation", entityType="lid_2", code=code)
+            for _, code in deleted
+        ],
+        chunk_size,
+        retries,
+    ):
+        pks = []
+        for (pk, _), result in zip(deleted[done : done + len(commands)], results):
+            if result is not None and result.success:
+                pks.append(pk)
+            else:
+                logger.debug(result and result.notifications)
+        done += len(commands)
+
+        ConscriboRelation.objects.filter(member_id__in=pks).delete()
+        stats["deleted"] += len(pks)
+        stats["failed"] += len(commands) - len(pks)
+
+    return stats
@@ -0,0 +1,105 @@
+"""A local stand-in for the Conscribo API that records all requests."""
+import json
+
+from requests import HTTPError
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(f"{self.status_code} Server Error", response=self)
+
+
+class FakeConscriboSession:
+    """Session that handles Conscribo requests with relations kept in memory.
+
+    The relations are kept in ``relations`` by their code. All commands are
+    recorded in ``commands`` and every HTTP request in ``requests``, as the
+    list of commands it contained. Errors can be injected by adding status
+    codes to ``failures``, which are returned by the next requests. A status
+    of 200 lets a request succeed. Replacing the relations of the website ids
+    in ``rejected`` fails, and ``reverse_results`` returns the results of a
+    request in reverse order.
+    """
+
+    def __init__(self, relations=None):
+        self.relations = dict(relations or {})
+        self.commands = []
+        self.requests = []
+        self.failures = []
+        self.rejected = set()
+        self.reverse_results = False
+        self._next_code = 1000
+
+    def reset_calls(self):
+        self.commands = []
+        self.requests = []
+
+    def commands_called(self, name):
+        return [c for c in self.commands if c["command"] == name]
+
+    def post(self, url, data, headers=None):
+        data = json.loads(data)
+        if "request" in data:
+            commands = [data["request"]]
+        else:
+            commands = data["requests"]["request"]
+        self.requests.append(commands)
+
+        status = self.failures.pop(0) if self.failures else 200
+        if status >= 400:
+            return FakeResponse(status, {})
+
+        self.commands += commands
+        results = [
+            {
+                "requestSequence": c.get("requestSequence", "0"),
+                **getattr(self, "_" + c["command"])(c),
+            }
+            for c in commands
+        ]
+        if self.reverse_results:
+            results.reverse()
+        if "request" in data:
+            return FakeResponse(200, {"result": results[0]})
+        return FakeResponse(200, {"results": {"result": results}})
+
+    def _authenticateWithUserAndPass(self, command):
+        return {"success": 1, "sessionId": "session"}
+
+    def _listRelations(self, command):
+        return {
+            "success": 1,
+            "relations": {
+                code: {"website_id": str(fields["website_id"]), "code": code}
+                for code, fields in self.relations.items()
+            },
+        }
+
+    def _ReplaceRelation(self, command):
+        if command["fields"]["website_id"] in self.rejected:
+            return {
+                "success": 0,
+                "notifications": {"notification": ["Relation was rejected"]},
+            }
+        code = command.get("code")
+        if code is None:
+            code = str(self._next_code)
+            self._next_code += 1
+        self.relations[code] = command["fields"]
+        return {"success": 1, "code": code}
+
+    def _DeleteRelation(self, command):
+        if self.relations.pop(command["code"], None) is None:
+            return {
+                "success": 0,
+                "notifications": {"notification": ["Relation does not exist"]},
+            }
+        return {"success": 1}
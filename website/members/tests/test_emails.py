@@ -5,9 +5,10 @@ from freezegun import freeze_time
 
 from members import emails
 from members.models import Member, Profile, Membership
+from outbox import services as outbox_services
 
 
-@override_settings(SUSPEND_SIGNALS=True)
+@override_settings(SUSPEND_SIGNALS=True, OUTBOX_CONNECTIONS=1, OUTBOX_RATE_LIMIT=0)
 class EmailsTest(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -154,6 +155,7 @@ class EmailsTest(TestCase):
     @freeze_time("2017-10-01")
     def test_send_membership_announcement(self):
         emails.send_membership_announcement()
+        outbox_services.send_queued_messages()
 
         self.assertEqual(len(mail.outbox), 2)
         self.assertEqual(mail.outbox[0].to, ["test4@example.org"])
@@ -162,8 +164,10 @@ class EmailsTest(TestCase):
     @freeze_time("2017-10-01")
     def test_send_information_request(self):
         emails.send_information_request()
+        outbox_services.send_queued_messages()
 
         self.assertEqual(len(mail.outbox), 8)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
         self.assertEqual(mail.outbox[0].to, ["test1@example.org"])
         self.assertEqual(
             mail.outbox[0].subject, "[THALIA] Membership information check"
@@ -182,6 +186,7 @@ class EmailsTest(TestCase):
     @freeze_time("2018-08-15")
     def test_send_expiration_announcement(self):
         emails.send_expiration_announcement()
+        outbox_services.send_queued_messages()
 
         self.assertEqual(len(mail.outbox), 3)
         self.assertEqual(mail.outbox[0].to, ["test1@example.org"])
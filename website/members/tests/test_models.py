@@ -5,12 +5,14 @@ from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from members import models
-from members.models import Profile, Member
+from members.models import Profile, Member, profile
 
 
 def load_tests(loader, tests, ignore):
     """Load doctests."""
     tests.addTests(doctest.DocTestSuite(models))
+    tests.addTests(doctest.DocTestSuite(profile, optionflags=doctest.ELLIPSIS))
+    return tests
 
 
 @override_settings(SUSPEND_SIGNALS=True)
@@ -61,6 +63,16 @@ class MemberBirthdayTest(TestCase):
     def test_person_born_in_range_spanning_multiple_years(self):
         self._assert_thom("1992-12-31", "1995-01-01")
 
+    def test_leap_day_birthday(self):
+        Profile.objects.filter(user__first_name="Thom").update(
+            birthday="1992-02-29", birthday_key=229
+        )
+        self._assert_thom("2016-02-29", "2016-02-29")
+        self._assert_thom("2017-02-28", "2017-02-28")
+        self._assert_thom("2016-12-31", "2017-03-01")
+        self._assert_none("2016-02-28", "2016-02-28")
+        self._assert_none("2017-03-01", "2017-12-31")
+
 
 @override_settings(SUSPEND_SIGNALS=True)
 class MemberTest(TestCase):
@@ -86,6 +98,49 @@ class MemberTest(TestCase):
         m1.save()
         self.assertTrue(member.has_been_honorary_member())
 
+    def test_with_current_membership(self):
+        for membership_type in ("member", "benefactor", "honorary"):
+            with self.subTest(membership_type=membership_type):
+                expected = {
+                    m.pk
+                    for m in Member.objects.all()
+                    if m.current_membership
+                    and m.current_membership.type == membership_type
+                }
+                self.assertEqual(
+                    {
+                        m.pk
+                        for m in Member.objects.with_current_membership(membership_type)
+                    },
+                    expected,
+                )
+                self.assertEqual(
+                    {m.pk for m in Member.all_with_membership(membership_type)},
+                    expected,
+                )
+
+    def test_with_latest_membership(self):
+        expected = {m.pk: m.latest_membership for m in Member.objects.all()}
+        with self.assertNumQueries(1):
+            members = list(Member.objects.with_latest_membership())
+            for member in members:
+                self.assertEqual(member.latest_membership, expected[member.pk])
+                if expected[member.pk] is not None:
+                    self.assertEqual(
+                        member.latest_membership.type, expected[member.pk].type
+                    )
+
+    def test_with_latest_membership_same_since(self):
+        member = Member.objects.get(pk=1)
+        since = member.latest_membership.since
+        member.membership_set.create(type="benefactor", since=since)
+        newest = member.membership_set.create(type="honorary", since=since)
+
+        annotated = Member.objects.with_latest_membership().get(pk=member.pk)
+        self.assertEqual(annotated.latest_membership.pk, newest.pk)
+        self.assertEqual(annotated.latest_membership.type, newest.type)
+        self.assertEqual(member.latest_membership, newest)
+
 
 class MemberDisplayNameTest(TestCase):
     @classmethod
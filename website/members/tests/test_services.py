@@ -1,13 +1,26 @@
 from unittest import mock
 from datetime import timedelta, date
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from freezegun import freeze_time
 
+from requests import HTTPError
+
 from members import services
-from members.models import Member, Membership, Profile, EmailChange
+from members.models import (
+    ConscriboRelation,
+    Member,
+    Membership,
+    Profile,
+    EmailChange,
+)
 from members.services import gen_stats_year
+from members.tests.fake_conscribo import FakeConscriboSession
+from payments.models import BankAccount
+from utils.conscribo.api import ConscriboApi
 
 
 @freeze_time("2020-01-01")
@@ -177,3 +190,128 @@ class DataMinimisationTest(TestCase):
             processed = services.execute_data_minimisation(True)
             self.assertEqual(len(processed), 1)
             m.delete()
+
+
+class ConscriboSyncTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.members = []
+        for i in range(5):
+            member = Member.objects.create(
+                username=f"conscribo{i}",
+                first_name=f"Test{i}",
+                last_name="Example",
+                email=f"conscribo{i}@example.org",
+            )
+            Profile.objects.create(
+                user=member,
+                student_number=f"s000000{i}",
+                address_street="Street 1",
+                address_postal_code="1234 AB",
+                address_city="Nijmegen",
+                address_country="NL",
+            )
+            Membership.objects.create(
+                user=member, type=Membership.MEMBER, since=date(2020, 9, 1)
+            )
+            BankAccount.objects.create(
+                owner=member,
+                initials="T",
+                last_name="Example",
+                iban="NL91ABNA0417164300",
+            )
+            cls.members.append(member)
+
+    def setUp(self):
+        self.session = FakeConscriboSession(
+            {"1": {"website_id": 9999, "naam": "Former member"}}
+        )
+        self.api = ConscriboApi("account", "user", "password", session=self.session)
+        self.session.reset_calls()
+
+    def test_sync(self):
+        with CaptureQueriesContext(connection) as queries:
+            stats = services.sync_conscribo_relations(self.api, chunk_size=2)
+        self.assertEqual(
+            3, sum(q["sql"].startswith("SELECT") for q in queries.captured_queries)
+        )
+        self.assertEqual(
+            {"replaced": 5, "deleted": 1, "unchanged": 0, "failed": 0}, stats
+        )
+        self.assertEqual(
+            {m.pk for m in self.members},
+            {fields["website_id"] for fields in self.session.relations.values()},
+        )
+        # 1 list request, 3 chunks of replacements and 1 deletion
+        self.assertEqual(5, len(self.session.requests))
+        self.assertTrue(all(len(r) <= 2 for r in self.session.requests))
+
+        self.session.reset_calls()
+        stats = services.sync_conscribo_relations(self.api, chunk_size=2)
+        self.assertEqual(
+            {"replaced": 0, "deleted": 0, "unchanged": 5, "failed": 0}, stats
+        )
+        self.assertEqual(1, len(self.session.requests))
+
+    def test_sync_changes(self):
+        services.sync_conscribo_relations(self.api)
+        self.session.reset_calls()
+
+        self.members[0].email = "changed@example.org"
+        self.members[0].save()
+        self.session.relations.pop(
+            next(
+                code
+                for code, fields in self.session.relations.items()
+                if fields["website_id"] == self.members[1].pk
+            )
+        )
+        self.members[2].membership_set.update(until=date(2020, 9, 2))
+
+        stats = services.sync_conscribo_relations(self.api)
+        self.assertEqual(
+            {"replaced": 2, "deleted": 1, "unchanged": 2, "failed": 0}, stats
+        )
+        self.assertEqual(
+            {self.members[0].pk, self.members[1].pk},
+            {
+                c["fields"]["website_id"]
+                for c in self.session.commands_called("ReplaceRelation")
+            },
+        )
+        self.assertFalse(
+            ConscriboRelation.objects.filter(member=self.members[2]).exists()
+        )
+
+    def test_sync_results_out_of_order(self):
+        self.session.reverse_results = True
+        self.session.rejected = {self.members[0].pk}
+
+        stats = services.sync_conscribo_relations(self.api, chunk_size=2)
+
+        self.assertEqual(
+            {"replaced": 4, "deleted": 1, "unchanged": 0, "failed": 1}, stats
+        )
+        self.assertEqual(
+            {m.pk for m in self.members[1:]},
+            set(ConscriboRelation.objects.values_list("member", flat=True)),
+        )
+
+    @mock.patch("utils.conscribo.api.time.sleep")
+    def test_sync_retries(self, sleep):
+        self.session.failures = [200, 500, 500]
+        stats = services.sync_conscribo_relations(self.api, retries=2)
+        self.assertEqual(5, stats["replaced"])
+        self.assertEqual(2, sleep.call_count)
+
+    @mock.patch("utils.conscribo.api.time.sleep")
+    def test_sync_interrupted(self, sleep):
+        self.session.failures = [200, 200, 500, 500]
+        with self.assertRaises(HTTPError):
+            services.sync_conscribo_relations(self.api, chunk_size=2, retries=1)
+        self.assertEqual(2, ConscriboRelation.objects.count())
+
+        stats = services.sync_conscribo_relations(self.api, chunk_size=2)
+        self.assertEqual(
+            {"replaced": 3, "deleted": 1, "unchanged": 2, "failed": 0}, stats
+        )
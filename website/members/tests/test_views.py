@@ -1,6 +1,8 @@
 from datetime import date, timedelta
 
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
 from members.models import Member, Profile, Membership
 from members.views import MembersIndex
@@ -73,3 +75,45 @@ class MembersIndexText(TestCase):
         self.assertEqual(len(members), 3)
         for member in members:
             self.assertIn(member.id, {4, 5, 6})
+
+
+class BirthdayFeedTest(TestCase):
+    fixtures = ["members.json"]
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, start, end):
+        return self.client.get(
+            reverse("api:calendarjs:members:calendarjs-birthdays"),
+            {"start": start, "end": end},
+        )
+
+    def test_birthdays(self):
+        response = self._get("2016-01-01T00:00:00", "2018-12-31T00:00:00")
+        self.assertEqual(response.status_code, 200)
+        birthdays = [
+            (b["start"], b["title"]) for b in response.json() if b["isBirthday"]
+        ]
+        self.assertEqual(
+            birthdays,
+            [
+                ("2016-03-02", "Thom Wiggers"),
+                ("2017-03-02", "Thom Wiggers"),
+                ("2018-03-02", "Thom Wiggers"),
+            ],
+        )
+
+    def test_cached(self):
+        self._get("2016-03-01T00:00:00", "2016-03-31T00:00:00")
+        with self.assertNumQueries(0):
+            response = self._get("2016-03-01T00:00:00", "2016-03-31T00:00:00")
+        self.assertEqual(len(response.json()), 1)
+
+    def test_cache_invalidated(self):
+        self._get("2016-03-01T00:00:00", "2016-03-31T00:00:00")
+        Profile.objects.filter(show_birthday=True).first().save()
+        response = self._get("2016-03-01T00:00:00", "2016-03-31T00:00:00")
+        self.assertEqual(len(response.json()), 1)
+        with self.assertNumQueries(0):
+            self._get("2016-03-01T00:00:00", "2016-03-31T00:00:00")
@@ -5,12 +5,8 @@ from smtplib import SMTPException
 from django.conf import settings
 from django.core import mail
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import get_template
-from django.utils import translation, timezone
-from django.utils.timezone import make_aware
 
 from newsletters import services
-from partners.models import Partner
 
 logger = logging.getLogger(__name__)
 
@@ -18,46 +14,21 @@ logger = logging.getLogger(__name__)
 def send_newsletter(newsletter):
     """Send the newsletter as HTML and plaintext email.
 
+    The email is sent from the renders saved by ``services.save_to_disk``.
+
     :param newsletter: the newsletter to be send
     """
-    events = None
-    if newsletter.date:
-        datetime = (
-            make_aware(
-                timezone.datetime(
-                    year=newsletter.date.year,
-                    month=newsletter.date.month,
-                    day=newsletter.date.day,
-                )
-            )
-            if newsletter.date
-            else None
-        )
-        events = services.get_agenda(datetime)
-
     from_email = settings.NEWSLETTER_FROM_ADDRESS
-    html_template = get_template("newsletters/email.html")
-    text_template = get_template("newsletters/email.txt")
-
-    main_partner = Partner.objects.filter(is_main_partner=True).first()
-    local_partner = Partner.objects.filter(is_local_partner=True).first()
 
     with mail.get_connection() as connection:
         language = ("en", "English")
-        translation.activate(language[0])
 
         subject = "[THALIA] " + newsletter.title
 
-        context = {
-            "newsletter": newsletter,
-            "agenda_events": events,
-            "main_partner": main_partner,
-            "local_partner": local_partner,
-            "lang_code": language[0],
-        }
-
-        html_message = html_template.render(context)
-        text_message = text_template.render(context)
+        with open(services.artefact_path(newsletter.pk, language[0], "html")) as f:
+            html_message = f.read()
+        with open(services.artefact_path(newsletter.pk, language[0], "txt")) as f:
+            text_message = f.read()
 
         msg = EmailMultiAlternatives(
             subject=subject,
@@ -73,5 +44,3 @@ def send_newsletter(newsletter):
             logger.info("Sent %s newsletter", language[1])
         except SMTPException:
             logger.exception("Failed to send the %s newsletter", language[1])
-
-        translation.deactivate()
@@ -14,8 +14,27 @@ class Command(BaseCommand):
             default=False,
             help="Include newsletters that haven't been sent yet",
         )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            dest="force",
+            default=False,
+            help="Also render newsletters of which the files are up to date",
+        )
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=None,
+            help="Number of processes, defaults to the number of CPUs",
+        )
 
     def handle(self, *args, **options):
-        for n in models.Newsletter.objects.all():
-            if n.sent or options["include-unsent"]:
-                services.save_to_disk(n)
+        newsletters = models.Newsletter.objects.all()
+        if not options["include-unsent"]:
+            newsletters = newsletters.filter(sent=True)
+
+        rendered = services.save_all_to_disk(
+            newsletters, force=options["force"], max_workers=options["workers"]
+        )
+        self.stdout.write(f"Rendered {rendered} newsletters")
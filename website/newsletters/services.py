@@ -1,51 +1,190 @@
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Prefetch
+from django.forms.models import model_to_dict
 from django.template.loader import get_template
 from django.utils import translation, timezone
+from django.utils.timezone import make_aware
 
 from events.models import Event
-from members.models import Member
 from newsletters import emails
+from newsletters.models import Newsletter, NewsletterContent
 from partners.models import Partner
 from pushnotifications.models import Message, Category
 
 
-def write_to_file(pk, lang, html_message):
-    """Write newsletter to a file."""
-    cache_dir = os.path.join(settings.MEDIA_ROOT, "newsletters")
-    if not os.path.isdir(cache_dir):
-        os.makedirs(cache_dir)
+def _artefact_dir():
+    return os.path.join(settings.MEDIA_ROOT, "newsletters")
 
-    with open(os.path.join(cache_dir, f"{pk}_{lang}.html"), "w+") as cache_file:
-        cache_file.write(html_message)
 
+def artefact_path(pk, lang, extension="html"):
+    """Get the path of a rendered newsletter.
 
-def save_to_disk(newsletter):
-    """Write the newsletter as HTML to file (in all languages)."""
-    main_partner = Partner.objects.filter(is_main_partner=True).first()
-    local_partner = Partner.objects.filter(is_local_partner=True).first()
+    :param pk: the primary key of the newsletter
+    :param lang: the language of the render
+    :param extension: ``html`` or ``txt``
+    :return: the path of the file
+    """
+    return os.path.join(_artefact_dir(), f"{pk}_{lang}.{extension}")
+
+
+def _key_path(pk):
+    return os.path.join(_artefact_dir(), f"{pk}.key")
+
+
+def _with_content(newsletter):
+    """Get the newsletter with all its content prefetched."""
+    return Newsletter.objects.prefetch_related(
+        Prefetch(
+            "newslettercontent_set",
+            queryset=NewsletterContent.objects.select_related("newsletterevent"),
+        )
+    ).get(pk=newsletter.pk)
+
+
+def artefact_key(newsletter):
+    """Compute the key of the rendered newsletter.
+
+    The key changes whenever the newsletter or its content is changed,
+    which invalidates the stored renders.
+
+    :param newsletter: the newsletter, with its content prefetched
+    :return: the key
+    :rtype: str
+    """
+    content = [model_to_dict(newsletter, exclude=["sent", "send_date"])]
+    for item in newsletter.newslettercontent_set.all():
+        content.append(model_to_dict(item))
+        if hasattr(item, "newsletterevent"):
+            content.append(model_to_dict(item.newsletterevent))
+    return hashlib.sha256(
+        json.dumps(content, cls=DjangoJSONEncoder, sort_keys=True).encode()
+    ).hexdigest()
 
-    html_template = get_template("newsletters/email.html")
 
-    for language in settings.LANGUAGES:
-        translation.activate(language[0])
+def _stored_key(pk):
+    try:
+        with open(_key_path(pk)) as key_file:
+            return key_file.read()
+    except FileNotFoundError:
+        return None
 
-        context = {
-            "newsletter": newsletter,
-            "agenda_events": (
-                newsletter.newslettercontent_set.filter(newsletteritem=None).order_by(
-                    "newsletterevent__start_datetime"
+
+def render_is_current(newsletter):
+    """Check whether the stored renders of a newsletter are up to date.
+
+    :param newsletter: the newsletter
+    :return: True if the stored renders match the newsletter and its content
+    :rtype: bool
+    """
+    return _stored_key(newsletter.pk) == artefact_key(_with_content(newsletter))
+
+
+def render_newsletter(newsletter, languages=None):
+    """Render the newsletter as HTML and text.
+
+    The partners and the agenda are retrieved only once for all languages.
+
+    :param newsletter: the newsletter to render
+    :param languages: the language codes to render, defaults to all languages
+    :return: dict with ``(html, text)`` tuples for every language code
+    """
+    events = None
+    if newsletter.date:
+        events = list(
+            get_agenda(
+                make_aware(
+                    timezone.datetime(
+                        year=newsletter.date.year,
+                        month=newsletter.date.month,
+                        day=newsletter.date.day,
+                    )
                 )
-            ),
-            "main_partner": main_partner,
-            "local_partner": local_partner,
-            "lang_code": language[0],
-        }
+            )
+        )
+
+    context = {
+        "newsletter": newsletter,
+        "agenda_events": events,
+        "main_partner": Partner.objects.filter(is_main_partner=True).first(),
+        "local_partner": Partner.objects.filter(is_local_partner=True).first(),
+    }
+    html_template = get_template("newsletters/email.html")
+    text_template = get_template("newsletters/email.txt")
+
+    if languages is None:
+        languages = [language[0] for language in settings.LANGUAGES]
 
-        html_message = html_template.render(context)
+    renders = {}
+    for lang in languages:
+        with translation.override(lang):
+            context["lang_code"] = lang
+            renders[lang] = (
+                html_template.render(context),
+                text_template.render(context),
+            )
+    return renders
 
-        write_to_file(newsletter.pk, language[0], html_message)
+
+def write_to_file(path, content):
+    """Write a rendered newsletter to a file."""
+    if not os.path.isdir(_artefact_dir()):
+        os.makedirs(_artefact_dir())
+
+    with open(path, "w+") as cache_file:
+        cache_file.write(content)
+
+
+def save_to_disk(newsletter, force=False):
+    """Write the newsletter as HTML and text to file (in all languages).
+
+    Nothing is rendered if the stored files are still up to date.
+
+    :param newsletter: the newsletter to save
+    :param force: render the newsletter even if the stored files are up to date
+    :return: True if the newsletter was rendered
+    :rtype: bool
+    """
+    newsletter = _with_content(newsletter)
+    key = artefact_key(newsletter)
+    if not force and _stored_key(newsletter.pk) == key:
+        return False
+
+    for lang, (html_message, text_message) in render_newsletter(newsletter).items():
+        write_to_file(artefact_path(newsletter.pk, lang, "html"), html_message)
+        write_to_file(artefact_path(newsletter.pk, lang, "txt"), text_message)
+    write_to_file(_key_path(newsletter.pk), key)
+    return True
+
+
+def _save_to_disk(pk, force):
+    return save_to_disk(Newsletter.objects.get(pk=pk), force)
+
+
+def save_all_to_disk(newsletters, force=False, max_workers=None):
+    """Write many newsletters to file in a pool of processes.
+
+    :param newsletters: the newsletters to save
+    :param force: render the newsletters even if they are up to date
+    :param max_workers: the number of processes, defaults to the number of
+                        CPUs, 1 renders the newsletters in this process
+    :return: the number of newsletters that were rendered
+    :rtype: int
+    """
+    pks = [newsletter.pk for newsletter in newsletters]
+    if max_workers == 1:
+        return sum(_save_to_disk(pk, force) for pk in pks)
+
+    # The processes open their own database connections
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(_save_to_disk, pks, [force] * len(pks)))
 
 
 def get_agenda(start_date):
@@ -61,6 +200,7 @@ def get_agenda(start_date):
 
 
 def send_newsletter(newsletter):
+    save_to_disk(newsletter)
     emails.send_newsletter(newsletter)
     newsletter.sent = True
     newsletter.save()
@@ -69,8 +209,6 @@ def send_newsletter(newsletter):
         body="Tap to view",
         url=settings.BASE_URL + newsletter.get_absolute_url(),
         category=Category.objects.get(key=Category.NEWSLETTER),
+        audience=Message.CURRENT_MEMBERS,
     )
-    message.users.set(Member.current_members.all())
     message.send()
-
-    save_to_disk(newsletter)
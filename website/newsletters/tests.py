@@ -1,5 +1,7 @@
 """Defines tests for the newsletters package."""
 import doctest
+import os
+import tempfile
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
@@ -10,7 +12,8 @@ from django.urls import reverse
 from django.utils import timezone
 
 from members.models import Membership, Profile
-from newsletters.models import Newsletter, NewsletterEvent
+from newsletters import services
+from newsletters.models import Newsletter, NewsletterEvent, NewsletterItem
 from newsletters.templatetags import listutil
 
 
@@ -184,3 +187,77 @@ class NewsletterEventsTest(TestCase):
             m.clean()
         m.end_datetime = timezone.now().date().replace(year=2014, month=3, day=1)
         m.clean()
+
+
+class NewsletterRenderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.newsletter = Newsletter.objects.create(
+            title="testletter", description="testdesc", sent=True,
+        )
+        NewsletterItem.objects.create(
+            title="testitem", description="itemdesc", newsletter=cls.newsletter
+        )
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = self.settings(
+            MEDIA_ROOT=media_root.name, SENDFILE_ROOT=media_root.name
+        )
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def test_save_to_disk(self):
+        self.assertTrue(services.save_to_disk(self.newsletter))
+        with open(services.artefact_path(self.newsletter.pk, "en", "html")) as f:
+            self.assertIn("TESTITEM", f.read())
+        with open(services.artefact_path(self.newsletter.pk, "en", "txt")) as f:
+            self.assertIn("itemdesc", f.read())
+
+        self.assertFalse(services.save_to_disk(self.newsletter))
+        self.assertTrue(services.save_to_disk(self.newsletter, force=True))
+
+        NewsletterItem.objects.create(
+            title="otheritem", description="itemdesc", newsletter=self.newsletter
+        )
+        self.assertTrue(services.save_to_disk(self.newsletter))
+        with open(services.artefact_path(self.newsletter.pk, "en", "html")) as f:
+            self.assertIn("OTHERITEM", f.read())
+
+    def test_save_all_to_disk(self):
+        concept = Newsletter.objects.create(
+            title="concept", description="testdesc", sent=False,
+        )
+        self.assertEqual(
+            services.save_all_to_disk([self.newsletter, concept], max_workers=1), 2
+        )
+        self.assertEqual(
+            services.save_all_to_disk([self.newsletter, concept], max_workers=1), 0
+        )
+
+    def test_preview(self):
+        path = services.artefact_path(self.newsletter.pk, "en")
+        self.assertFalse(os.path.isfile(path))
+        response = self.client.get(self.newsletter.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(os.path.isfile(path))
+
+    def test_preview_stale(self):
+        self.client.get(self.newsletter.get_absolute_url())
+        NewsletterItem.objects.create(
+            title="otheritem", description="itemdesc", newsletter=self.newsletter
+        )
+        response = self.client.get(self.newsletter.get_absolute_url())
+        self.assertIn(b"OTHERITEM", b"".join(response.streaming_content))
+
+    def test_preview_concept_stale(self):
+        concept = Newsletter.objects.create(
+            title="concept", description="testdesc", sent=False,
+        )
+        services.save_to_disk(concept)
+        NewsletterItem.objects.create(
+            title="otheritem", description="itemdesc", newsletter=concept
+        )
+        response = self.client.get(concept.get_absolute_url())
+        self.assertIn(b"OTHERITEM", response.content)
@@ -1,16 +1,15 @@
 """Views provided by the newsletters package."""
 import os
 
-from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import permission_required
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.translation import activate, get_language_info
 from django_sendfile import sendfile
 
 from newsletters import services
 from newsletters.models import Newsletter
-from partners.models import Partner
 
 
 def preview(request, pk, lang=None):
@@ -32,27 +31,18 @@ def preview(request, pk, lang=None):
             # Language code not recognised by get_language_info
             pass
 
-    # Send cached file, if it exists
-    file_path = os.path.join(
-        settings.MEDIA_ROOT, "newsletters", f"{pk}_{lang_code}.html"
-    )
-    if os.path.isfile(file_path):
-        return sendfile(request, file_path)
-
     newsletter = get_object_or_404(Newsletter, pk=pk)
-    events = services.get_agenda(newsletter.date) if newsletter.date else None
+    file_path = services.artefact_path(pk, lang_code)
+    if newsletter.sent:
+        # The newsletter is only rendered again if the saved render is stale
+        services.save_to_disk(newsletter)
+        if os.path.isfile(file_path):
+            return sendfile(request, file_path)
+    elif os.path.isfile(file_path) and services.render_is_current(newsletter):
+        return sendfile(request, file_path)
 
-    return render(
-        request,
-        "newsletters/email.html",
-        {
-            "newsletter": newsletter,
-            "agenda_events": events,
-            "main_partner": Partner.objects.filter(is_main_partner=True).first(),
-            "local_partner": Partner.objects.filter(is_local_partner=True).first(),
-            "lang_code": lang_code,
-        },
-    )
+    html_message, _ = services.render_newsletter(newsletter, [lang_code])[lang_code]
+    return HttpResponse(html_message)
 
 
 @staff_member_required
@@ -0,0 +1,29 @@
+"""Registers admin interfaces for the outbox module."""
+from django.contrib import admin, messages
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Manage the messages in the outbox."""
+
+    list_display = ("subject", "to", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("subject", "to")
+    actions = ["retry"]
+    readonly_fields = [field.name for field in OutboxMessage._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def retry(self, request, queryset):
+        """Deliver failed messages again."""
+        count = queryset.filter(status=OutboxMessage.FAILED).update(
+            status=OutboxMessage.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        messages.success(request, _("Retrying {} messages.").format(count))
+
+    retry.short_description = _("Retry failed messages")
@@ -0,0 +1,10 @@
+"""Configuration for the outbox package."""
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxConfig(AppConfig):
+    """AppConfig for the outbox package."""
+
+    name = "outbox"
+    verbose_name = _("Outbox")
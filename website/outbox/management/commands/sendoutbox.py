@@ -0,0 +1,18 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from outbox import services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """This command can be run periodically to deliver the queued emails."""
+
+    def handle(self, *args, **options):
+        """Deliver the queued emails and delete old delivered ones."""
+        sent = services.send_queued_messages()
+        if sent:
+            logger.info("Delivered %d queued emails", sent)
+        services.delete_sent_messages()
@@ -0,0 +1,55 @@
+"""The models defined by the outbox package."""
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxMessage(models.Model):
+    """Describes an email that is waiting to be delivered."""
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (PENDING, _("Pending")),
+        (SENDING, _("Sending")),
+        (SENT, _("Sent")),
+        (FAILED, _("Failed")),
+    )
+
+    created_at = models.DateTimeField(_("created at"), default=timezone.now)
+
+    subject = models.CharField(_("subject"), max_length=255)
+
+    body = models.TextField(_("body"))
+
+    html_body = models.TextField(_("HTML body"), blank=True)
+
+    from_email = models.CharField(_("from"), max_length=255)
+
+    to = models.JSONField(_("to"), default=list)
+
+    bcc = models.JSONField(_("bcc"), default=list, blank=True)
+
+    status = models.CharField(
+        _("status"), max_length=8, choices=STATUS_CHOICES, default=PENDING
+    )
+
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+
+    next_attempt_at = models.DateTimeField(_("next attempt at"), default=timezone.now)
+
+    sent_at = models.DateTimeField(_("sent at"), blank=True, null=True)
+
+    last_error = models.TextField(_("last error"), blank=True)
+
+    def __str__(self):
+        return f"{self.subject} ({', '.join(self.to)})"
+
+    class Meta:
+        verbose_name = _("outbox message")
+        verbose_name_plural = _("outbox messages")
+        ordering = ("created_at", "pk")
+        indexes = [models.Index(fields=("status", "next_attempt_at"))]
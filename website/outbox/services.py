@@ -0,0 +1,227 @@
+"""The services defined by the outbox package."""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from outbox.models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 100
+RETRY_DELAY = timezone.timedelta(minutes=5)
+# Messages claimed by a run that did not finish are delivered again after this
+CLAIM_TIMEOUT = timezone.timedelta(hours=1)
+
+
+def queue_messages(messages):
+    """Queue emails to be delivered by :func:`send_queued_messages`.
+
+    :param messages: the ``EmailMessage`` objects, HTML alternatives of
+                     ``EmailMultiAlternatives`` are kept
+    :return: the queued messages
+    :rtype: list
+    """
+    outbox_messages = []
+    for message in messages:
+        html_body = ""
+        for content, mimetype in getattr(message, "alternatives", []):
+            if mimetype == "text/html":
+                html_body = content
+        outbox_messages.append(
+            OutboxMessage(
+                subject=message.subject,
+                body=message.body,
+                html_body=html_body,
+                from_email=message.from_email,
+                to=list(message.to),
+                bcc=list(message.bcc),
+            )
+        )
+    return OutboxMessage.objects.bulk_create(outbox_messages, batch_size=500)
+
+
+class RateLimiter:
+    """Spaces out events over all threads to at most ``rate`` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        """Block until the next event is allowed."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ConnectionPool:
+    """Keeps a mail connection open for every thread that uses it."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def get(self):
+        """Get the open connection of the current thread.
+
+        :return: the connection
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = mail.get_connection()
+            connection.open()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def discard(self):
+        """Close the connection of the current thread, after it failed."""
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            with suppress(SMTPException, OSError):
+                connection.close()
+
+    def close(self):
+        """Close all connections."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            with suppress(SMTPException, OSError):
+                connection.close()
+
+
+def _deliver(message, pool, limiter):
+    limiter.wait()
+    connection = pool.get()
+    email = mail.EmailMultiAlternatives(
+        message.subject,
+        message.body,
+        message.from_email,
+        message.to,
+        bcc=message.bcc,
+        connection=connection,
+    )
+    if message.html_body:
+        email.attach_alternative(message.html_body, "text/html")
+    try:
+        email.send()
+    except (SMTPException, OSError):
+        pool.discard()
+        raise
+
+
+def _failed(message, error):
+    message.attempts += 1
+    message.last_error = str(error)
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboxMessage.FAILED
+    else:
+        message.status = OutboxMessage.PENDING
+        message.next_attempt_at = timezone.now() + RETRY_DELAY * 2 ** (
+            message.attempts - 1
+        )
+    message.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+    logger.warning("Could not deliver outbox message %s: %s", message.pk, error)
+
+
+def _claim_messages():
+    """Claim the next chunk of emails that are due.
+
+    Rows that are locked by another run are skipped, and the claimed rows
+    are marked as sending, so every email is delivered by a single run.
+
+    :return: the claimed messages
+    :rtype: list
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pks = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=OutboxMessage.PENDING) | Q(status=OutboxMessage.SENDING),
+                next_attempt_at__lte=now,
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)[:CHUNK_SIZE]
+        )
+        OutboxMessage.objects.filter(pk__in=pks).update(
+            status=OutboxMessage.SENDING, next_attempt_at=now + CLAIM_TIMEOUT
+        )
+    return list(OutboxMessage.objects.filter(pk__in=pks).order_by("pk"))
+
+
+def send_queued_messages():
+    """Deliver the queued emails that are due.
+
+    The emails are claimed in chunks and delivered by a pool of threads,
+    which each keep a mail connection open, at most ``OUTBOX_RATE_LIMIT``
+    per second. The status of every email is saved as soon as it has been
+    delivered, so an interrupted run does not deliver it again. Emails that
+    cannot be delivered are retried later with an increasing delay, until
+    they failed ``OUTBOX_MAX_ATTEMPTS`` times.
+
+    :return: the number of delivered emails
+    :rtype: int
+    """
+    pool = ConnectionPool()
+    limiter = RateLimiter(settings.OUTBOX_RATE_LIMIT)
+    sent = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=settings.OUTBOX_CONNECTIONS) as executor:
+            while True:
+                chunk = _claim_messages()
+                if not chunk:
+                    break
+
+                futures = [
+                    (message, executor.submit(_deliver, message, pool, limiter))
+                    for message in chunk
+                ]
+                for message, future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:  # pylint: disable=broad-except
+                        _failed(message, e)
+                        continue
+                    OutboxMessage.objects.filter(pk=message.pk).update(
+                        status=OutboxMessage.SENT,
+                        sent_at=timezone.now(),
+                        attempts=F("attempts") + 1,
+                    )
+                    sent += 1
+    finally:
+        pool.close()
+    return sent
+
+
+def delete_sent_messages(days=30):
+    """Delete the emails that were delivered some time ago.
+
+    :param days: the number of days to keep delivered emails
+    :return: the number of deleted emails
+    :rtype: int
+    """
+    deleted, _ = OutboxMessage.objects.filter(
+        status=OutboxMessage.SENT,
+        sent_at__lt=timezone.now() - timezone.timedelta(days=days),
+    ).delete()
+    return deleted
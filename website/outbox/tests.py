@@ -0,0 +1,147 @@
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from outbox import services
+from outbox.models import OutboxMessage
+
+
+@override_settings(OUTBOX_CONNECTIONS=2, OUTBOX_RATE_LIMIT=0, OUTBOX_MAX_ATTEMPTS=2)
+class OutboxServicesTest(TestCase):
+    def _queue(self, count):
+        messages = []
+        for i in range(count):
+            message = mail.EmailMultiAlternatives(
+                f"Subject {i}",
+                "Body",
+                "from@example.org",
+                [f"test{i}@example.org"],
+                bcc=["board@example.org"],
+            )
+            message.attach_alternative("<p>Body</p>", "text/html")
+            messages.append(message)
+        return services.queue_messages(messages)
+
+    def test_queue_messages(self):
+        with self.assertNumQueries(1):
+            self._queue(3)
+
+        message = OutboxMessage.objects.first()
+        self.assertEqual("Subject 0", message.subject)
+        self.assertEqual(["test0@example.org"], message.to)
+        self.assertEqual(["board@example.org"], message.bcc)
+        self.assertEqual("<p>Body</p>", message.html_body)
+        self.assertEqual(OutboxMessage.PENDING, message.status)
+
+    def test_send_queued_messages(self):
+        self._queue(services.CHUNK_SIZE + 1)
+
+        with mock.patch("django.core.mail.get_connection") as get_connection:
+            get_connection.side_effect = locmem.EmailBackend
+            self.assertEqual(services.CHUNK_SIZE + 1, services.send_queued_messages())
+        self.assertLessEqual(get_connection.call_count, 2)
+
+        self.assertEqual(services.CHUNK_SIZE + 1, len(mail.outbox))
+        self.assertEqual(
+            {f"test{i}@example.org" for i in range(services.CHUNK_SIZE + 1)},
+            {message.to[0] for message in mail.outbox},
+        )
+        self.assertEqual(("<p>Body</p>", "text/html"), mail.outbox[0].alternatives[0])
+        self.assertFalse(
+            OutboxMessage.objects.exclude(status=OutboxMessage.SENT).exists()
+        )
+
+        self.assertEqual(0, services.send_queued_messages())
+
+    def test_retry(self):
+        self._queue(2)
+        failing = OutboxMessage.objects.get(subject="Subject 1")
+        send = mail.EmailMessage.send
+
+        def send_or_fail(message, *args, **kwargs):
+            if message.subject == failing.subject:
+                raise SMTPException("Unavailable")
+            return send(message, *args, **kwargs)
+
+        with mock.patch("django.core.mail.EmailMessage.send", send_or_fail):
+            self.assertEqual(1, services.send_queued_messages())
+            failing.refresh_from_db()
+            self.assertEqual(OutboxMessage.PENDING, failing.status)
+            self.assertEqual(1, failing.attempts)
+            self.assertEqual("Unavailable", failing.last_error)
+            self.assertGreater(failing.next_attempt_at, timezone.now())
+
+            self.assertEqual(0, services.send_queued_messages())
+
+            with freeze_time(failing.next_attempt_at):
+                self.assertEqual(0, services.send_queued_messages())
+            failing.refresh_from_db()
+            self.assertEqual(OutboxMessage.FAILED, failing.status)
+            self.assertEqual(2, failing.attempts)
+
+        self.assertEqual(["test0@example.org"], mail.outbox[0].to)
+
+    def test_unexpected_error(self):
+        self._queue(3)
+        send = mail.EmailMessage.send
+
+        def send_or_fail(message, *args, **kwargs):
+            if message.subject == "Subject 1":
+                raise ValueError("Invalid address")
+            return send(message, *args, **kwargs)
+
+        with mock.patch("django.core.mail.EmailMessage.send", send_or_fail):
+            self.assertEqual(2, services.send_queued_messages())
+
+        failing = OutboxMessage.objects.get(subject="Subject 1")
+        self.assertEqual(OutboxMessage.PENDING, failing.status)
+        self.assertEqual("Invalid address", failing.last_error)
+        self.assertEqual(
+            2, OutboxMessage.objects.filter(status=OutboxMessage.SENT).count()
+        )
+        self.assertEqual(2, len(mail.outbox))
+
+    def test_claimed_messages(self):
+        self._queue(2)
+        claimed, stale = OutboxMessage.objects.order_by("pk")
+        OutboxMessage.objects.filter(pk=claimed.pk).update(
+            status=OutboxMessage.SENDING,
+            next_attempt_at=timezone.now() + services.CLAIM_TIMEOUT,
+        )
+        OutboxMessage.objects.filter(pk=stale.pk).update(
+            status=OutboxMessage.SENDING,
+            next_attempt_at=timezone.now() - timezone.timedelta(minutes=1),
+        )
+
+        self.assertEqual(1, services.send_queued_messages())
+
+        self.assertEqual(stale.to, mail.outbox[0].to)
+        claimed.refresh_from_db()
+        self.assertEqual(OutboxMessage.SENDING, claimed.status)
+
+    def test_rate_limiter(self):
+        limiter = services.RateLimiter(rate=100)
+        with mock.patch("time.sleep") as sleep:
+            limiter.wait()
+            limiter.wait()
+        sleep.assert_called_once()
+        self.assertAlmostEqual(0.01, sleep.call_args[0][0], places=2)
+
+    def test_command(self):
+        self._queue(2)
+        old = OutboxMessage.objects.last()
+        OutboxMessage.objects.filter(pk=old.pk).update(
+            status=OutboxMessage.SENT,
+            sent_at=timezone.now() - timezone.timedelta(days=31),
+        )
+
+        call_command("sendoutbox")
+
+        self.assertEqual(1, len(mail.outbox))
+        self.assertFalse(OutboxMessage.objects.filter(pk=old.pk).exists())
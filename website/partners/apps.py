@@ -7,3 +7,12 @@ class PartnersConfig(AppConfig):
 
     name = "partners"
     verbose_name = _("Partners")
+
+    def ready(self):
+        """Invalidate the cached partner banners when the partners change."""
+        # pylint: disable=import-outside-toplevel
+        from utils.cache import invalidate_on_change
+        from .models import Partner
+        from .services import PARTNERS_CACHE_TAG
+
+        invalidate_on_change(Partner, PARTNERS_CACHE_TAG)
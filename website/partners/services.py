@@ -0,0 +1,81 @@
+"""The services defined by the partners package."""
+import itertools
+from random import sample
+
+from django.conf import settings
+
+from partners.models import Partner
+from utils import cache
+from utils.media.services import (
+    generate_thumbnails,
+    get_thumbnail_paths,
+    get_thumbnail_url,
+    is_thumbnail_outdated,
+)
+
+PARTNERS_CACHE_TAG = "partners"
+PARTNERS_CACHE_TIMEOUT = 60 * 60
+
+BANNERS_PER_PAGE = 4
+
+_banner_counter = itertools.count()
+
+
+def _logo_url(logo):
+    """Get the url of the thumbnail of a logo, generating it if needed.
+
+    The url is cached, so it must not point to the generate-thumbnail
+    route, which every page would then be redirected through.
+    """
+    size = settings.THUMBNAIL_SIZES["medium"]
+    full_original_path, full_thumb_path = get_thumbnail_paths(logo, size, fit=False)
+    generated = not is_thumbnail_outdated(full_original_path, full_thumb_path)
+    if not generated:
+        job = (full_original_path, full_thumb_path, size, False)
+        generated = next(generate_thumbnails([job], max_workers=1))
+    return get_thumbnail_url(logo, size, fit=False, generated=generated)
+
+
+def _banner_partners():
+    partners = list(Partner.objects.filter(is_active=True).only("name", "slug", "logo"))
+    return [
+        {
+            "name": partner.name,
+            "slug": partner.slug,
+            "logo_url": _logo_url(partner.logo),
+        }
+        for partner in sample(partners, len(partners))
+    ]
+
+
+def get_banner_partners():
+    """Get the active partners in the order their banners are shown.
+
+    The partners and the urls of their logos are cached in a random order,
+    until a partner changes.
+
+    :return: the names, slugs and logo urls of the partners
+    :rtype: list
+    """
+    return cache.get_or_set(
+        "partner_banners",
+        _banner_partners,
+        tags=[PARTNERS_CACHE_TAG],
+        timeout=PARTNERS_CACHE_TIMEOUT,
+    )
+
+
+def get_rotated_banner_partners():
+    """Get the partners of which the banners are shown on the next page.
+
+    Every page shows the next partners of the cached order, so all partners
+    are shown equally often without storing anything per visitor.
+
+    :return: at most ``BANNERS_PER_PAGE`` partners
+    :rtype: list
+    """
+    partners = get_banner_partners()
+    if len(partners) <= BANNERS_PER_PAGE:
+        return partners
+    start = next(_banner_counter) * BANNERS_PER_PAGE % len(partners)
+    return (partners[start:] + partners[:start])[:BANNERS_PER_PAGE]
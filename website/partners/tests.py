@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+
+from partners import services
+from partners.models import Partner
+
+
+class PartnerBannersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(6):
+            Partner.objects.create(
+                is_active=True,
+                name=f"Partner {i}",
+                slug=f"partner-{i}",
+                logo="public/partners/logos/logo.png",
+                address="Heyendaalseweg 135",
+                zip_code="6525AJ",
+                city="Nijmegen",
+                country="NL",
+            )
+        Partner.objects.create(
+            name="Inactive",
+            slug="inactive",
+            logo="public/partners/logos/logo.png",
+            address="Heyendaalseweg 135",
+            zip_code="6525AJ",
+            city="Nijmegen",
+            country="NL",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rotation(self):
+        services.get_rotated_banner_partners()
+
+        shown = []
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                partners = services.get_rotated_banner_partners()
+                self.assertEqual(services.BANNERS_PER_PAGE, len(partners))
+                shown += [partner["slug"] for partner in partners]
+        self.assertEqual({f"partner-{i}" for i in range(6)}, set(shown))
+        self.assertEqual(2, shown.count("partner-0"))
+
+    def test_invalidated(self):
+        self.assertEqual(6, len(services.get_banner_partners()))
+        Partner.objects.filter(slug="inactive").get().delete()
+        partner = Partner.objects.get(slug="partner-0")
+        partner.is_active = False
+        partner.save()
+        self.assertEqual(5, len(services.get_banner_partners()))
+
+    def test_logo_thumbnail_generated(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        logo = os.path.join(media_root.name, "public/partners/logos/logo.png")
+        os.makedirs(os.path.dirname(logo))
+        Image.new("RGB", (800, 400)).save(logo)
+
+        with override_settings(MEDIA_ROOT=media_root.name):
+            partners = services.get_banner_partners()
+
+        for partner in partners:
+            self.assertTrue(partner["logo_url"].startswith(settings.MEDIA_URL))
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(
+                    media_root.name,
+                    "public/thumbnails",
+                    f"{settings.THUMBNAIL_SIZES['medium']}_0",
+                    "partners/logos/logo.png",
+                )
+            )
+        )
+
+    def test_render_without_session(self):
+        request = RequestFactory().get("/")
+        template = Template("{% load partner_banners %}{% render_partner_banners %}")
+
+        rendered = template.render(Context({"request": request}))
+
+        self.assertEqual(services.BANNERS_PER_PAGE, rendered.count("<img"))
+        self.assertNotIn("Inactive", rendered)
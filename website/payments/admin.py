@@ -1,5 +1,4 @@
 """Registers admin interfaces for the payments module."""
-import csv
 from collections import OrderedDict
 
 from django.contrib import admin, messages
@@ -7,7 +6,7 @@ from django.contrib.admin import ModelAdmin
 from django.contrib.admin.utils import model_ngettext
 from django.db.models import QuerySet
 from django.db.models.query_utils import Q
-from django.http import HttpResponse, HttpRequest
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.urls import path, reverse
 from django.utils import timezone
 from django.utils.html import format_html
@@ -16,6 +15,7 @@ from django.utils.translation import gettext_lazy as _
 
 from payments import services, admin_views
 from payments.forms import BankAccountAdminForm, BatchPaymentInlineAdminForm
+from utils.export import export_response
 from .models import Payment, BankAccount, Batch, PaymentUser
 
 
@@ -85,6 +85,7 @@ class PaymentAdmin(admin.ModelAdmin):
         "add_to_new_batch",
         "add_to_last_batch",
         "export_csv",
+        "export_xlsx",
     ]
 
     @staticmethod
@@ -234,15 +235,13 @@ class PaymentAdmin(admin.ModelAdmin):
         ]
         return custom_urls + urls
 
-    def export_csv(self, request: HttpRequest, queryset: QuerySet) -> HttpResponse:
-        """Export a CSV of payments.
+    @staticmethod
+    def _export(queryset: QuerySet, file_format: str) -> StreamingHttpResponse:
+        """Stream an export of payments.
 
-        :param request: Request
         :param queryset: Items to be exported
+        :param file_format: Extension of the file format
         """
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment;filename="payments.csv"'
-        writer = csv.writer(response)
         headers = [
             _("created"),
             _("amount"),
@@ -252,25 +251,68 @@ class PaymentAdmin(admin.ModelAdmin):
             _("payer name"),
             _("notes"),
         ]
-        writer.writerow([capfirst(x) for x in headers])
-        for payment in queryset:
-            writer.writerow(
-                [
-                    payment.created_at,
-                    payment.amount,
-                    payment.get_type_display(),
-                    payment.processed_by.get_full_name()
-                    if payment.processed_by
-                    else "-",
-                    payment.paid_by.pk if payment.paid_by else "-",
-                    payment.paid_by.get_full_name() if payment.paid_by else "-",
-                    payment.notes,
-                ]
-            )
-        return response
+        types = dict(Payment.PAYMENT_TYPE)
+
+        def _full_name(first_name, last_name):
+            return f"{first_name} {last_name}".strip()
+
+        rows = (
+            [
+                row["created_at"],
+                row["amount"],
+                types.get(row["type"], row["type"]),
+                _full_name(
+                    row["processed_by__first_name"], row["processed_by__last_name"]
+                )
+                if row["processed_by"]
+                else "-",
+                row["paid_by"] if row["paid_by"] else "-",
+                _full_name(row["paid_by__first_name"], row["paid_by__last_name"])
+                if row["paid_by"]
+                else "-",
+                row["notes"],
+            ]
+            for row in queryset.values(
+                "created_at",
+                "amount",
+                "type",
+                "processed_by",
+                "processed_by__first_name",
+                "processed_by__last_name",
+                "paid_by",
+                "paid_by__first_name",
+                "paid_by__last_name",
+                "notes",
+            ).iterator(chunk_size=2000)
+        )
+        return export_response(
+            "payments", [capfirst(x) for x in headers], rows, file_format
+        )
+
+    def export_csv(
+        self, request: HttpRequest, queryset: QuerySet
+    ) -> StreamingHttpResponse:
+        """Export a CSV of payments.
+
+        :param request: Request
+        :param queryset: Items to be exported
+        """
+        return self._export(queryset, "csv")
 
     export_csv.short_description = _("Export")
 
+    def export_xlsx(
+        self, request: HttpRequest, queryset: QuerySet
+    ) -> StreamingHttpResponse:
+        """Export an XLSX of payments.
+
+        :param request: Request
+        :param queryset: Items to be exported
+        """
+        return self._export(queryset, "xlsx")
+
+    export_xlsx.short_description = _("Export as XLSX")
+
 
 class ValidAccountFilter(admin.SimpleListFilter):
     """Filter the memberships by whether they are active or not."""
@@ -347,6 +389,8 @@ class BatchAdmin(admin.ModelAdmin):
         "withdrawal_date",
         "processed",
         "processing_date",
+        "notices_sent",
+        "notices_completed",
         "total_amount",
     )
     search_fields = (
@@ -360,6 +404,8 @@ class BatchAdmin(admin.ModelAdmin):
             "id",
             "processed",
             "processing_date",
+            "notices_sent",
+            "notices_completed",
             "total_amount",
         )
         if obj and obj.processed:
@@ -394,6 +440,13 @@ class BatchAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(admin_views.BatchExportAdminView.as_view()),
                 name="payments_batch_export",
             ),
+            path(
+                "<int:pk>/export-sepa/",
+                self.admin_site.admin_view(
+                    admin_views.BatchSepaExportAdminView.as_view()
+                ),
+                name="payments_batch_export_sepa",
+            ),
             path(
                 "<int:pk>/export-topic/",
                 self.admin_site.admin_view(
@@ -507,10 +560,9 @@ class BankAccountAdmin(admin.ModelAdmin):
 
     set_last_used.short_description = _("Update the last used date")
 
-    def export_csv(self, request: HttpRequest, queryset: QuerySet) -> HttpResponse:
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment;filename="accounts.csv"'
-        writer = csv.writer(response)
+    def export_csv(
+        self, request: HttpRequest, queryset: QuerySet
+    ) -> StreamingHttpResponse:
         headers = [
             _("created"),
             _("name"),
@@ -521,21 +573,42 @@ class BankAccountAdmin(admin.ModelAdmin):
             _("valid until"),
             _("signature"),
         ]
-        writer.writerow([capfirst(x) for x in headers])
-        for account in queryset:
-            writer.writerow(
-                [
-                    account.created_at,
-                    account.name,
-                    account.mandate_no,
-                    account.iban,
-                    account.bic or "",
-                    account.valid_from or "",
-                    account.valid_until or "",
-                    account.signature or "",
-                ]
+        rows = (
+            [
+                created_at,
+                f"{initials} {last_name}",
+                mandate_no,
+                iban,
+                bic or "",
+                valid_from or "",
+                valid_until or "",
+                signature or "",
+            ]
+            for (
+                created_at,
+                initials,
+                last_name,
+                mandate_no,
+                iban,
+                bic,
+                valid_from,
+                valid_until,
+                signature,
+            ) in queryset.values_list(
+                "created_at",
+                "initials",
+                "last_name",
+                "mandate_no",
+                "iban",
+                "bic",
+                "valid_from",
+                "valid_until",
+                "signature",
+            ).iterator(
+                chunk_size=2000
             )
-        return response
+        )
+        return export_response("accounts", [capfirst(x) for x in headers], rows)
 
     export_csv.short_description = _("Export")
 
@@ -1,18 +1,18 @@
 """Admin views provided by the payments package."""
-import csv
+from decimal import Decimal
 
 from django.apps import apps
 from django.contrib import messages
 from django.contrib.admin.utils import model_ngettext
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import permission_required
-from django.db.models import Sum, Count, Min, Max
-from django.http import HttpResponse
+from django.db.models import Sum, Count, Min, Max, OuterRef, Subquery
 from django.core.exceptions import (
     SuspiciousOperation,
     DisallowedRedirect,
     PermissionDenied,
 )
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect, get_object_or_404, render
 from django.utils import timezone
 from django.utils.text import capfirst
@@ -22,8 +22,9 @@ from django.utils.translation import gettext_lazy as _
 from django.views import View
 from sentry_sdk import capture_exception
 
-from payments import services, payables
-from .models import Payment, Batch, PaymentUser
+from payments import services, payables, sepa
+from utils.export import export_response
+from .models import Payment, Batch, BankAccount
 
 
 @method_decorator(staff_member_required, name="dispatch")
@@ -105,6 +106,9 @@ class BatchProcessAdminView(View):
                 request,
                 _("Successfully processed {}.").format(model_ngettext(batch, 1)),
             )
+            messages.info(
+                request, _("The withdrawal notices will be sent in the background."),
+            )
 
         if "next" in request.POST:
             return redirect(request.POST["next"])
@@ -122,9 +126,6 @@ class BatchExportAdminView(View):
     def post(self, request, *args, **kwargs):
         batch = Batch.objects.get(pk=kwargs["pk"])
 
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment;filename="batch.csv"'
-        writer = csv.writer(response)
         headers = [
             _("Account holder"),
             _("IBAN"),
@@ -133,23 +134,68 @@ class BatchExportAdminView(View):
             _("Description"),
             _("Mandate Date"),
         ]
-        writer.writerow([capfirst(x) for x in headers])
-
-        member_rows = batch.payments_set.values("paid_by").annotate(total=Sum("amount"))
-
-        for row in member_rows:
-            member = PaymentUser.objects.get(id=row["paid_by"])
-            bankaccount = member.bank_accounts.last()
-            writer.writerow(
-                [
-                    bankaccount.name,
-                    bankaccount.iban,
-                    bankaccount.mandate_no,
-                    f"{row['total']:.2f}",
-                    batch.description,
-                    bankaccount.valid_from,
-                ]
+
+        # The last bank account of every payer is joined in the same query
+        accounts = BankAccount.objects.filter(owner=OuterRef("paid_by")).order_by(
+            "-created_at", "-pk"
+        )
+        member_rows = (
+            batch.payments_set.values("paid_by")
+            .annotate(
+                total=Sum("amount"),
+                **{
+                    field: Subquery(accounts.values(field)[:1])
+                    for field in (
+                        "initials",
+                        "last_name",
+                        "iban",
+                        "mandate_no",
+                        "valid_from",
+                    )
+                },
             )
+            .order_by("paid_by")
+        )
+
+        rows = (
+            [
+                f"{row['initials']} {row['last_name']}",
+                row["iban"],
+                row["mandate_no"],
+                row["total"].quantize(Decimal("0.01")),
+                batch.description,
+                row["valid_from"],
+            ]
+            for row in member_rows.iterator(chunk_size=2000)
+        )
+        return export_response(
+            "batch",
+            [capfirst(x) for x in headers],
+            rows,
+            request.POST.get("format", "csv"),
+        )
+
+
+@method_decorator(staff_member_required, name="dispatch")
+@method_decorator(
+    permission_required("payments.process_batches"), name="dispatch",
+)
+class BatchSepaExportAdminView(View):
+    """View that exports a batch as a SEPA direct debit file."""
+
+    def post(self, request, *args, **kwargs):
+        batch = get_object_or_404(Batch, pk=kwargs["pk"])
+
+        errors = sepa.validate_direct_debits(batch)
+        if errors:
+            for error in errors:
+                messages.error(request, error)
+            return redirect("admin:payments_batch_change", kwargs["pk"])
+
+        response = StreamingHttpResponse(
+            sepa.write_direct_debits(batch), content_type="application/xml"
+        )
+        response["Content-Disposition"] = f'attachment; filename="batch-{batch.pk}.xml"'
         return response
 
 
@@ -163,9 +209,6 @@ class BatchTopicExportAdminView(View):
     def post(self, request, *args, **kwargs):
         batch = Batch.objects.get(pk=kwargs["pk"])
 
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment;filename="batch-topic.csv"'
-        writer = csv.writer(response)
         headers = [
             _("Topic"),
             _("No. of payments"),
@@ -173,7 +216,6 @@ class BatchTopicExportAdminView(View):
             _("Last payment"),
             _("Total amount"),
         ]
-        writer.writerow([capfirst(x) for x in headers])
 
         topic_rows = (
             batch.payments_set.values("topic")
@@ -186,17 +228,22 @@ class BatchTopicExportAdminView(View):
             .order_by("topic")
         )
 
-        for row in topic_rows:
-            writer.writerow(
-                [
-                    row["topic"],
-                    row["count"],
-                    timezone.localtime(row["min_date"]).date(),
-                    timezone.localtime(row["max_date"]).date(),
-                    f"{row['total']:.2f}",
-                ]
-            )
-        return response
+        rows = (
+            [
+                row["topic"],
+                row["count"],
+                timezone.localtime(row["min_date"]).date(),
+                timezone.localtime(row["max_date"]).date(),
+                row["total"].quantize(Decimal("0.01")),
+            ]
+            for row in topic_rows.iterator(chunk_size=2000)
+        )
+        return export_response(
+            "batch-topic",
+            [capfirst(x) for x in headers],
+            rows,
+            request.POST.get("format", "csv"),
+        )
 
 
 @method_decorator(staff_member_required, name="dispatch")
@@ -17,7 +17,7 @@ from payments.api.v2.serializers import PaymentSerializer
 from payments.api.v2.serializers.payable_detail import PayableSerializer
 from payments.api.v2.serializers.payment_user import PaymentUserSerializer
 from payments.exceptions import PaymentError
-from payments.models import Payment, PaymentUser
+from payments.models import Payment, PaymentUser, PaymentUserLedger
 from thaliawebsite.api.v2.permissions import IsAuthenticatedOrTokenHasScopeForMethod
 from thaliawebsite.api.v2.serializers import EmptySerializer
 
@@ -140,4 +140,6 @@ class PaymentUserCurrentView(RetrieveAPIView):
     required_scopes_per_method = {"GET": ["payments:read"]}
 
     def get_object(self):
-        return get_object_or_404(PaymentUser, pk=self.request.user.pk)
+        return PaymentUserLedger.for_payment_user(
+            get_object_or_404(PaymentUser, pk=self.request.user.pk).pk
+        )
@@ -8,3 +8,8 @@ class PaymentsConfig(AppConfig):
 
     name = "payments"
     verbose_name = _("Payments")
+
+    def ready(self):
+        """Import the signals when the app is ready."""
+        # pylint: disable=unused-import,import-outside-toplevel
+        from . import signals
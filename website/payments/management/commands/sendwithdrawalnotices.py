@@ -0,0 +1,24 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from payments import services
+from payments.models import Batch
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """This command can be run periodically to send the withdrawal notices of processed batches."""
+
+    def handle(self, *args, **options):
+        """Send the withdrawal notices that have not been sent yet."""
+        batches = Batch.objects.filter(processed=True, notices_completed__isnull=True)
+
+        for batch in batches:
+            logger.info(
+                "Sending withdrawal notices for batch %d, starting at %d",
+                batch.pk,
+                batch.notices_sent,
+            )
+            services.send_tpay_batch_processing_emails(batch)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from payments import services
+
+
+class Command(BaseCommand):
+    """This command rebuilds the Thalia Pay ledger and reports the rows that had drifted."""
+
+    def handle(self, *args, **options):
+        drift = services.verify_tpay_ledger()
+        for old, new in drift:
+            self.stdout.write(
+                f"{new.payment_user_id}: balance {old.tpay_balance} -> "
+                f"{new.tpay_balance}, mandates {old.mandates} -> "
+                f"{new.mandates}, allowed {old.tpay_allowed} -> "
+                f"{new.tpay_allowed}"
+            )
+        self.stdout.write(f"{len(drift)} ledger rows had drifted")
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.7 on 2026-10-18 18:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def complete_processed_batches(apps, schema_editor):
+    """On this migration, mark the notices of processed batches as sent."""
+    Batch = apps.get_model('payments', 'Batch')
+    Batch.objects.filter(processed=True).update(
+        notices_completed=F('processing_date')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0017_alter_payment_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batch',
+            name='notices_completed',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='withdrawal notices completed'),
+        ),
+        migrations.AddField(
+            model_name='batch',
+            name='notices_sent',
+            field=models.PositiveIntegerField(default=0, verbose_name='withdrawal notices sent'),
+        ),
+        migrations.RunPython(complete_processed_batches, migrations.RunPython.noop),
+    ]
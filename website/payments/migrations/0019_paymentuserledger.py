@@ -0,0 +1,29 @@
+# Generated by Django 3.2.7 on 2026-10-18 18:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0018_batch_notices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentUserLedger',
+            fields=[
+                ('payment_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='tpay_ledger', serialize=False, to='payments.paymentuser')),
+                ('tpay_balance', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='balance')),
+                ('mandate_valid_from', models.DateField(blank=True, null=True, verbose_name='mandate valid from')),
+                ('mandate_valid_until', models.DateField(blank=True, null=True, verbose_name='mandate valid until')),
+                ('tpay_allowed', models.BooleanField(default=True, verbose_name='Thalia Pay allowed')),
+                ('last_updated', models.DateTimeField(auto_now=True, verbose_name='last updated')),
+            ],
+            options={
+                'verbose_name': 'Thalia Pay ledger',
+                'verbose_name_plural': 'Thalia Pay ledgers',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.7 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+
+def delete_ledger(apps, schema_editor):
+    """Delete the rows with merged mandate windows, they are built again on first use."""
+    PaymentUserLedger = apps.get_model("payments", "PaymentUserLedger")
+    PaymentUserLedger.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0019_paymentuserledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_ledger, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='paymentuserledger',
+            name='mandate_valid_from',
+        ),
+        migrations.RemoveField(
+            model_name='paymentuserledger',
+            name='mandate_valid_until',
+        ),
+        migrations.AddField(
+            model_name='paymentuserledger',
+            name='mandates',
+            field=models.JSONField(blank=True, default=list, help_text='The ISO dates from and until which each mandate that has not expired is valid.', verbose_name='mandates'),
+        ),
+    ]
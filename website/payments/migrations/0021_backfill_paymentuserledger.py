@@ -0,0 +1,62 @@
+# Generated by Django 3.2.7 on 2026-10-18 21:02
+
+from django.db import migrations
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+
+def backfill_ledger(apps, schema_editor):
+    """Create the ledger rows of all existing users."""
+    Member = apps.get_model("members", "Member")
+    Payment = apps.get_model("payments", "Payment")
+    BankAccount = apps.get_model("payments", "BankAccount")
+    BlacklistedPaymentUser = apps.get_model("payments", "BlacklistedPaymentUser")
+    PaymentUserLedger = apps.get_model("payments", "PaymentUserLedger")
+
+    balances = dict(
+        Payment.objects.filter(type="tpay_payment", paid_by__isnull=False)
+        .filter(Q(batch__isnull=True) | Q(batch__processed=False))
+        .order_by()
+        .values("paid_by")
+        .annotate(total=Sum("amount"))
+        .values_list("paid_by", "total")
+    )
+    blacklisted = set(
+        BlacklistedPaymentUser.objects.values_list("payment_user", flat=True)
+    )
+    today = timezone.now().date()
+    mandates = {}
+    for owner, valid_from, valid_until in (
+        BankAccount.objects.filter(owner__isnull=False, valid_from__isnull=False)
+        .filter(Q(valid_until__isnull=True) | Q(valid_until__gt=today))
+        .order_by("valid_from", "pk")
+        .values_list("owner", "valid_from", "valid_until")
+    ):
+        mandates.setdefault(owner, []).append(
+            [valid_from.isoformat(), valid_until and valid_until.isoformat()]
+        )
+
+    PaymentUserLedger.objects.bulk_create(
+        (
+            PaymentUserLedger(
+                payment_user_id=pk,
+                tpay_balance=-balances.get(pk, 0),
+                mandates=mandates.get(pk, []),
+                tpay_allowed=pk not in blacklisted,
+            )
+            for pk in Member.objects.values_list("pk", flat=True)
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0020_paymentuserledger_mandates"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
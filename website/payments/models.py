@@ -6,8 +6,8 @@ from decimal import Decimal
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import DEFERRED, Q, Sum, BooleanField, DecimalField
+from django.db import models, transaction
+from django.db.models import DEFERRED, Q, Sum, BooleanField, DecimalField, F
 from django.db.models.expressions import Case, When, Value, Exists, OuterRef
 from django.db.models.functions import Coalesce
 from django.urls import reverse
@@ -89,6 +89,177 @@ class BlacklistedPaymentUser(models.Model):
         return f"{self.payment_user} (blacklisted from using Thalia Pay)"
 
 
+class PaymentUserLedger(models.Model):
+    """Describes the denormalised Thalia Pay state of a payment user.
+
+    The rows are kept up to date by the payments signals and services, so
+    reading the balance of a user is a primary key lookup instead of an
+    aggregate over all their payments. The rows of existing users are
+    created by a migration, those of new users are built on first use.
+    """
+
+    payment_user = models.OneToOneField(
+        PaymentUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="tpay_ledger",
+    )
+
+    tpay_balance = models.DecimalField(
+        verbose_name=_("balance"), max_digits=10, decimal_places=2, default=0,
+    )
+
+    mandates = models.JSONField(
+        verbose_name=_("mandates"),
+        default=list,
+        blank=True,
+        help_text=_(
+            "The ISO dates from and until which each mandate that has not "
+            "expired is valid."
+        ),
+    )
+
+    tpay_allowed = models.BooleanField(
+        verbose_name=_("Thalia Pay allowed"), default=True,
+    )
+
+    last_updated = models.DateTimeField(verbose_name=_("last updated"), auto_now=True)
+
+    @property
+    def tpay_enabled(self):
+        today = timezone.now().date().isoformat()
+        return settings.THALIA_PAY_ENABLED_PAYMENT_METHOD and any(
+            valid_from <= today and (valid_until is None or today < valid_until)
+            for valid_from, valid_until in self.mandates
+        )
+
+    @classmethod
+    def for_payment_user(cls, payment_user_id, create=True):
+        """Get the ledger row of a payment user, building it if it does not exist.
+
+        A row that is built at the same time by another request is not
+        inserted twice, the row that is inserted first is used.
+
+        :param payment_user_id: the user to get the row of
+        :param create: whether to save a row that is built, if False the
+                       row is computed without writing to the database
+        :return: the ledger row
+        """
+        try:
+            return cls.objects.get(pk=payment_user_id)
+        except cls.DoesNotExist:
+            pass
+        row = cls.compute([payment_user_id])[0]
+        if not create:
+            return row
+        cls.objects.bulk_create([row], ignore_conflicts=True)
+        return cls.objects.get(pk=payment_user_id)
+
+    @classmethod
+    def compute(cls, payment_user_ids=None) -> list:
+        """Compute fresh, unsaved ledger rows from the payments and bank accounts.
+
+        :param payment_user_ids: the users to compute the rows for, all if None
+        :return: list of unsaved ledger rows
+        """
+        users = PaymentUser.objects.all()
+        if payment_user_ids is not None:
+            users = users.filter(pk__in=payment_user_ids)
+
+        balances = dict(
+            Payment.objects.filter(type=Payment.TPAY, paid_by__in=users)
+            .filter(Q(batch__isnull=True) | Q(batch__processed=False))
+            .values("paid_by")
+            .annotate(total=Sum("amount"))
+            .values_list("paid_by", "total")
+        )
+        blacklisted = set(
+            BlacklistedPaymentUser.objects.filter(payment_user__in=users).values_list(
+                "payment_user", flat=True
+            )
+        )
+        mandates = cls._mandates(users)
+
+        return [
+            cls(
+                payment_user_id=pk,
+                tpay_balance=-balances.get(pk, 0),
+                mandates=mandates.get(pk, []),
+                tpay_allowed=pk not in blacklisted,
+            )
+            for pk in users.values_list("pk", flat=True)
+        ]
+
+    @classmethod
+    def rebuild(cls, payment_user_ids=None) -> list:
+        """Replace the ledger rows of the given users with freshly computed ones.
+
+        :param payment_user_ids: the users to rebuild the rows for, all if None
+        :return: list of the new ledger rows
+        """
+        rows = cls.compute(payment_user_ids)
+        existing = cls.objects.all()
+        if payment_user_ids is not None:
+            existing = existing.filter(pk__in=payment_user_ids)
+        with transaction.atomic():
+            existing.delete()
+            # Rows built on first use in the meantime are just as fresh
+            return cls.objects.bulk_create(rows, ignore_conflicts=True)
+
+    @classmethod
+    def add_to_balance(cls, payment_user_id, amount):
+        """Add an amount to the balance of a user with a single update."""
+        cls.objects.filter(pk=payment_user_id).update(
+            tpay_balance=F("tpay_balance") + amount, last_updated=timezone.now()
+        )
+
+    @classmethod
+    def refresh_balances(cls, payment_user_ids):
+        """Recompute the balance of the given users."""
+        for row in cls.compute(payment_user_ids):
+            cls.objects.filter(pk=row.pk).update(
+                tpay_balance=row.tpay_balance, last_updated=timezone.now()
+            )
+
+    @classmethod
+    def refresh_mandates(cls, payment_user_ids):
+        """Recompute the mandates of the given users."""
+        users = PaymentUser.objects.filter(tpay_ledger__in=payment_user_ids)
+        mandates = cls._mandates(users)
+        for pk in users.values_list("pk", flat=True):
+            cls.objects.filter(pk=pk).update(
+                mandates=mandates.get(pk, []), last_updated=timezone.now()
+            )
+
+    @staticmethod
+    def _mandates(users) -> dict:
+        """Get the validity of the mandates of each user.
+
+        Every mandate is kept separately, since a user does not have a valid
+        mandate in the gap between two mandates. Mandates that have already
+        expired are ignored.
+        """
+        today = timezone.now().date()
+        mandates = {}
+        for owner, valid_from, valid_until in (
+            BankAccount.objects.filter(owner__in=users, valid_from__isnull=False)
+            .filter(Q(valid_until__isnull=True) | Q(valid_until__gt=today))
+            .order_by("valid_from", "pk")
+            .values_list("owner", "valid_from", "valid_until")
+        ):
+            mandates.setdefault(owner, []).append(
+                [valid_from.isoformat(), valid_until and valid_until.isoformat()]
+            )
+        return mandates
+
+    class Meta:
+        verbose_name = _("Thalia Pay ledger")
+        verbose_name_plural = _("Thalia Pay ledgers")
+
+    def __str__(self):
+        return f"{self.payment_user} (balance € {self.tpay_balance:.2f})"
+
+
 class Payment(models.Model):
     """Describes a payment."""
 
@@ -192,11 +363,13 @@ class Payment(models.Model):
             self._batch_id = self.batch_id
 
         self._type = self.type
+        self._paid_by_id = self.paid_by_id
 
     def save(self, **kwargs):
         self.clean()
         self._batch_id = self.batch.id if self.batch else None
         super().save(**kwargs)
+        self._paid_by_id = self.paid_by_id
 
     def clean(self):
         if self.amount == 0:
@@ -214,9 +387,9 @@ class Payment(models.Model):
         if (
             (self._state.adding or self._type != Payment.TPAY)
             and self.type == Payment.TPAY
-            and not PaymentUser.objects.select_properties("tpay_enabled")
-            .filter(pk=self.paid_by.pk, tpay_enabled=True)
-            .exists()
+            and not PaymentUserLedger.for_payment_user(
+                self.paid_by_id, create=False
+            ).tpay_enabled
         ):
             raise ValidationError(
                 {"paid_by": _("This user does not have Thalia Pay enabled")}
@@ -266,6 +439,14 @@ class Batch(models.Model):
         default=_default_withdrawal_date,
     )
 
+    notices_sent = models.PositiveIntegerField(
+        verbose_name=_("withdrawal notices sent"), default=0,
+    )
+
+    notices_completed = models.DateTimeField(
+        verbose_name=_("withdrawal notices completed"), blank=True, null=True,
+    )
+
     def save(
         self, force_insert=False, force_update=False, using=None, update_fields=None
     ):
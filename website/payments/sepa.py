@@ -0,0 +1,235 @@
+"""SEPA direct debit files of Thalia Pay batches.
+
+A batch is collected with one direct debit per mandate, in the
+``pain.008.001.02`` format of the SEPA Core Direct Debit scheme. The file
+is written while it is sent, so batches of any size are exported with a
+bounded amount of memory.
+"""
+import re
+import unicodedata
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from localflavor.generic.countries.sepa import IBAN_SEPA_COUNTRIES
+from localflavor.generic.validators import BICValidator, IBANValidator
+
+from payments.models import BankAccount
+from utils.export import ROWS_PER_CHUNK, batched
+
+NAMESPACE = "urn:iso:std:iso:20022:tech:xsd:pain.008.001.02"
+
+ACCOUNT_FIELDS = ("initials", "last_name", "iban", "bic", "mandate_no", "valid_from")
+
+_DISALLOWED_CHARACTERS = re.compile(r"[^A-Za-z0-9/\-?:().,'+ ]")
+_CREDITOR_ID = re.compile(r"[A-Z]{2}[0-9]{2}[A-Z0-9]{3}[A-Z0-9]{1,28}")
+
+_validate_iban = IBANValidator(include_countries=IBAN_SEPA_COUNTRIES)
+_validate_bic = BICValidator()
+
+
+class SepaError(ValueError):
+    """Raised when a batch cannot be collected by direct debit."""
+
+
+def _text(value, max_length):
+    """Convert text to the Latin character set of SEPA messages."""
+    value = unicodedata.normalize("NFKD", str(value or ""))
+    value = value.encode("ascii", "ignore").decode("ascii")
+    return escape(_DISALLOWED_CHARACTERS.sub("", value).strip()[:max_length])
+
+
+def _valid_creditor_id(creditor_id):
+    """Check the format and check digits of a SEPA creditor identifier.
+
+    The check digits are computed like those of an IBAN, over the national
+    identifier and the country code, without the creditor business code.
+    """
+    if not _CREDITOR_ID.fullmatch(creditor_id or ""):
+        return False
+    digits = "".join(str(int(c, 36)) for c in creditor_id[7:] + creditor_id[:2])
+    return int(digits + creditor_id[2:4]) % 97 == 1
+
+
+def _amount(value):
+    return str(value.quantize(Decimal("0.01")))
+
+
+def direct_debits(batch):
+    """Get the direct debits of a batch, one per member.
+
+    The payments are summed per member in a single query, which also joins
+    the most recent bank account of the member with a mandate that is
+    valid on the withdrawal date of the batch. The account fields are
+    ``None`` for members without such a mandate.
+
+    :param batch: the batch
+    :return: the direct debits as dictionaries
+    :rtype: QuerySet
+    """
+    accounts = BankAccount.objects.filter(
+        Q(valid_until=None) | Q(valid_until__gt=batch.withdrawal_date),
+        owner=OuterRef("paid_by"),
+        mandate_no__isnull=False,
+        valid_from__lte=batch.withdrawal_date,
+    ).order_by("-created_at", "-pk")
+    return (
+        batch.payments_set.values("paid_by")
+        .annotate(
+            total=Sum("amount"),
+            **{field: Subquery(accounts.values(field)[:1]) for field in ACCOUNT_FIELDS},
+        )
+        .order_by("paid_by")
+    )
+
+
+def _debit_errors(debit):
+    """Get the reasons why a direct debit cannot be collected."""
+    mandate_no = debit["mandate_no"]
+    if mandate_no is None:
+        return [
+            _("Member {} has no mandate that is valid on the withdrawal date.").format(
+                debit["paid_by"]
+            )
+        ]
+    errors = []
+    if debit["total"] <= 0:
+        errors.append(
+            _("Mandate {} does not have a positive amount.").format(mandate_no)
+        )
+    try:
+        _validate_iban(debit["iban"])
+    except ValidationError:
+        errors.append(_("Mandate {} has an invalid IBAN.").format(mandate_no))
+    if debit["bic"]:
+        try:
+            _validate_bic(debit["bic"])
+        except ValidationError:
+            errors.append(_("Mandate {} has an invalid BIC.").format(mandate_no))
+    elif not debit["iban"].startswith("NL"):
+        errors.append(_("Mandate {} requires a BIC.").format(mandate_no))
+    return errors
+
+
+def validate_direct_debits(batch):
+    """Check whether a batch can be collected by direct debit.
+
+    :param batch: the batch
+    :return: the problems that prevent collecting the batch
+    :rtype: list
+    """
+    errors = []
+    try:
+        _validate_iban(settings.SEPA_CREDITOR_IBAN)
+    except ValidationError:
+        errors.append(_("The IBAN of the creditor is invalid."))
+    try:
+        _validate_bic(settings.SEPA_CREDITOR_BIC)
+    except ValidationError:
+        errors.append(_("The BIC of the creditor is invalid."))
+    if not _valid_creditor_id(settings.SEPA_CREDITOR_ID):
+        errors.append(_("The identifier of the creditor is invalid."))
+    if batch.withdrawal_date < timezone.now().date():
+        errors.append(_("The withdrawal date is in the past."))
+    if not batch.payments_set.exists():
+        errors.append(_("The batch does not contain any payments."))
+
+    for debit in direct_debits(batch).iterator(chunk_size=2000):
+        errors += _debit_errors(debit)
+    return errors
+
+
+def _header(batch, count, total):
+    message_id = _text(f"THALIA-PAY-{batch.pk}-{timezone.now():%Y%m%d%H%M%S}", 35)
+    creditor = _text(settings.SEPA_CREDITOR_NAME, 70)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<Document xmlns="{NAMESPACE}">'
+        "<CstmrDrctDbtInitn>"
+        "<GrpHdr>"
+        f"<MsgId>{message_id}</MsgId>"
+        f"<CreDtTm>{timezone.now().replace(microsecond=0).isoformat()}</CreDtTm>"
+        f"<NbOfTxs>{count}</NbOfTxs>"
+        f"<CtrlSum>{_amount(total)}</CtrlSum>"
+        f"<InitgPty><Nm>{creditor}</Nm></InitgPty>"
+        "</GrpHdr>"
+        "<PmtInf>"
+        f"<PmtInfId>{message_id}</PmtInfId>"
+        "<PmtMtd>DD</PmtMtd>"
+        "<BtchBookg>true</BtchBookg>"
+        f"<NbOfTxs>{count}</NbOfTxs>"
+        f"<CtrlSum>{_amount(total)}</CtrlSum>"
+        "<PmtTpInf>"
+        "<SvcLvl><Cd>SEPA</Cd></SvcLvl>"
+        "<LclInstrm><Cd>CORE</Cd></LclInstrm>"
+        "<SeqTp>RCUR</SeqTp>"
+        "</PmtTpInf>"
+        f"<ReqdColltnDt>{batch.withdrawal_date.isoformat()}</ReqdColltnDt>"
+        f"<Cdtr><Nm>{creditor}</Nm></Cdtr>"
+        f"<CdtrAcct><Id><IBAN>{escape(settings.SEPA_CREDITOR_IBAN)}</IBAN></Id>"
+        "</CdtrAcct>"
+        f"<CdtrAgt><FinInstnId><BIC>{escape(settings.SEPA_CREDITOR_BIC)}</BIC>"
+        "</FinInstnId></CdtrAgt>"
+        "<ChrgBr>SLEV</ChrgBr>"
+        "<CdtrSchmeId><Id><PrvtId><Othr>"
+        f"<Id>{_text(settings.SEPA_CREDITOR_ID, 35)}</Id>"
+        "<SchmeNm><Prtry>SEPA</Prtry></SchmeNm>"
+        "</Othr></PrvtId></Id></CdtrSchmeId>"
+    )
+
+
+def _transaction(batch, debit):
+    mandate_no = _text(debit["mandate_no"], 35)
+    end_to_end_id = _text(f"{batch.pk}-{debit['mandate_no']}", 35)
+    name = _text(f"{debit['initials']} {debit['last_name']}", 70)
+    if debit["bic"]:
+        agent = f"<BIC>{escape(debit['bic'])}</BIC>"
+    else:
+        agent = "<Othr><Id>NOTPROVIDED</Id></Othr>"
+    return (
+        "<DrctDbtTxInf>"
+        f"<PmtId><EndToEndId>{end_to_end_id}</EndToEndId></PmtId>"
+        f'<InstdAmt Ccy="EUR">{_amount(debit["total"])}</InstdAmt>'
+        "<DrctDbtTx><MndtRltdInf>"
+        f"<MndtId>{mandate_no}</MndtId>"
+        f"<DtOfSgntr>{debit['valid_from'].isoformat()}</DtOfSgntr>"
+        "</MndtRltdInf></DrctDbtTx>"
+        f"<DbtrAgt><FinInstnId>{agent}</FinInstnId></DbtrAgt>"
+        f"<Dbtr><Nm>{name}</Nm></Dbtr>"
+        f"<DbtrAcct><Id><IBAN>{escape(debit['iban'])}</IBAN></Id></DbtrAcct>"
+        f"<RmtInf><Ustrd>{_text(batch.description, 140)}</Ustrd></RmtInf>"
+        "</DrctDbtTxInf>"
+    )
+
+
+def write_direct_debits(batch):
+    """Write the SEPA direct debit file of a batch.
+
+    The direct debits are checked again while they are written, but
+    ``validate_direct_debits`` should be used before the file is sent,
+    since a problem halfway through leaves an incomplete file.
+
+    :param batch: the batch
+    :return: generator of the chunks of the file
+    :raises SepaError: if a direct debit cannot be collected
+    """
+    totals = batch.payments_set.aggregate(
+        count=Count("paid_by", distinct=True), total=Sum("amount")
+    )
+    yield _header(batch, totals["count"], totals["total"] or Decimal(0)).encode("utf-8")
+
+    debits = direct_debits(batch).iterator(chunk_size=2000)
+    for chunk in batched(debits, ROWS_PER_CHUNK):
+        transactions = []
+        for debit in chunk:
+            errors = _debit_errors(debit)
+            if errors:
+                raise SepaError(errors[0])
+            transactions.append(_transaction(batch, debit))
+        yield "".join(transactions).encode("utf-8")
+
+    yield b"</PmtInf></CstmrDrctDbtInitn></Document>"
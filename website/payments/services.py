@@ -1,9 +1,12 @@
 """The services defined by the payments package."""
 import datetime
+from collections import defaultdict
 from typing import Union
 
 from django.conf import settings
-from django.db.models import QuerySet, Q, Sum, Model
+from django.core import mail
+from django.db import transaction
+from django.db.models import QuerySet, Q, Sum, Model, Subquery, OuterRef, F
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -11,7 +14,7 @@ from django.utils.translation import gettext_lazy as _
 from members.models import Member
 from utils.snippets import send_email
 from .exceptions import PaymentError
-from .models import Payment, BankAccount, PaymentUser
+from .models import Payment, BankAccount, PaymentUser, Batch, PaymentUserLedger
 from .payables import payables, Payable
 
 
@@ -49,26 +52,30 @@ def create_payment(
     if payable.payment_amount == 0:
         raise PaymentError(_("Payment amount 0 is not accepted"))
 
-    if pay_type == Payment.TPAY and not payer.tpay_enabled:
+    if (
+        pay_type == Payment.TPAY
+        and not PaymentUserLedger.for_payment_user(payer.pk).tpay_enabled
+    ):
         raise PaymentError(_("This user does not have Thalia Pay enabled"))
 
-    if payable.payment is not None:
-        payable.payment.amount = payable.payment_amount
-        payable.payment.notes = payable.payment_notes
-        payable.payment.topic = payable.payment_topic
-        payable.payment.paid_by = payer
-        payable.payment.processed_by = processed_by
-        payable.payment.type = pay_type
-        payable.payment.save()
-    else:
-        payable.payment = Payment.objects.create(
-            processed_by=processed_by,
-            amount=payable.payment_amount,
-            notes=payable.payment_notes,
-            topic=payable.payment_topic,
-            paid_by=payer,
-            type=pay_type,
-        )
+    with transaction.atomic():
+        if payable.payment is not None:
+            payable.payment.amount = payable.payment_amount
+            payable.payment.notes = payable.payment_notes
+            payable.payment.topic = payable.payment_topic
+            payable.payment.paid_by = payer
+            payable.payment.processed_by = processed_by
+            payable.payment.type = pay_type
+            payable.payment.save()
+        else:
+            payable.payment = Payment.objects.create(
+                processed_by=processed_by,
+                amount=payable.payment_amount,
+                notes=payable.payment_notes,
+                topic=payable.payment_topic,
+                paid_by=payer,
+                type=pay_type,
+            )
     return payable.payment
 
 
@@ -99,9 +106,10 @@ def delete_payment(model: Model, member: Member = None, ignore_change_window=Fal
             _("This payment has already been processed and hence cannot be deleted.")
         )
 
-    payable.payment = None
-    payable.model.save()
-    payment.delete()
+    with transaction.atomic():
+        payable.payment = None
+        payable.model.save()
+        payment.delete()
 
 
 def update_last_used(queryset: QuerySet, date: datetime.date = None) -> int:
@@ -126,28 +134,73 @@ def revoke_old_mandates() -> int:
 
     :return: number of affected rows
     """
-    return BankAccount.objects.filter(
+    accounts = BankAccount.objects.filter(
         last_used__lte=(timezone.now() - timezone.timedelta(days=36 * 30))
-    ).update(valid_until=timezone.now().date())
+    )
+    with transaction.atomic():
+        owners = set(accounts.values_list("owner", flat=True))
+        result = accounts.update(valid_until=timezone.now().date())
+        PaymentUserLedger.refresh_mandates(owners)
+    return result
 
 
 def process_batch(batch):
     """Process a Thalia Pay batch.
 
+    The last used date of the most recent bank account of every member in
+    the batch is updated with a single query. The withdrawal notices are
+    not sent here, but by the ``sendwithdrawalnotices`` management command.
+
     :param batch: the batch to be processed
     :return:
     """
-    batch.processed = True
+    with transaction.atomic():
+        batch.processed = True
+
+        last_bank_accounts = (
+            PaymentUser.objects.filter(paid_payment_set__batch=batch)
+            .annotate(
+                last_bank_account=Subquery(
+                    BankAccount.objects.filter(owner=OuterRef("pk"))
+                    .order_by("-created_at")
+                    .values("pk")[:1]
+                )
+            )
+            .values("last_bank_account")
+        )
+        BankAccount.objects.filter(pk__in=last_bank_accounts).update(
+            last_used=batch.withdrawal_date
+        )
 
-    payments = batch.payments_set.select_related("paid_by")
-    for payment in payments:
-        bank_account = payment.paid_by.bank_accounts.last()
-        bank_account.last_used = batch.withdrawal_date
-        bank_account.save()
+        PaymentUserLedger.objects.filter(
+            payment_user__paid_payment_set__batch=batch
+        ).update(
+            tpay_balance=F("tpay_balance")
+            + Subquery(
+                batch.payments_set.filter(paid_by=OuterRef("pk"))
+                .values("paid_by")
+                .annotate(total=Sum("amount"))
+                .values("total")
+            ),
+            last_updated=timezone.now(),
+        )
+
+        batch.save()
 
-    batch.save()
 
-    send_tpay_batch_processing_emails(batch)
+def verify_tpay_ledger() -> list:
+    """Rebuild the Thalia Pay ledger from scratch and report the drift.
+
+    :return: list of (old, new) ledger rows that did not match
+    """
+    fields = ("tpay_balance", "mandates", "tpay_allowed")
+    old_rows = PaymentUserLedger.objects.in_bulk()
+    drift = []
+    for new in PaymentUserLedger.rebuild():
+        old = old_rows.get(new.pk)
+        if old and any(getattr(old, f) != getattr(new, f) for f in fields):
+            drift.append((old, new))
+    return drift
 
 
 def derive_next_mandate_no(member) -> str:
@@ -162,27 +215,65 @@ def derive_next_mandate_no(member) -> str:
     return f"{member.pk}-{new_mandate_no}"
 
 
-def send_tpay_batch_processing_emails(batch):
-    """Send withdrawal notice emails to all members in a batch."""
-    member_payments = batch.payments_set.values("paid_by").annotate(total=Sum("amount"))
-    for member_row in member_payments:
-        member = PaymentUser.objects.get(pk=member_row["paid_by"])
-        total_amount = member_row["total"]
-
-        send_email(
-            member.email,
-            _("Thalia Pay withdrawal notice"),
-            "payments/email/tpay_withdrawal_notice_mail.txt",
-            {
-                "name": member.get_full_name(),
-                "batch": batch,
-                "bank_account": member.bank_accounts.filter(
-                    mandate_no__isnull=False
-                ).last(),
-                "creditor_id": settings.SEPA_CREDITOR_ID,
-                "payments": batch.payments_set.filter(paid_by=member),
-                "total_amount": total_amount,
-                "payments_url": (settings.BASE_URL + reverse("payments:payment-list",)),
-            },
-        )
-    return len(member_payments)
+def send_tpay_batch_processing_emails(batch, chunk_size=50):
+    """Send withdrawal notice emails to all members in a batch.
+
+    Members are notified in a fixed order and the number of notified members
+    is stored on the batch after every chunk, so an interrupted run continues
+    where the previous one stopped.
+
+    :param batch: the processed batch to send the notices for
+    :param chunk_size: the number of members notified per chunk
+    :return: the number of notices sent
+    """
+    member_rows = list(
+        batch.payments_set.values("paid_by")
+        .annotate(total=Sum("amount"))
+        .order_by("paid_by")
+    )[batch.notices_sent :]
+    payments_url = settings.BASE_URL + reverse("payments:payment-list")
+
+    sent = 0
+    with mail.get_connection() as connection:
+        for start in range(0, len(member_rows), chunk_size):
+            chunk = member_rows[start : start + chunk_size]
+            member_ids = [row["paid_by"] for row in chunk]
+
+            members = PaymentUser.objects.in_bulk(member_ids)
+            payments = defaultdict(list)
+            for payment in batch.payments_set.filter(paid_by__in=member_ids).order_by(
+                "created_at"
+            ):
+                payments[payment.paid_by_id].append(payment)
+            bank_accounts = {
+                account.owner_id: account
+                for account in BankAccount.objects.filter(
+                    owner__in=member_ids, mandate_no__isnull=False
+                ).order_by("created_at")
+            }
+
+            for row in chunk:
+                member = members[row["paid_by"]]
+                send_email(
+                    member.email,
+                    _("Thalia Pay withdrawal notice"),
+                    "payments/email/tpay_withdrawal_notice_mail.txt",
+                    {
+                        "name": member.get_full_name(),
+                        "batch": batch,
+                        "bank_account": bank_accounts.get(member.pk),
+                        "creditor_id": settings.SEPA_CREDITOR_ID,
+                        "payments": payments[member.pk],
+                        "total_amount": row["total"],
+                        "payments_url": payments_url,
+                    },
+                    connection=connection,
+                )
+
+            sent += len(chunk)
+            batch.notices_sent += len(chunk)
+            Batch.objects.filter(pk=batch.pk).update(notices_sent=batch.notices_sent)
+
+    batch.notices_completed = timezone.now()
+    Batch.objects.filter(pk=batch.pk).update(notices_completed=batch.notices_completed)
+    return sent
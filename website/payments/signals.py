@@ -0,0 +1,69 @@
+"""The signals checked by the payments package.
+
+The Thalia Pay balance and mandates of each payer are stored in the ledger,
+which is updated here for every change to payments, bank accounts and the
+blacklist. These receivers are not suspended, see
+``utils.models.signals.suspendingreceiver``.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Payment, PaymentUserLedger, BankAccount, BlacklistedPaymentUser
+
+
+def _open_amount(payment):
+    """Get the amount a payment adds to the Thalia Pay balance of its payer."""
+    if payment.type != Payment.TPAY or payment.paid_by_id is None:
+        return 0
+    if payment.batch_id is not None and payment.batch.processed:
+        return 0
+    return payment.amount
+
+
+@receiver(post_save, sender=Payment, dispatch_uid="payments_payment_save")
+def post_payment_save(sender, instance, created, raw, **kwargs):
+    """Update the balance of the payer."""
+    if raw:
+        PaymentUserLedger.objects.filter(
+            pk__in=[instance.paid_by_id, instance._paid_by_id]
+        ).delete()
+    elif created:
+        PaymentUserLedger.add_to_balance(instance.paid_by_id, -_open_amount(instance))
+    else:
+        PaymentUserLedger.refresh_balances({instance.paid_by_id, instance._paid_by_id})
+
+
+@receiver(post_delete, sender=Payment, dispatch_uid="payments_payment_delete")
+def post_payment_delete(sender, instance, **kwargs):
+    """Remove the payment from the balance of the payer."""
+    PaymentUserLedger.add_to_balance(instance.paid_by_id, _open_amount(instance))
+
+
+@receiver(post_save, sender=BankAccount, dispatch_uid="payments_bankaccount_save")
+@receiver(post_delete, sender=BankAccount, dispatch_uid="payments_bankaccount_delete")
+def post_bank_account_change(sender, instance, **kwargs):
+    """Update the mandates of the owner."""
+    if instance.owner_id is not None:
+        PaymentUserLedger.refresh_mandates([instance.owner_id])
+
+
+@receiver(
+    post_save, sender=BlacklistedPaymentUser, dispatch_uid="payments_blacklist_save"
+)
+def post_blacklist_save(sender, instance, **kwargs):
+    """Disallow Thalia Pay in the ledger of the user."""
+    PaymentUserLedger.objects.filter(pk=instance.payment_user_id).update(
+        tpay_allowed=False
+    )
+
+
+@receiver(
+    post_delete,
+    sender=BlacklistedPaymentUser,
+    dispatch_uid="payments_blacklist_delete",
+)
+def post_blacklist_delete(sender, instance, **kwargs):
+    """Allow Thalia Pay in the ledger of the user."""
+    PaymentUserLedger.objects.filter(pk=instance.payment_user_id).update(
+        tpay_allowed=True
+    )
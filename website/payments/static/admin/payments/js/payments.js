@@ -3,6 +3,7 @@
     $(".payments-row a.process").click(function(e) {
         e.preventDefault();
         var type = $(e.target).data('type');
+        var format = $(e.target).data('format');
         var next = $(e.target).data('next');
         var href = $(e.target).data('href');
         var form = $('<form></form>');
@@ -15,6 +16,14 @@
         field.attr("value", type);
         form.append(field);
 
+        if (format) {
+            var formatField = $('<input/>');
+            formatField.attr("type", "hidden");
+            formatField.attr("name", 'format');
+            formatField.attr("value", format);
+            form.append(formatField);
+        }
+
         if (next) {
             var redirect = $('<input/>');
             redirect.attr("type", "hidden");
@@ -368,7 +368,7 @@ class PaymentAdminTest(TestCase):
         response = self.client.get(reverse("admin:payments_payment_changelist"))
 
         actions = self.admin.get_actions(response.wsgi_request)
-        self.assertCountEqual(actions, ["delete_selected", "export_csv"])
+        self.assertCountEqual(actions, ["delete_selected", "export_csv", "export_xlsx"])
 
         self._give_user_permissions()
         response = self.client.get(reverse("admin:payments_payment_changelist"))
@@ -376,7 +376,13 @@ class PaymentAdminTest(TestCase):
         actions = self.admin.get_actions(response.wsgi_request)
         self.assertCountEqual(
             actions,
-            ["delete_selected", "add_to_new_batch", "add_to_last_batch", "export_csv",],
+            [
+                "delete_selected",
+                "add_to_new_batch",
+                "add_to_last_batch",
+                "export_csv",
+                "export_xlsx",
+            ],
         )
 
     def test_get_readonly_fields(self) -> None:
@@ -425,7 +431,7 @@ class PaymentAdminTest(TestCase):
             f"\r\n2019-01-01 00:00:00+00:00,17.50,"
             f"Cash payment,Sébastiaan Versteeg,{self.user.pk},Sébastiaan Versteeg,"
             f"\r\n",
-            response.content.decode("utf-8"),
+            b"".join(response.streaming_content).decode("utf-8"),
         )
 
     def test_get_field_queryset(self) -> None:
@@ -636,7 +642,14 @@ class BatchAdminTest(TestCase):
         b = Batch.objects.create()
         self.assertCountEqual(
             self.admin.get_readonly_fields(None, b),
-            ["id", "processed", "processing_date", "total_amount",],
+            [
+                "id",
+                "processed",
+                "processing_date",
+                "notices_sent",
+                "notices_completed",
+                "total_amount",
+            ],
         )
 
         b.processed = True
@@ -648,6 +661,8 @@ class BatchAdminTest(TestCase):
                 "description",
                 "processed",
                 "processing_date",
+                "notices_sent",
+                "notices_completed",
                 "total_amount",
                 "withdrawal_date",
             ],
@@ -797,7 +812,7 @@ class BankAccountAdminTest(TestCase):
             b"12-1,NL91ABNA0417164300,,2018-12-27,2019-01-01,"
             b"sig\r\n2019-01-01 00:00:00+00:00,J4 Test,11-1,"
             b"DE12500105170648489890,NBBEBEBB,2019-01-01,2019-01-06,sig\r\n",
-            response.content,
+            b"".join(response.streaming_content),
         )
 
     @mock.patch("django.contrib.admin.ModelAdmin.message_user")
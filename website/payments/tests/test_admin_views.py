@@ -1,9 +1,11 @@
 from unittest import mock
+from xml.etree import ElementTree
 from unittest.mock import Mock, MagicMock, PropertyMock, patch
 
 from django.apps import apps
 from django.contrib.admin.utils import model_ngettext
 from django.contrib.auth.models import Permission
+from django.contrib.messages import get_messages
 from django.contrib.contenttypes.models import ContentType
 from django.test import Client, TestCase, override_settings
 from django.utils import timezone
@@ -11,7 +13,7 @@ from django.utils.translation import gettext_lazy as _
 from freezegun import freeze_time
 
 from members.models import Member, Profile
-from payments import admin_views, payables
+from payments import admin_views, payables, sepa
 from payments.models import Payment, Batch, BankAccount, PaymentUser
 from payments.tests.__mocks__ import MockModel
 from payments.tests.test_services import MockPayable
@@ -347,7 +349,7 @@ class BatchExportAdminViewTest(TestCase):
         response = self.client.post(f"/admin/payments/batch/{self.batch.id}/export/")
 
         self.assertEqual(
-            response.content,
+            b"".join(response.streaming_content),
             b"Account holder,IBAN,Mandate Reference,Amount,Description,Mandate Date\r\n"
             b"T.E.S.T. ersssss,DE75512108001245126199,2,3.00,Thalia Pay payments for 2020-1,2020-01-01\r\n"
             b"T.E.S.T. ersssss2,NL02ABNA0123456789,1,6.00,Thalia Pay payments for 2020-1,2020-01-01\r\n",
@@ -462,7 +464,7 @@ class BatchTopicExportAdminViewTest(TestCase):
         )
 
         self.assertEqual(
-            response.content,
+            b"".join(response.streaming_content),
             b"Topic,No. of payments,First payment,Last payment,Total amount\r\n"
             b"test1,2,2020-01-01,2020-01-01,5.00\r\n"
             b"test2,2,2020-01-01,2020-01-01,4.00\r\n",
@@ -680,3 +682,172 @@ class BatchNewFilledAdminViewTest(TestCase):
         self.assertEqual(Payment.objects.get(amount=5).batch.id, b.id)
         self.assertEqual(Payment.objects.get(amount=6).batch.id, b.id)
         self.assertIsNone(Payment.objects.get(amount=7).batch)
+
+
+@override_settings(
+    SUSPEND_SIGNALS=True,
+    SEPA_CREDITOR_ID="NL67ZZZ401464640000",
+    SEPA_CREDITOR_IBAN="NL91ABNA0417164300",
+    SEPA_CREDITOR_BIC="ABNANL2A",
+)
+@freeze_time("2020-01-01")
+class BatchSepaExportAdminViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.batch = Batch.objects.create(description="Thalia Pay payments for 2020-1")
+        cls.user = Member.objects.create(
+            username="test1",
+            first_name="Test1",
+            last_name="Example",
+            email="test1@example.org",
+            is_staff=True,
+        )
+        Profile.objects.create(user=cls.user)
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename="process_batches")
+        )
+        cls.user = PaymentUser.objects.get(pk=cls.user.pk)
+        cls.user2 = Member.objects.create(
+            username="test2",
+            first_name="Test2",
+            last_name="Example",
+            email="test2@example.org",
+        )
+        Profile.objects.create(user=cls.user2)
+        cls.user2 = PaymentUser.objects.get(pk=cls.user2.pk)
+
+        # The older account must not be used
+        BankAccount.objects.create(
+            created_at=timezone.now() - timezone.timedelta(days=10),
+            owner=cls.user,
+            iban="NL02ABNA0123456789",
+            mandate_no="1-0",
+            valid_from=timezone.now().date() - timezone.timedelta(days=10),
+            initials="T.",
+            last_name="Old",
+        )
+        BankAccount.objects.create(
+            owner=cls.user,
+            iban="DE75512108001245126199",
+            bic="NBBEBEBB",
+            mandate_no="1-1",
+            valid_from=timezone.now().date(),
+            initials="T.",
+            last_name="Müller",
+        )
+        cls.account2 = BankAccount.objects.create(
+            owner=cls.user2,
+            iban="NL91ABNA0417164300",
+            mandate_no="2-1",
+            valid_from=timezone.now().date(),
+            initials="T.",
+            last_name="Example",
+        )
+
+        Payment.objects.bulk_create(
+            [
+                Payment(amount=1, paid_by=cls.user, type=Payment.TPAY, batch=cls.batch),
+                Payment(amount=2, paid_by=cls.user, type=Payment.TPAY, batch=cls.batch),
+                Payment(
+                    amount=4.5, paid_by=cls.user2, type=Payment.TPAY, batch=cls.batch
+                ),
+            ]
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = f"/admin/payments/batch/{self.batch.id}/export-sepa/"
+        self.batch.refresh_from_db()
+
+    def test_post(self):
+        response = self.client.post(self.url)
+
+        self.assertEqual(
+            f'attachment; filename="batch-{self.batch.pk}.xml"',
+            response["Content-Disposition"],
+        )
+        document = ElementTree.fromstring(b"".join(response.streaming_content))
+        ns = {"p": sepa.NAMESPACE}
+        self.assertEqual("2", document.find(".//p:GrpHdr/p:NbOfTxs", ns).text)
+        self.assertEqual("7.50", document.find(".//p:GrpHdr/p:CtrlSum", ns).text)
+        self.assertEqual(
+            "2020-01-15", document.find(".//p:PmtInf/p:ReqdColltnDt", ns).text
+        )
+        self.assertEqual(
+            "NL67ZZZ401464640000",
+            document.find(".//p:CdtrSchmeId//p:Othr/p:Id", ns).text,
+        )
+        self.assertEqual(
+            [
+                ("1-1", "3.00", "DE75512108001245126199", "NBBEBEBB", "T. Muller"),
+                ("2-1", "4.50", "NL91ABNA0417164300", None, "T. Example"),
+            ],
+            [
+                (
+                    tx.find(".//p:MndtId", ns).text,
+                    tx.find("p:InstdAmt", ns).text,
+                    tx.find("p:DbtrAcct//p:IBAN", ns).text,
+                    getattr(tx.find("p:DbtrAgt//p:BIC", ns), "text", None),
+                    tx.find("p:Dbtr/p:Nm", ns).text,
+                )
+                for tx in document.findall(".//p:DrctDbtTxInf", ns)
+            ],
+        )
+
+    def test_post_invalid(self):
+        self.account2.valid_until = self.batch.withdrawal_date
+        self.account2.save()
+
+        response = self.client.post(self.url)
+
+        self.assertRedirects(
+            response,
+            f"/admin/payments/batch/{self.batch.pk}/change/",
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(
+            [
+                f"Member {self.user2.pk} has no mandate that is valid on the "
+                f"withdrawal date."
+            ],
+            [str(m) for m in get_messages(response.wsgi_request)],
+        )
+
+    def test_validate(self):
+        with self.subTest("Valid"):
+            self.assertEqual([], sepa.validate_direct_debits(self.batch))
+
+        with self.subTest("Invalid creditor"), override_settings(
+            SEPA_CREDITOR_IBAN="<unknown>"
+        ):
+            self.assertEqual(
+                ["The IBAN of the creditor is invalid."],
+                sepa.validate_direct_debits(self.batch),
+            )
+
+        for creditor_id in ("<unknown>", "NL00ZZZ401464640000"):
+            with self.subTest("Invalid creditor identifier", id=creditor_id):
+                with override_settings(SEPA_CREDITOR_ID=creditor_id):
+                    self.assertEqual(
+                        ["The identifier of the creditor is invalid."],
+                        sepa.validate_direct_debits(self.batch),
+                    )
+
+        with self.subTest("Past withdrawal date"), freeze_time("2020-02-01"):
+            self.assertIn(
+                "The withdrawal date is in the past.",
+                sepa.validate_direct_debits(self.batch),
+            )
+
+        with self.subTest("Missing BIC"):
+            BankAccount.objects.filter(mandate_no="1-1").update(bic=None)
+            self.assertEqual(
+                ["Mandate 1-1 requires a BIC."], sepa.validate_direct_debits(self.batch)
+            )
+            with self.assertRaisesMessage(sepa.SepaError, "Mandate 1-1"):
+                b"".join(sepa.write_direct_debits(self.batch))
+
+    def test_queries(self):
+        with self.assertNumQueries(2):
+            b"".join(sepa.write_direct_debits(self.batch))
@@ -3,7 +3,12 @@ from unittest import mock
 from django.test import TestCase, override_settings
 from freezegun import freeze_time
 
-from payments.management.commands.revokeoldmandates import Command
+from payments.management.commands import (
+    revokeoldmandates,
+    sendwithdrawalnotices,
+    verifytpayledger,
+)
+from payments.models import Batch
 
 
 @freeze_time("2019-01-01")
@@ -15,6 +20,35 @@ class RevokeOldMandatesCommandTest(TestCase):
 
     @mock.patch("payments.services.revoke_old_mandates")
     def test_handle(self, revoke_old_mandates):
-        command = Command()
+        command = revokeoldmandates.Command()
         command.handle()
         revoke_old_mandates.assert_called()
+
+
+@freeze_time("2019-01-01")
+@override_settings(SUSPEND_SIGNALS=True)
+class SendWithdrawalNoticesCommandTest(TestCase):
+    """Test for the management command."""
+
+    @mock.patch("payments.services.send_tpay_batch_processing_emails")
+    def test_handle(self, send_emails):
+        Batch.objects.create(processed=False)
+        pending = Batch.objects.create(processed=True, notices_sent=3)
+        Batch.objects.create(processed=True, notices_completed="2019-01-01T00:00Z")
+
+        command = sendwithdrawalnotices.Command()
+        command.handle()
+
+        send_emails.assert_called_once_with(pending)
+
+
+@override_settings(SUSPEND_SIGNALS=True)
+class VerifyTPayLedgerCommandTest(TestCase):
+    """Test for the management command."""
+
+    @mock.patch("payments.services.verify_tpay_ledger")
+    def test_handle(self, verify_tpay_ledger):
+        verify_tpay_ledger.return_value = []
+        command = verifytpayledger.Command()
+        command.handle()
+        verify_tpay_ledger.assert_called()
@@ -14,6 +14,7 @@ from payments.models import (
     Batch,
     PaymentUser,
     BlacklistedPaymentUser,
+    PaymentUserLedger,
 )
 from payments.tests.__mocks__ import MockPayable, MockModel
 
@@ -494,6 +495,143 @@ class PaymentUserTest(TestCase):
         self.assertFalse(self.member.tpay_allowed)
 
 
+@freeze_time("2019-01-01")
+@override_settings(SUSPEND_SIGNALS=True, THALIA_PAY_ENABLED_PAYMENT_METHOD=True)
+class PaymentUserLedgerTest(TestCase):
+    fixtures = ["members.json"]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.member = PaymentUser.objects.filter(last_name="Wiggers").first()
+
+    def ledger(self):
+        return PaymentUserLedger.for_payment_user(self.member.pk)
+
+    def test_tpay_enabled(self):
+        self.assertFalse(self.ledger().tpay_enabled)
+        b = BankAccount.objects.create(
+            owner=self.member,
+            initials="J",
+            last_name="Test2",
+            iban="NL91ABNA0417164300",
+            mandate_no="11-2",
+            valid_from=timezone.now().date() - timezone.timedelta(days=5),
+            signature="base64,png",
+        )
+        self.assertTrue(self.ledger().tpay_enabled)
+
+        with override_settings(THALIA_PAY_ENABLED_PAYMENT_METHOD=False):
+            self.assertFalse(self.ledger().tpay_enabled)
+
+        b.valid_until = timezone.now().date() - timezone.timedelta(days=1)
+        b.save()
+        self.assertFalse(self.ledger().tpay_enabled)
+
+    def test_tpay_enabled_between_mandates(self):
+        for mandate_no, valid_from, valid_until in (
+            ("11-1", -10, -5),
+            ("11-2", -5, 5),
+            ("11-3", 20, None),
+        ):
+            BankAccount.objects.create(
+                owner=self.member,
+                initials="J",
+                last_name="Test2",
+                iban="NL91ABNA0417164300",
+                mandate_no=mandate_no,
+                valid_from=timezone.now().date() + timezone.timedelta(days=valid_from),
+                valid_until=valid_until
+                and timezone.now().date() + timezone.timedelta(days=valid_until),
+                signature="base64,png",
+            )
+        self.assertTrue(self.ledger().tpay_enabled)
+
+        for days in (5, 19):
+            with self.subTest(days=days), freeze_time(
+                timezone.now() + timezone.timedelta(days=days)
+            ):
+                self.assertFalse(self.ledger().tpay_enabled)
+                self.assertFalse(
+                    PaymentUser.objects.get(pk=self.member.pk).tpay_enabled
+                )
+
+        with freeze_time(timezone.now() + timezone.timedelta(days=20)):
+            self.assertTrue(self.ledger().tpay_enabled)
+
+    def test_tpay_balance(self):
+        self.assertEqual(self.ledger().tpay_balance, 0)
+        BankAccount.objects.create(
+            owner=self.member,
+            initials="J",
+            last_name="Test2",
+            iban="NL91ABNA0417164300",
+            mandate_no="11-2",
+            valid_from=timezone.now().date() - timezone.timedelta(days=5),
+            signature="base64,png",
+        )
+        p1 = services.create_payment(
+            MockPayable(MockModel(self.member)), self.member, Payment.TPAY
+        )
+        p2 = services.create_payment(
+            MockPayable(MockModel(self.member)), self.member, Payment.TPAY
+        )
+        self.assertEqual(self.ledger().tpay_balance, Decimal(-10))
+
+        p2.amount = 7
+        p2.save()
+        self.assertEqual(self.ledger().tpay_balance, Decimal(-12))
+
+        p2.delete()
+        self.assertEqual(self.ledger().tpay_balance, Decimal(-5))
+
+        batch = Batch.objects.create()
+        p1.batch = batch
+        p1.save()
+        self.assertEqual(self.ledger().tpay_balance, Decimal(-5))
+
+        services.process_batch(batch)
+        self.assertEqual(self.ledger().tpay_balance, 0)
+        self.assertEqual(self.ledger().tpay_balance, self.member.tpay_balance)
+
+    def test_tpay_allowed(self):
+        self.assertTrue(self.ledger().tpay_allowed)
+        self.member.disallow_tpay()
+        self.assertFalse(self.ledger().tpay_allowed)
+        self.member.allow_tpay()
+        self.assertTrue(self.ledger().tpay_allowed)
+
+    def test_for_payment_user_built_concurrently(self):
+        compute = PaymentUserLedger.compute
+
+        def compute_concurrently(payment_user_ids):
+            # Another request inserts the row first
+            compute(payment_user_ids)[0].save()
+            return compute(payment_user_ids)
+
+        with patch.object(
+            PaymentUserLedger, "compute", side_effect=compute_concurrently
+        ):
+            self.assertEqual(self.ledger().pk, self.member.pk)
+        self.assertEqual(PaymentUserLedger.objects.count(), 1)
+
+    def test_clean_does_not_create_row(self):
+        payment = Payment(
+            type=Payment.TPAY,
+            amount=5,
+            paid_by=self.member,
+            processed_by=self.member,
+            topic="test",
+        )
+        with self.assertRaises(ValidationError):
+            payment.clean()
+        self.assertFalse(PaymentUserLedger.objects.exists())
+
+    def test_for_payment_user_query_count(self):
+        self.ledger()
+        with self.assertNumQueries(1):
+            self.ledger()
+
+
 class BlacklistedPaymentUserTest(TestCase):
     fixtures = ["members.json"]
 
@@ -1,13 +1,20 @@
 from unittest.mock import MagicMock, patch, PropertyMock
 
 from django.conf import settings
+from django.core import mail
 from django.test import TestCase, override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 
 from payments import services, payables
 from payments.exceptions import PaymentError
-from payments.models import BankAccount, Payment, Batch, PaymentUser
+from payments.models import (
+    BankAccount,
+    Payment,
+    Batch,
+    PaymentUser,
+    PaymentUserLedger,
+)
 from payments.tests.__mocks__ import MockPayable, MockModel
 
 
@@ -187,25 +194,117 @@ class ServicesTest(TestCase):
         self.assertEqual(BankAccount.objects.filter(valid_until=None).count(), 1)
 
     def test_process_batch(self):
-        with patch("payments.services.send_tpay_batch_processing_emails") as mock_mails:
-            ba = BankAccount.objects.create(
-                owner=self.member,
+        old = BankAccount.objects.create(
+            owner=self.member,
+            initials="J",
+            last_name="Test1",
+            iban="NL91ABNA0417164300",
+            mandate_no="11-1",
+            valid_from=timezone.now().date() - timezone.timedelta(days=2000),
+            signature="base64,png",
+        )
+        ba = BankAccount.objects.create(
+            owner=self.member,
+            initials="J",
+            last_name="Test1",
+            iban="NL91ABNA0417164300",
+            mandate_no="11-2",
+            valid_from=timezone.now().date() - timezone.timedelta(days=2000),
+            created_at=timezone.now() + timezone.timedelta(minutes=1),
+            signature="base64,png",
+        )
+        p = services.create_payment(
+            MockPayable(MockModel(self.member)), self.member, Payment.TPAY
+        )
+        b = Batch.objects.create()
+        p.batch = b
+        p.save()
+
+        with self.assertNumQueries(5):
+            services.process_batch(b)
+
+        b.refresh_from_db()
+        self.assertTrue(b.processed)
+        self.assertIsNone(b.notices_completed)
+        ba.refresh_from_db()
+        old.refresh_from_db()
+        self.assertEqual(b.withdrawal_date, ba.last_used)
+        self.assertIsNone(old.last_used)
+
+    def test_verify_tpay_ledger(self):
+        BankAccount.objects.create(
+            owner=self.member,
+            initials="J",
+            last_name="Test",
+            iban="NL91ABNA0417164300",
+            mandate_no="11-1",
+            valid_from=timezone.now().date() - timezone.timedelta(days=5),
+            signature="base64,png",
+        )
+        services.create_payment(
+            MockPayable(MockModel(self.member)), self.member, Payment.TPAY
+        )
+
+        with self.subTest("Consistent ledger has no drift"):
+            self.assertEqual(services.verify_tpay_ledger(), [])
+
+        PaymentUserLedger.objects.filter(pk=self.member.pk).update(tpay_balance=3)
+
+        with self.subTest("Changed ledger is reported and fixed"):
+            drift = services.verify_tpay_ledger()
+            self.assertEqual(len(drift), 1)
+            old, new = drift[0]
+            self.assertEqual(old.tpay_balance, 3)
+            self.assertEqual(
+                PaymentUserLedger.objects.get(pk=self.member.pk).tpay_balance,
+                new.tpay_balance,
+            )
+
+    @override_settings(SEPA_CREDITOR_ID="NL00ZZZ000000000000")
+    def test_send_tpay_batch_processing_emails(self):
+        other = PaymentUser.objects.exclude(pk=self.member.pk).first()
+        for member in [self.member, other]:
+            member.email = f"{member.username}@example.org"
+            member.save()
+            BankAccount.objects.create(
+                owner=member,
                 initials="J",
-                last_name="Test1",
+                last_name="Test",
                 iban="NL91ABNA0417164300",
-                mandate_no="11-1",
-                valid_from=timezone.now().date() - timezone.timedelta(days=2000),
+                mandate_no=f"{member.pk}-1",
+                valid_from=timezone.now().date() - timezone.timedelta(days=5),
                 signature="base64,png",
             )
-            p = services.create_payment(
-                MockPayable(MockModel(self.member)), self.member, Payment.TPAY
+        b = Batch.objects.create()
+        for member in [self.member, self.member, other]:
+            Payment.objects.create(
+                type=Payment.TPAY,
+                amount=5,
+                paid_by=member,
+                processed_by=self.member,
+                batch=b,
             )
-            b = Batch.objects.create()
-            p.batch = b
-            p.save()
+        services.process_batch(b)
 
-            services.process_batch(b)
+        with self.subTest("Sends one notice per member"):
+            self.assertEqual(services.send_tpay_batch_processing_emails(b), 2)
+            self.assertEqual(len(mail.outbox), 2)
+            b.refresh_from_db()
+            self.assertEqual(b.notices_sent, 2)
+            self.assertIsNotNone(b.notices_completed)
+            notice = next(m for m in mail.outbox if m.to == [self.member.email])
+            self.assertIn("€ 10.00", notice.body)
+            self.assertIn(f"{self.member.pk}-1", notice.body)
 
-            mock_mails.assert_called_once()
-            ba.refresh_from_db()
-            self.assertEqual(b.withdrawal_date.date(), ba.last_used)
+        mail.outbox = []
+        b.notices_sent = 1
+        b.notices_completed = None
+        b.save()
+
+        with self.subTest("Continues after the members already notified"):
+            self.assertEqual(
+                services.send_tpay_batch_processing_emails(b, chunk_size=1), 1
+            )
+            self.assertEqual(len(mail.outbox), 1)
+            b.refresh_from_db()
+            self.assertEqual(b.notices_sent, 2)
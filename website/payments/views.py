@@ -25,7 +25,7 @@ from django.views.generic.edit import CreateView, UpdateView, FormView
 from payments import services, payables
 from payments.exceptions import PaymentError
 from payments.forms import BankAccountForm, PaymentCreateForm, BankAccountUserRevokeForm
-from payments.models import BankAccount, Payment, PaymentUser
+from payments.models import BankAccount, Payment, PaymentUser, PaymentUserLedger
 
 
 @method_decorator(login_required, name="dispatch")
@@ -152,8 +152,8 @@ class PaymentListView(ListView):
                 "total": context["object_list"]
                 .aggregate(Sum("amount"))
                 .get("amount__sum"),
-                "tpay_balance": PaymentUser.objects.get(
-                    pk=self.request.member.pk
+                "tpay_balance": PaymentUserLedger.for_payment_user(
+                    self.request.member.pk
                 ).tpay_balance,
                 "year": self.kwargs.get("year", timezone.now().year),
                 "month": self.kwargs.get("month", timezone.now().month),
@@ -179,7 +179,7 @@ class PaymentProcessView(SuccessMessageMixin, FormView):
         return self.request.POST["next"]
 
     def dispatch(self, request, *args, **kwargs):
-        if not PaymentUser.objects.get(pk=request.member.pk).tpay_enabled:
+        if not PaymentUserLedger.for_payment_user(request.member.pk).tpay_enabled:
             raise PermissionDenied
         return super().dispatch(request, *args, **kwargs)
 
@@ -188,8 +188,8 @@ class PaymentProcessView(SuccessMessageMixin, FormView):
         context.update({"payable": self.payable})
         context.update(
             {
-                "new_balance": PaymentUser.objects.get(
-                    pk=self.payable.payment_payer.pk
+                "new_balance": PaymentUserLedger.for_payment_user(
+                    self.payable.payment_payer.pk
                 ).tpay_balance
                 - Decimal(self.payable.payment_amount)
             }
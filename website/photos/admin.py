@@ -1,17 +1,21 @@
 from django.contrib import admin
 from django.contrib import messages
 from django.db.models import Count
+from django.utils.formats import date_format
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
 from .forms import AlbumForm
-from .models import Album, Photo
-from .services import extract_archive, save_photo
+from .models import Album, Photo, ArchiveImport
+from .services import save_photo
 
 
 @admin.register(Album)
 class AlbumAdmin(admin.ModelAdmin):
     """Model for Album admin page."""
 
+    readonly_fields = ("archive_imports",)
     list_display = ("title", "date", "num_photos", "hidden", "shareable")
     fields = (
         "title",
@@ -21,6 +25,7 @@ class AlbumAdmin(admin.ModelAdmin):
         "hidden",
         "shareable",
         "album_archive",
+        "archive_imports",
         "_cover",
     )
     search_fields = ("title", "date")
@@ -40,14 +45,43 @@ class AlbumAdmin(admin.ModelAdmin):
     num_photos.short_description = _("Number of photos")
     num_photos.admin_order_field = "photos_count"
 
+    def archive_imports(self, obj):
+        """Show the progress and warnings of the archive imports."""
+        return format_html_join(
+            mark_safe("<br>"),
+            "{} ({}): {} {}, {} {}. {}",
+            (
+                (
+                    date_format(archive_import.created_at, "DATETIME_FORMAT"),
+                    archive_import.get_status_display(),
+                    archive_import.processed,
+                    _("files processed"),
+                    archive_import.imported,
+                    _("photos imported"),
+                    " ".join(archive_import.warnings),
+                )
+                for archive_import in obj.archiveimport_set.all()
+            ),
+        )
+
+    archive_imports.short_description = _("Archive imports")
+
     def save_model(self, request, obj, form, change):
         """Save the new Album by extracting the archive."""
         super().save_model(request, obj, form, change)
 
         archive = form.cleaned_data.get("album_archive", None)
         if archive is not None:
-            extract_archive(request, obj, archive)
+            ArchiveImport.objects.create(album=obj, archive=archive)
 
+            messages.add_message(
+                request,
+                messages.INFO,
+                _(
+                    "The archive will be imported in the background, "
+                    "its progress is shown on this page."
+                ),
+            )
             messages.add_message(
                 request,
                 messages.WARNING,
@@ -12,10 +12,12 @@ class PhotoRetrieveSerializer(serializers.ModelSerializer):
 
     def _file(self, obj):
         file = None
+        generated = None
         if obj:
             file = obj.file
+            generated = obj.thumbnails
         return create_image_thumbnail_dict(
-            self.context["request"], file, fit_large=False
+            self.context["request"], file, fit_large=False, generated=generated
         )
 
     class Meta:
@@ -18,6 +18,7 @@ class PhotoSerializer(serializers.ModelSerializer):
         size_large="1920x1920",
         fit_medium=False,
         fit_large=False,
+        generated_source="thumbnails",
     )
 
 
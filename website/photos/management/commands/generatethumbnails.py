@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from photos import services
+from photos.models import Photo
+
+
+class Command(BaseCommand):
+    """This command can be run periodically to generate the thumbnails of new photos."""
+
+    help = """Generates the configured thumbnails of photos that do not have them yet.
+              Use --all to regenerate the thumbnails of every (selected) photo.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--album",
+            action="append",
+            dest="albums",
+            default=[],
+            help="Only generate the thumbnails of the album with this slug",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            dest="all",
+            default=False,
+            help="Regenerate thumbnails that have already been generated",
+        )
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=None,
+            help="Number of processes, defaults to the number of CPUs",
+        )
+
+    def handle(self, *args, **options):
+        photos = Photo.objects.order_by("pk")
+        if options["albums"]:
+            photos = photos.filter(album__slug__in=options["albums"])
+        if not options["all"]:
+            photos = photos.filter(thumbnails__isnull=True)
+
+        total = photos.count()
+        if total == 0:
+            return
+
+        def progress(done):
+            self.stdout.write(f"Generated thumbnails of {done}/{total} photos")
+
+        services.generate_photo_thumbnails(
+            photos, max_workers=options["workers"], progress=progress
+        )
@@ -0,0 +1,34 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from photos import services
+from photos.models import ArchiveImport
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """This command can be run periodically to import uploaded album archives."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=None,
+            help="Number of processes, defaults to the number of CPUs",
+        )
+
+    def handle(self, *args, **options):
+        """Import the archives that have not been imported yet."""
+        imports = ArchiveImport.objects.filter(
+            status__in=[ArchiveImport.QUEUED, ArchiveImport.PROCESSING]
+        ).select_related("album")
+
+        for archive_import in imports:
+            logger.info("Importing archive %d", archive_import.pk)
+            imported = services.import_archive(
+                archive_import, max_workers=options["workers"]
+            )
+            self.stdout.write(f"Imported {imported} photos into {archive_import.album}")
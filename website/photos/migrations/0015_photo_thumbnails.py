@@ -0,0 +1,18 @@
+# Generated by Django 3.2.7 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photos', '0014_auto_20210315_2200'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='thumbnails',
+            field=models.JSONField(editable=False, null=True, verbose_name='generated thumbnails'),
+        ),
+    ]
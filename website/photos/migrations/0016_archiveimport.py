@@ -0,0 +1,32 @@
+# Generated by Django 3.2.7 on 2026-10-18 18:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photos', '0015_photo_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveImport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archive', models.FileField(upload_to='album-imports/', verbose_name='archive')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20, verbose_name='status')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='files processed')),
+                ('imported', models.PositiveIntegerField(default=0, verbose_name='photos imported')),
+                ('warnings', models.JSONField(blank=True, default=list, verbose_name='warnings')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+                ('album', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='photos.album', verbose_name='album')),
+            ],
+            options={
+                'ordering': ('created_at',),
+            },
+        ),
+    ]
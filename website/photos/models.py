@@ -11,7 +11,6 @@ from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
-from members.models import Member
 from events.models import Event
 from pushnotifications.models import ScheduledMessage, Category
 
@@ -49,6 +48,10 @@ class Photo(models.Model):
 
     _digest = models.CharField("digest", max_length=40,)
 
+    thumbnails = models.JSONField(
+        verbose_name=_("generated thumbnails"), editable=False, null=True,
+    )
+
     def __init__(self, *args, **kwargs):
         """Initialize Photo object and set the file if it exists."""
         super().__init__(*args, **kwargs)
@@ -61,6 +64,10 @@ class Photo(models.Model):
         """Return the filename of a Photo object."""
         return os.path.basename(self.file.name)
 
+    def has_thumbnail(self, size, fit=True):
+        """Return whether the thumbnail of this size has been generated."""
+        return f"{size}_{int(fit)}" in (self.thumbnails or [])
+
     class Meta:
         """Meta class for Photo."""
 
@@ -179,9 +186,9 @@ class Album(models.Model):
             new_album_notification.category = Category.objects.get(key=Category.PHOTO)
             new_album_notification.url = f"{settings.BASE_URL}{self.get_absolute_url()}"
             new_album_notification.time = new_album_notification_time
+            new_album_notification.audience = ScheduledMessage.CURRENT_MEMBERS
             new_album_notification.save()
             self.new_album_notification = new_album_notification
-            self.new_album_notification.users.set(Member.current_members.all())
         elif (
             self.hidden
             and self.new_album_notification is not None
@@ -204,3 +211,50 @@ class Album(models.Model):
         """Meta class for Album."""
 
         ordering = ("-date", "title")
+
+
+class ArchiveImport(models.Model):
+    """Model for the import of a zip or tar file into an album.
+
+    The archive is imported by the ``importalbumarchives`` management
+    command, which records its progress and warnings on this object.
+    """
+
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (QUEUED, _("Queued")),
+        (PROCESSING, _("Processing")),
+        (DONE, _("Done")),
+        (FAILED, _("Failed")),
+    )
+
+    album = models.ForeignKey(Album, on_delete=models.CASCADE, verbose_name=_("album"))
+
+    archive = models.FileField(_("archive"), upload_to="album-imports/")
+
+    status = models.CharField(
+        _("status"), max_length=20, choices=STATUS_CHOICES, default=QUEUED,
+    )
+
+    processed = models.PositiveIntegerField(_("files processed"), default=0)
+
+    imported = models.PositiveIntegerField(_("photos imported"), default=0)
+
+    warnings = models.JSONField(_("warnings"), default=list, blank=True)
+
+    created_at = models.DateTimeField(_("created at"), default=timezone.now)
+
+    finished_at = models.DateTimeField(_("finished at"), blank=True, null=True)
+
+    def __str__(self):
+        """Get string representation of ArchiveImport."""
+        return "{} ({})".format(os.path.basename(self.archive.name), self.status)
+
+    class Meta:
+        """Meta class for ArchiveImport."""
+
+        ordering = ("created_at",)
@@ -2,22 +2,36 @@ import hashlib
 import logging
 import os
 import tarfile
-from zipfile import ZipInfo, is_zipfile, ZipFile
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import BadZipFile, is_zipfile, ZipFile
 
 from django.conf import settings
-from django.contrib import messages
-from django.core.files import File
+from django.db import transaction
 from django.db.models import When, Value, BooleanField, ExpressionWrapper, Q, Case
 from django.http import Http404
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from PIL.JpegImagePlugin import JpegImageFile
 from PIL import ExifTags, Image, UnidentifiedImageError
 
-from photos.models import Photo
+from photos.models import Photo, Album, ArchiveImport
+from utils.media.services import get_thumbnail_paths, generate_thumbnails
 
 logger = logging.getLogger(__name__)
 
+# Errors of a single archive member, which is skipped instead of failing
+# the whole import
+_MEMBER_ERRORS = (
+    OSError,
+    UnidentifiedImageError,
+    Image.DecompressionBombError,
+    BadZipFile,
+    zlib.error,
+)
+
 
 def photo_determine_rotation(pil_image):
     """Get the rotation of an image."""
@@ -93,63 +107,169 @@ def get_annotated_accessible_albums(request, albums):
     return albums
 
 
-def extract_archive(request, album, archive):
-    """Extract zip and tar files."""
-    iszipfile = is_zipfile(archive)
-    archive.seek(0)
+def _archive_members(path):
+    """Iterate over the files in a zip or tar file without extracting it.
+
+    Tar files are read as a stream, so their members are returned in the
+    order of the archive. Zip files have an index and are sorted by name.
 
-    if iszipfile:
-        with ZipFile(archive) as zip_file:
-            for photo in sorted(zip_file.infolist(), key=lambda x: x.filename):
-                extract_photo(request, zip_file, photo, album)
+    :return: iterator over (filename, file object) tuples
+    """
+    if is_zipfile(path):
+        with ZipFile(path) as zip_file:
+            for member in sorted(zip_file.infolist(), key=lambda x: x.filename):
+                # Ignore directories
+                if not os.path.basename(member.filename):
+                    continue
+                with zip_file.open(member) as f:
+                    yield member.filename, f
     else:
-        # is_tarfile only supports filenames, so we cannot use that
         try:
-            with tarfile.open(fileobj=archive) as tar_file:
-                for photo in sorted(tar_file.getmembers(), key=lambda x: x.name):
-                    extract_photo(request, tar_file, photo, album)
+            with tarfile.open(path, mode="r|*") as tar_file:
+                for member in tar_file:
+                    if not member.isfile():
+                        continue
+                    yield member.name, tar_file.extractfile(member)
         except tarfile.ReadError as e:
             raise ValueError(_("The uploaded file is not a zip or tar file.")) from e
 
 
-def extract_photo(request, archive_file, photo, album):
-    """Extract ZipInfo or TarInfo Photo object."""
-    # zipfile and tarfile are inconsistent
-    if isinstance(photo, ZipInfo):
-        photo_filename = photo.filename
-        extract_file = archive_file.open
-    elif isinstance(photo, tarfile.TarInfo):
-        photo_filename = photo.name
-        extract_file = archive_file.extractfile
-    else:
-        raise TypeError("'photo' must be a ZipInfo or TarInfo object.")
+def _spool_member(member_file, directory):
+    """Copy an archive member to a temporary file while hashing it.
+
+    :return: tuple of the sha1 digest and the path of the temporary file
+    """
+    hash_sha1 = hashlib.sha1()
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as f:
+        try:
+            for chunk in iter(lambda: member_file.read(65536), b""):
+                hash_sha1.update(chunk)
+                f.write(chunk)
+        except BaseException:
+            os.remove(f.name)
+            raise
+    return hash_sha1.hexdigest(), f.name
 
-    # Ignore directories
-    if not os.path.basename(photo_filename):
-        return
 
-    # Generate unique filename
-    num = album.photo_set.count()
-    __, extension = os.path.splitext(photo_filename)
-    new_filename = str(num).zfill(4) + extension
+def _convert_photo(source_path, target_path):
+    """Downsize an image and save it as JPG, this runs in a worker process.
 
-    photo_obj = Photo()
-    photo_obj.album = album
+    :return: the rotation of the image
+    """
     try:
-        with extract_file(photo) as f:
-            photo_obj.file.save(new_filename, File(f))
+        with Image.open(source_path) as image:
+            rotation = photo_determine_rotation(image)
+            # Image.thumbnail does not upscale an image that is smaller
+            image.thumbnail(settings.PHOTO_UPLOAD_SIZE, Image.ANTIALIAS)
+            image.convert("RGB").save(target_path, "JPEG")
+        return rotation
+    finally:
+        os.remove(source_path)
+
+
+def import_archive(archive_import, max_workers=None, progress_interval=10):
+    """Import the photos in the zip or tar file of an ArchiveImport.
+
+    The archive is read as a stream, duplicates are detected against the
+    digests already in the album, the images are converted in a pool of
+    processes and the photos are created at once at the end. The progress
+    and warnings are recorded on the ArchiveImport. Members that cannot be
+    read or converted are skipped with a warning, any other error fails the
+    whole import.
+
+    :param archive_import: the ArchiveImport to process
+    :param max_workers: the number of processes, defaults to the number of CPUs
+    :param progress_interval: the number of files between progress updates
+    :return: the number of photos imported
+    """
+    album = archive_import.album
+    album_dir = os.path.join(Album.photosdir, album.dirname)
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, album_dir), exist_ok=True)
+    digests = set(album.photo_set.values_list("_digest", flat=True))
+    num = album.photo_set.count()
 
-        if not save_photo(photo_obj):
-            messages.add_message(
-                request, messages.WARNING, _("{} is duplicate.").format(photo_filename)
-            )
-    except (OSError, AttributeError, UnidentifiedImageError):
-        messages.add_message(
-            request, messages.WARNING, _("Ignoring {}").format(photo_filename)
+    archive_import.status = ArchiveImport.PROCESSING
+    archive_import.processed = 0
+    archive_import.warnings = []
+    archive_import.save()
+
+    def update_progress():
+        ArchiveImport.objects.filter(pk=archive_import.pk).update(
+            processed=archive_import.processed, warnings=archive_import.warnings
         )
-        if photo_obj.file.path:
-            os.remove(photo_obj.file.path)
-        photo_obj.delete()
+
+    pending = []
+    photos = []
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for filename, member_file in _archive_members(archive_import.archive.path):
+                try:
+                    digest, temp_path = _spool_member(
+                        member_file, os.path.join(settings.MEDIA_ROOT, album_dir)
+                    )
+                except _MEMBER_ERRORS:
+                    archive_import.processed += 1
+                    archive_import.warnings.append(_("Ignoring {}").format(filename))
+                    continue
+                if digest in digests:
+                    os.remove(temp_path)
+                    archive_import.processed += 1
+                    archive_import.warnings.append(
+                        _("{} is duplicate.").format(filename)
+                    )
+                    continue
+                digests.add(digest)
+
+                while os.path.exists(
+                    os.path.join(settings.MEDIA_ROOT, album_dir, f"{num:04}.jpg")
+                ):
+                    num += 1
+                name = os.path.join(album_dir, f"{num:04}.jpg")
+                num += 1
+
+                future = executor.submit(
+                    _convert_photo, temp_path, os.path.join(settings.MEDIA_ROOT, name),
+                )
+                pending.append((filename, digest, name, future))
+
+            for filename, digest, name, future in pending:
+                try:
+                    photos.append(
+                        Photo(
+                            album=album,
+                            file=name,
+                            rotation=future.result(),
+                            _digest=digest,
+                        )
+                    )
+                except _MEMBER_ERRORS:
+                    archive_import.warnings.append(_("Ignoring {}").format(filename))
+                archive_import.processed += 1
+                if archive_import.processed % progress_interval == 0:
+                    update_progress()
+
+        with transaction.atomic():
+            Photo.objects.bulk_create(photos)
+    except Exception as e:  # pylint: disable=broad-except
+        # A failed import must not be picked up again, and the converted
+        # images have no photos
+        if not isinstance(e, ValueError):
+            logger.exception("Importing %s failed", archive_import.archive.name)
+        for _filename, _digest, name, _future in pending:
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            if os.path.exists(path):
+                os.remove(path)
+        photos = []
+        archive_import.status = ArchiveImport.FAILED
+        archive_import.warnings.append(str(e))
+    else:
+        archive_import.status = ArchiveImport.DONE
+        archive_import.imported = len(photos)
+        archive_import.archive.delete(save=False)
+
+    archive_import.finished_at = timezone.now()
+    archive_import.save()
+    return len(photos)
 
 
 def save_photo(photo_obj):
@@ -189,7 +309,44 @@ def save_photo(photo_obj):
     photo_obj.original_file = image_path
     image_name, _ext = os.path.splitext(photo_obj.file.name)
     photo_obj.file.name = "{}.jpg".format(image_name)
+    # Queue the photo for generate_photo_thumbnails
+    photo_obj.thumbnails = None
 
     photo_obj.save()
 
     return True
+
+
+def generate_photo_thumbnails(photos, max_workers=None, chunk_size=100, progress=None):
+    """Generate the configured thumbnails of photos in a pool of processes.
+
+    The generated sizes are recorded on the photos after every chunk, so
+    the thumbnail urls can be built without checking the file system.
+
+    :param photos: the photos to generate the thumbnails for
+    :param max_workers: the number of processes, defaults to the number of CPUs
+    :param chunk_size: the number of photos recorded at once
+    :param progress: optional callable that gets the number of photos done
+    :return: the number of photos processed
+    """
+    done = 0
+    photos = list(photos)
+    for start in range(0, len(photos), chunk_size):
+        chunk = photos[start : start + chunk_size]
+        jobs = []
+        keys = []
+        for photo in chunk:
+            for size, fit in settings.PHOTO_THUMBNAILS:
+                jobs.append((*get_thumbnail_paths(photo.file, size, fit), size, fit))
+                keys.append((photo, f"{size}_{int(fit)}"))
+            photo.thumbnails = []
+
+        for (photo, key), success in zip(keys, generate_thumbnails(jobs, max_workers)):
+            if success:
+                photo.thumbnails.append(key)
+
+        Photo.objects.bulk_update(chunk, ["thumbnails"])
+        done += len(chunk)
+        if progress:
+            progress(done)
+    return done
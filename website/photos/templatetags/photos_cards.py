@@ -16,8 +16,9 @@ def album_card(album):
     image_url = ""
 
     if album.cover:
+        size = settings.THUMBNAIL_SIZES["medium"]
         image_url = get_thumbnail_url(
-            album.cover.file, settings.THUMBNAIL_SIZES["medium"]
+            album.cover.file, size, generated=album.cover.has_thumbnail(size)
         )
         if album.cover.rotation > 0:
             class_name += " rotate{}".format(album.cover.rotation)
@@ -54,7 +55,12 @@ def photo_card(photo):
             reverse("photos:download", args=[photo.album.slug, photo])
         )
 
-    image_url = get_thumbnail_url(photo.file, settings.THUMBNAIL_SIZES["medium"])
+    size = settings.THUMBNAIL_SIZES["medium"]
+    image_url = get_thumbnail_url(photo.file, size, generated=photo.has_thumbnail(size))
+    size = settings.THUMBNAIL_SIZES["large"]
+    url = get_thumbnail_url(
+        photo.file, size, fit=False, generated=photo.has_thumbnail(size, fit=False)
+    )
 
     if photo.rotation > 0:
         class_name += " rotate{}".format(photo.rotation)
@@ -64,7 +70,7 @@ def photo_card(photo):
 
     return grid_item(
         title="",
-        url=get_thumbnail_url(photo.file, settings.THUMBNAIL_SIZES["large"], fit=False),
+        url=url,
         image_url=image_url,
         class_name=class_name,
         anchor_attrs=anchor_attrs,
@@ -1,14 +1,17 @@
 import os
 import datetime
 
-from io import BytesIO
+from io import BytesIO, StringIO
+from unittest import mock
 from zipfile import ZipFile
 
 from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError
 from django.test import Client, TestCase, override_settings
 
 from members.models import Member
-from photos.models import Album, Photo
+from photos.models import Album, Photo, ArchiveImport
 
 
 def create_zip(photos):
@@ -22,6 +25,10 @@ def create_zip(photos):
     return output_file
 
 
+def import_archives():
+    call_command("importalbumarchives", workers=1, stdout=StringIO())
+
+
 @override_settings(SUSPEND_SIGNALS=True)
 class AlbumUploadTest(TestCase):
     """Tests album uploads in the admin."""
@@ -50,6 +57,7 @@ class AlbumUploadTest(TestCase):
             },
             follow=True,
         )
+        import_archives()
 
         self.assertEqual(Album.objects.all().count(), 1)
         self.assertEqual(Photo.objects.all().count(), 1)
@@ -90,6 +98,7 @@ class AlbumUploadTest(TestCase):
             },
             follow=True,
         )
+        import_archives()
 
         pk = Album.objects.first().pk
         self.client.post(
@@ -102,10 +111,113 @@ class AlbumUploadTest(TestCase):
             },
             follow=True,
         )
+        import_archives()
 
         self.assertEqual(Album.objects.all().count(), 1)
         self.assertEqual(Photo.objects.all().count(), 1)
 
+    def test_album_upload_duplicate_in_archive(self):
+        photo = os.path.join(settings.BASE_DIR, "photos/fixtures/thom_assessor.png")
+        output_file = create_zip([photo])
+        with ZipFile(output_file, "a") as zip_file:
+            zip_file.write(photo, "copy.png")
+        output_file.seek(0)
+
+        self.client.post(
+            "/admin/photos/album/add/",
+            {
+                "title": "test album",
+                "date": "2017-04-12",
+                "slug": "2017-04-12-test-album",
+                "album_archive": output_file,
+            },
+            follow=True,
+        )
+        self.assertEqual(Photo.objects.all().count(), 0)
+        self.assertEqual(ArchiveImport.objects.get().status, ArchiveImport.QUEUED)
+
+        import_archives()
+
+        self.assertEqual(Photo.objects.all().count(), 1)
+        archive_import = ArchiveImport.objects.get()
+        self.assertEqual(archive_import.status, ArchiveImport.DONE)
+        self.assertEqual(archive_import.processed, 2)
+        self.assertEqual(archive_import.imported, 1)
+        self.assertEqual(len(archive_import.warnings), 1)
+        self.assertFalse(archive_import.archive)
+
+    def test_album_upload_corrupt_member(self):
+        photos = [
+            os.path.join(settings.BASE_DIR, "photos/fixtures/janbeleid-hoe.jpg"),
+            os.path.join(settings.BASE_DIR, "photos/fixtures/thom_assessor.png"),
+        ]
+        output_file = create_zip(photos)
+        # Damage the data of the last photo, after the first one is converted
+        data = bytearray(output_file.getvalue())
+        with ZipFile(BytesIO(data)) as zip_file:
+            member = zip_file.infolist()[-1]
+        start = member.header_offset + 30 + len(member.filename.encode())
+        data[start + 100 : start + 200] = bytes(100)
+        output_file = BytesIO(bytes(data))
+
+        self.client.post(
+            "/admin/photos/album/add/",
+            {
+                "title": "test album",
+                "date": "2017-04-12",
+                "slug": "2017-04-12-test-album",
+                "album_archive": output_file,
+            },
+            follow=True,
+        )
+        album_dir = os.path.join(
+            settings.MEDIA_ROOT, Album.photosdir, Album.objects.get().dirname
+        )
+        os.makedirs(album_dir, exist_ok=True)
+        files = set(os.listdir(album_dir))
+
+        import_archives()
+
+        archive_import = ArchiveImport.objects.get()
+        self.assertEqual(archive_import.status, ArchiveImport.DONE)
+        self.assertEqual(archive_import.processed, 2)
+        self.assertEqual(archive_import.imported, 1)
+        self.assertEqual(
+            archive_import.warnings, [f"Ignoring {member.filename}"],
+        )
+        self.assertEqual(Photo.objects.count(), 1)
+        self.assertEqual(len(files) + 1, len(os.listdir(album_dir)))
+
+    def test_album_upload_failed(self):
+        output_file = create_zip(
+            [os.path.join(settings.BASE_DIR, "photos/fixtures/thom_assessor.png")]
+        )
+        self.client.post(
+            "/admin/photos/album/add/",
+            {
+                "title": "test album",
+                "date": "2017-04-12",
+                "slug": "2017-04-12-test-album",
+                "album_archive": output_file,
+            },
+            follow=True,
+        )
+        album_dir = os.path.join(
+            settings.MEDIA_ROOT, Album.photosdir, Album.objects.get().dirname
+        )
+        os.makedirs(album_dir, exist_ok=True)
+        files = set(os.listdir(album_dir))
+
+        with mock.patch(
+            "photos.models.Photo.objects.bulk_create", side_effect=DatabaseError
+        ):
+            import_archives()
+
+        archive_import = ArchiveImport.objects.get()
+        self.assertEqual(archive_import.status, ArchiveImport.FAILED)
+        self.assertEqual(Photo.objects.count(), 0)
+        self.assertEqual(files, set(os.listdir(album_dir)))
+
     def test_album_upload_different_photo_in_album(self):
         output_file = create_zip(
             [os.path.join(settings.BASE_DIR, "photos/fixtures/thom_assessor.png")]
@@ -120,6 +232,7 @@ class AlbumUploadTest(TestCase):
             },
             follow=True,
         )
+        import_archives()
 
         output_file = create_zip(
             [os.path.join(settings.BASE_DIR, "photos/fixtures/janbeleid-hoe.jpg")]
@@ -135,6 +248,7 @@ class AlbumUploadTest(TestCase):
             },
             follow=True,
         )
+        import_archives()
 
         self.assertEqual(Album.objects.all().count(), 1)
         self.assertEqual(Photo.objects.all().count(), 2)
@@ -153,5 +267,6 @@ class AlbumUploadTest(TestCase):
             },
             follow=True,
         )
+        import_archives()
 
         self.assertEqual(Photo.objects.first().rotation, 90)
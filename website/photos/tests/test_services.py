@@ -1,7 +1,10 @@
 import os
+import tempfile
+from unittest import mock
 
 from PIL import Image
 
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, RequestFactory, override_settings
 from django.utils.datetime_safe import datetime
 from django.conf import settings
@@ -9,12 +12,15 @@ from django.conf import settings
 from freezegun import freeze_time
 
 from members.models import Member, Membership
-from photos.models import Album
+from photos.models import Album, Photo
 from photos.services import (
     is_album_accessible,
     photo_determine_rotation,
     get_annotated_accessible_albums,
+    generate_photo_thumbnails,
 )
+from thaliawebsite.api.services import create_image_thumbnail_dict
+from utils.media.services import get_thumbnail_paths
 
 
 @override_settings(SUSPEND_SIGNALS=True)
@@ -157,3 +163,68 @@ class DetermineRotationTest(TestCase):
                 ) as f:
                     rot = photo_determine_rotation(Image.open(f))
                     self.assertEqual(orientations[i - 1], rot)
+
+
+@override_settings(
+    SUSPEND_SIGNALS=True,
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    PHOTO_THUMBNAILS=[("300x300", True), ("600x600", False)],
+)
+class GeneratePhotoThumbnailsTest(TestCase):
+    def setUp(self):
+        self.album = Album.objects.create(
+            title="test_album",
+            date=datetime(year=2018, month=9, day=5),
+            slug="test_album",
+            hidden=True,
+        )
+        with open(
+            os.path.join(settings.BASE_DIR, "photos/fixtures/thom_assessor.png"), "rb"
+        ) as f:
+            self.photo = Photo.objects.create(
+                album=self.album,
+                file=SimpleUploadedFile(
+                    name="photo.png", content=f.read(), content_type="image/png"
+                ),
+            )
+        self.missing = Photo.objects.create(album=self.album, file="photos/none.png")
+
+    def test_generate_photo_thumbnails(self):
+        progress = []
+        generate_photo_thumbnails(
+            Photo.objects.order_by("pk"), max_workers=1, progress=progress.append
+        )
+
+        self.assertEqual(progress, [2])
+        self.photo.refresh_from_db()
+        self.missing.refresh_from_db()
+        self.assertEqual(self.photo.thumbnails, ["300x300_1", "600x600_0"])
+        self.assertTrue(self.photo.has_thumbnail("300x300"))
+        self.assertFalse(self.photo.has_thumbnail("300x300", fit=False))
+        self.assertEqual(self.missing.thumbnails, [])
+
+        __, thumb_path = get_thumbnail_paths(self.photo.file, "300x300", True)
+        with Image.open(thumb_path) as thumb:
+            self.assertEqual(thumb.size, (300, 300))
+
+    def test_api_thumbnail_urls(self):
+        generate_photo_thumbnails(Photo.objects.filter(pk=self.photo.pk), max_workers=1)
+        self.photo.refresh_from_db()
+        request = RequestFactory().get("/")
+
+        with mock.patch(
+            "utils.media.services.os.path.isfile", return_value=False
+        ) as isfile:
+            urls = create_image_thumbnail_dict(
+                request,
+                self.photo.file,
+                size_small="300x300",
+                size_medium="600x600",
+                fit_medium=False,
+                generated=self.photo.thumbnails,
+            )
+        # The file system is only checked for the thumbnail that is not generated
+        self.assertEqual(isfile.call_count, 1)
+        self.assertNotIn("generate-thumbnail", urls["small"])
+        self.assertNotIn("generate-thumbnail", urls["medium"])
+        self.assertIn("generate-thumbnail", urls["large"])
@@ -10,10 +10,8 @@ class PizzasConfig(AppConfig):
     verbose_name = _("Pizzas")
 
     def ready(self):
-        """Import the signals when the app is ready."""
-        # pylint: disable=unused-import,import-outside-toplevel
-        from . import signals
-
+        """Register the payables when the app is ready."""
+        # pylint: disable=import-outside-toplevel
         from .payables import register
 
         register()
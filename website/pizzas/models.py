@@ -6,7 +6,6 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from events.models import Event
-import members
 from members.models import Member
 from payments.models import Payment
 from payments.services import delete_payment
@@ -112,17 +111,10 @@ class FoodEvent(models.Model):
             end_reminder.body = "You can order food for 10 more minutes"
             end_reminder.category = Category.objects.get(key=Category.PIZZA)
             end_reminder.time = self.end - timezone.timedelta(minutes=10)
+            end_reminder.audience = ScheduledMessage.FOOD_EVENT_REMINDER
+            end_reminder.audience_event = self.event
             end_reminder.save()
 
-            if self.event.registration_required:
-                end_reminder.users.set(
-                    self.event.registrations.select_related("member").values_list(
-                        "member", flat=True
-                    )
-                )
-            else:
-                end_reminder.users.set(Member.current_members.all())
-
             self.end_reminder = end_reminder
         elif self.send_notification and self.end_reminder and self._end != self.end:
             self.end_reminder.time = self.end
@@ -183,9 +175,7 @@ class Product(models.Model):
 class FoodOrder(models.Model):
     """Describes an order of an item during a food event."""
 
-    member = models.ForeignKey(
-        members.models.Member, on_delete=models.CASCADE, blank=True, null=True,
-    )
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, blank=True, null=True,)
 
     name = models.CharField(
         verbose_name=_("name"),
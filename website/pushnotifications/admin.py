@@ -70,6 +70,7 @@ class MessageAdmin(ModelAdmin):
 
     list_display = ("title", "body", "category", "url", "sent", "success", "failure")
     filter_horizontal = ("users",)
+    autocomplete_fields = ("audience_event",)
     list_filter = (MessageSentFilter, "category")
     date_hierarchy = "sent"
 
@@ -77,6 +78,8 @@ class MessageAdmin(ModelAdmin):
         if obj and obj.sent:
             return (
                 "users",
+                "audience",
+                "audience_event",
                 "title",
                 "body",
                 "url",
@@ -87,6 +90,8 @@ class MessageAdmin(ModelAdmin):
             )
         return (
             "users",
+            "audience",
+            "audience_event",
             "title",
             "body",
             "url",
@@ -97,6 +102,8 @@ class MessageAdmin(ModelAdmin):
         if obj and obj.sent:
             return (
                 "users",
+                "audience",
+                "audience_event",
                 "title",
                 "body",
                 "url",
@@ -119,12 +126,15 @@ class ScheduledMessageAdmin(ModelAdmin):
     list_display = ("title", "body", "time", "category", "sent", "success", "failure")
     date_hierarchy = "time"
     filter_horizontal = ("users",)
+    autocomplete_fields = ("audience_event",)
     list_filter = (MessageSentFilter, "category")
 
     def get_fields(self, request, obj=None):
         if obj and obj.sent:
             return (
                 "users",
+                "audience",
+                "audience_event",
                 "title",
                 "body",
                 "url",
@@ -137,6 +147,8 @@ class ScheduledMessageAdmin(ModelAdmin):
             )
         return (
             "users",
+            "audience",
+            "audience_event",
             "title",
             "body",
             "url",
@@ -148,6 +160,8 @@ class ScheduledMessageAdmin(ModelAdmin):
         if obj and obj.sent:
             return (
                 "users",
+                "audience",
+                "audience_event",
                 "title",
                 "body",
                 "url",
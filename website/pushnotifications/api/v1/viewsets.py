@@ -61,8 +61,8 @@ class MessageViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = MessageSerializer
 
     def get_queryset(self):
-        queryset = Message.all_objects.filter(
-            users=self.request.user, sent__isnull=False
+        queryset = Message.all_objects.for_user(self.request.user).filter(
+            sent__isnull=False
         )
 
         category = self.request.query_params.get("category", None)
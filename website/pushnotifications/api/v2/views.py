@@ -92,7 +92,7 @@ class MessageListView(ListAPIView):
 
     def get_queryset(self):
         if self.request.user:
-            return Message.all_objects.filter(users=self.request.user)
+            return Message.all_objects.for_user(self.request.user)
         return Message.all_objects.all()
 
 
@@ -107,5 +107,5 @@ class MessageDetailView(RetrieveAPIView):
 
     def get_queryset(self):
         if self.request.user:
-            return Message.all_objects.filter(users=self.request.user)
+            return Message.all_objects.for_user(self.request.user)
         return Message.all_objects.all()
@@ -0,0 +1,133 @@
+"""Delivery of push notifications in concurrent multicast batches."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from firebase_admin import exceptions, messaging
+
+logger = logging.getLogger(__name__)
+
+# The maximum number of tokens Firebase accepts in a single multicast message
+MAX_BATCH_SIZE = 500
+
+
+class FirebaseTransport:
+    """Sends multicast messages using Firebase Cloud Messaging."""
+
+    def send_multicast(self, message, dry_run=False):
+        """Send a multicast message.
+
+        :param message: the ``messaging.MulticastMessage`` to send
+        :param dry_run: only validate the message if True
+        :return: for every token of the message, in order, None if the message
+                 was delivered or the exception that occurred otherwise
+        """
+        response = messaging.send_multicast(message, dry_run=dry_run)
+        return [r.exception for r in response.responses]
+
+
+def get_transport():
+    """Get an instance of the transport configured in the settings."""
+    return import_string(settings.PUSHNOTIFICATIONS_TRANSPORT)()
+
+
+class BatchResult:
+    """Describes the outcome of sending a single batch."""
+
+    def __init__(self, size, latency, failure):
+        self.size = size
+        self.latency = latency
+        self.failure = failure
+
+
+class DeliveryReport:
+    """Describes the outcome of a delivery.
+
+    Tokens that are no longer registered or that are invalid are collected
+    in ``unregistered`` and ``invalid``, so the devices can be cleaned up
+    at once after delivery.
+    """
+
+    def __init__(self):
+        self.success = 0
+        self.failure = 0
+        self.batches = []
+        self.unregistered = set()
+        self.invalid = set()
+
+
+def _batches(tokens, batch_size):
+    for i in range(0, len(tokens), batch_size):
+        yield tokens[i : i + batch_size]
+
+
+def _send_batch(transport, tokens, message_kwargs, dry_run):
+    start = time.monotonic()
+    try:
+        results = transport.send_multicast(
+            messaging.MulticastMessage(tokens=tokens, **message_kwargs),
+            dry_run=dry_run,
+        )
+    except exceptions.FirebaseError as e:
+        logger.exception("Sending a batch of %d notifications failed", len(tokens))
+        results = [e] * len(tokens)
+    return tokens, results, time.monotonic() - start
+
+
+def deliver(
+    payloads, dry_run=False, transport=None, batch_size=MAX_BATCH_SIZE, max_workers=4,
+):
+    """Deliver messages to devices in concurrent multicast batches.
+
+    :param payloads: iterable of ``(tokens, message_kwargs)`` tuples, where
+                     ``message_kwargs`` are the arguments of the
+                     ``messaging.MulticastMessage`` sent to the tokens
+    :param dry_run: only validate the messages if True
+    :param transport: the transport to use, defaults to the one in the settings
+    :param batch_size: the maximum number of tokens per batch
+    :param max_workers: the maximum number of batches sent at the same time
+    :return: the report of the delivery
+    :rtype: DeliveryReport
+    """
+    if transport is None:
+        transport = get_transport()
+
+    batches = [
+        (batch, message_kwargs)
+        for tokens, message_kwargs in payloads
+        for batch in _batches(list(tokens), batch_size)
+    ]
+
+    report = DeliveryReport()
+    if not batches:
+        return report
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_send_batch, transport, tokens, message_kwargs, dry_run)
+            for tokens, message_kwargs in batches
+        ]
+        for future in futures:
+            tokens, results, latency = future.result()
+            failure = 0
+            for token, exception in zip(tokens, results):
+                if exception is None:
+                    report.success += 1
+                    continue
+                failure += 1
+                if isinstance(exception, messaging.UnregisteredError):
+                    report.unregistered.add(token)
+                elif isinstance(exception, exceptions.InvalidArgumentError):
+                    report.invalid.add(token)
+            report.failure += failure
+            report.batches.append(BatchResult(len(tokens), latency, failure))
+            logger.info(
+                "Sent batch of %d notifications in %.3fs, %d failed",
+                len(tokens),
+                latency,
+                failure,
+            )
+
+    return report
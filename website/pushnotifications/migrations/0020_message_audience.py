@@ -0,0 +1,25 @@
+# Generated by Django 3.2.7 on 2026-10-18 18:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0049_event_optional_registrations'),
+        ('pushnotifications', '0019_remove_multilang_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='audience',
+            field=models.CharField(choices=[('explicit', 'Selected users'), ('current_members', 'All current members'), ('event_registrations', 'Members registered for the event'), ('food_event_reminder', 'Members that did not order food at the event')], default='explicit', help_text='Only messages to selected users are sent to the users above, the other audiences are determined when the message is sent', max_length=20, verbose_name='audience'),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='audience_event',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event', verbose_name='audience event'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    """Replace the recipients of unsent reminders by their audience rule."""
+    Event = apps.get_model("events", "Event")
+    Album = apps.get_model("photos", "Album")
+    FoodEvent = apps.get_model("pizzas", "FoodEvent")
+    ScheduledMessage = apps.get_model("pushnotifications", "ScheduledMessage")
+
+    def update(message_ids, **kwargs):
+        messages = ScheduledMessage.objects.filter(pk__in=message_ids, sent=None)
+        messages.update(**kwargs)
+        ScheduledMessage.users.through.objects.filter(
+            message_id__in=messages.values("pk")
+        ).delete()
+
+    update(
+        Event.objects.exclude(registration_reminder=None).values(
+            "registration_reminder"
+        ),
+        audience="current_members",
+    )
+    update(
+        Album.objects.exclude(new_album_notification=None).values(
+            "new_album_notification"
+        ),
+        audience="current_members",
+    )
+    for event in Event.objects.exclude(start_reminder=None):
+        if event.registration_start or event.registration_end:
+            update(
+                [event.start_reminder_id],
+                audience="event_registrations",
+                audience_event=event,
+            )
+        else:
+            update([event.start_reminder_id], audience="current_members")
+    for food_event in FoodEvent.objects.exclude(end_reminder=None):
+        update(
+            [food_event.end_reminder_id],
+            audience="food_event_reminder",
+            audience_event_id=food_event.event_id,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0049_event_optional_registrations"),
+        ("photos", "0016_archiveimport"),
+        ("pizzas", "0016_alter_foodorder_payment"),
+        ("pushnotifications", "0020_message_audience"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -3,10 +3,15 @@ import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import override
-from firebase_admin import messaging, exceptions
+from firebase_admin import messaging
+
+from members.models import Member
+from pushnotifications import delivery
 
 
 class Category(models.Model):
@@ -77,24 +82,120 @@ class Device(models.Model):
         )
 
 
-class NormalMessageManager(models.Manager):
+class MessageQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Select the messages addressed to a user.
+
+        Messages with an audience rule are matched against the rule at the
+        time they were sent, so messages to all current members are only
+        selected once sent.
+
+        :param user: the user to select the messages for
+        :return: the filtered queryset
+        :rtype: Queryset
+        """
+        member = Member.objects.filter(pk=user.pk)
+        sent_date = OuterRef("sent_date")
+        return (
+            self.alias(sent_date=TruncDate("sent"))
+            .alias(
+                is_explicit_recipient=Exists(
+                    Message.users.through.objects.filter(
+                        message=OuterRef("pk"), user=user.pk
+                    )
+                ),
+                is_current_member=Exists(
+                    member.filter(
+                        Q(membership__since__lte=sent_date)
+                        & (
+                            Q(membership__until__isnull=True)
+                            | Q(membership__until__gt=sent_date)
+                        )
+                    )
+                ),
+                is_registered=Exists(
+                    member.filter(
+                        eventregistration__event=OuterRef("audience_event"),
+                        eventregistration__date_cancelled=None,
+                    )
+                ),
+                has_food_order=Exists(
+                    member.filter(
+                        foodorder__food_event__event=OuterRef("audience_event")
+                    )
+                ),
+            )
+            .filter(
+                Q(audience=Message.EXPLICIT, is_explicit_recipient=True)
+                | Q(audience=Message.CURRENT_MEMBERS, is_current_member=True)
+                | Q(audience=Message.EVENT_REGISTRATIONS, is_registered=True)
+                | (
+                    Q(audience=Message.FOOD_EVENT_REMINDER, has_food_order=False)
+                    & (
+                        (
+                            Q(audience_event__registration_start__isnull=False)
+                            | Q(audience_event__registration_end__isnull=False)
+                        )
+                        & Q(is_registered=True)
+                        | Q(
+                            audience_event__registration_start__isnull=True,
+                            audience_event__registration_end__isnull=True,
+                            is_current_member=True,
+                        )
+                    )
+                )
+            )
+        )
+
+
+class NormalMessageManager(models.Manager.from_queryset(MessageQuerySet)):
     """Returns manual messages only."""
 
     def get_queryset(self):
         return super().get_queryset().filter(scheduledmessage__scheduled=None)
 
 
-class MessageManager(models.Manager):
+class MessageManager(models.Manager.from_queryset(MessageQuerySet)):
     """Returns all messages."""
 
 
 class Message(models.Model):
     """Describes a push notification."""
 
+    EXPLICIT = "explicit"
+    CURRENT_MEMBERS = "current_members"
+    EVENT_REGISTRATIONS = "event_registrations"
+    FOOD_EVENT_REMINDER = "food_event_reminder"
+
+    AUDIENCE_CHOICES = (
+        (EXPLICIT, _("Selected users")),
+        (CURRENT_MEMBERS, _("All current members")),
+        (EVENT_REGISTRATIONS, _("Members registered for the event")),
+        (FOOD_EVENT_REMINDER, _("Members that did not order food at the event")),
+    )
+
     objects = NormalMessageManager()
     all_objects = MessageManager()
 
     users = models.ManyToManyField(settings.AUTH_USER_MODEL)
+    audience = models.CharField(
+        verbose_name=_("audience"),
+        max_length=20,
+        choices=AUDIENCE_CHOICES,
+        default=EXPLICIT,
+        help_text=_(
+            "Only messages to selected users are sent to the users above, "
+            "the other audiences are determined when the message is sent"
+        ),
+    )
+    audience_event = models.ForeignKey(
+        "events.Event",
+        on_delete=models.CASCADE,
+        verbose_name=_("audience event"),
+        related_name="+",
+        null=True,
+        blank=True,
+    )
     title = models.CharField(max_length=150, verbose_name=_("title"))
     body = models.TextField(verbose_name=_("body"))
     url = models.CharField(
@@ -113,64 +214,93 @@ class Message(models.Model):
     def __str__(self):
         return "{}: {}".format(self.title, self.body)
 
+    def recipients(self):
+        """Get the users this message is sent to.
+
+        Only the users of messages with an explicit audience are stored,
+        the other audiences are resolved when this is called.
+
+        :return: the users that should receive this message
+        :rtype: Queryset
+        """
+        if self.audience == self.CURRENT_MEMBERS:
+            return Member.current_members.all()
+        if self.audience in (self.EVENT_REGISTRATIONS, self.FOOD_EVENT_REMINDER):
+            registered = Member.objects.filter(
+                eventregistration__event=self.audience_event_id,
+                eventregistration__date_cancelled=None,
+            )
+            if self.audience == self.EVENT_REGISTRATIONS:
+                return registered
+            if not self.audience_event.registration_required:
+                registered = Member.current_members.all()
+            return registered.exclude(
+                foodorder__food_event__event=self.audience_event_id
+            )
+        return self.users.all()
+
     def send(self, **kwargs):
         if self:
-            success_total = 0
-            failure_total = 0
             ttl = kwargs.get("ttl", 3600)
 
+            tokens = {}
+            for reg_id, lang in (
+                Device.objects.filter(
+                    user__in=self.recipients(),
+                    receive_category__key=self.category_id,
+                    active=True,
+                )
+                .values_list("registration_id", "language")
+                .distinct()
+            ):
+                tokens.setdefault(lang, []).append(reg_id)
+
+            payloads = []
             for lang in settings.LANGUAGES:
+                if lang[0] not in tokens:
+                    continue
                 with override(lang[0]):
-                    reg_ids = list(
-                        Device.objects.filter(
-                            user__in=self.users.all(),
-                            receive_category__key=self.category_id,
-                            active=True,
-                            language=lang[0],
-                        ).values_list("registration_id", flat=True)
-                    )
-
-                    data = kwargs.get("data", {})
+                    data = dict(kwargs.get("data", {}))
                     if self.url is not None:
                         data["url"] = self.url
                     data["title"] = self.title
                     data["body"] = str(self.body)
 
-                    message = messaging.Message(
-                        notification=messaging.Notification(
-                            title=data["title"], body=data["body"],
-                        ),
-                        data=data,
-                        android=messaging.AndroidConfig(
-                            ttl=datetime.timedelta(seconds=ttl),
-                            priority="normal",
-                            notification=messaging.AndroidNotification(
-                                color="#E62272", sound="default",
-                            ),
-                        ),
+                    payloads.append(
+                        (
+                            tokens[lang[0]],
+                            {
+                                "notification": messaging.Notification(
+                                    title=data["title"], body=data["body"],
+                                ),
+                                "data": data,
+                                "android": messaging.AndroidConfig(
+                                    ttl=datetime.timedelta(seconds=ttl),
+                                    priority="normal",
+                                    notification=messaging.AndroidNotification(
+                                        color="#E62272", sound="default",
+                                    ),
+                                ),
+                            },
+                        )
                     )
 
-                    for reg_id in reg_ids:
-                        message.token = reg_id
-                        try:
-                            messaging.send(
-                                message, dry_run=kwargs.get("dry_run", False)
-                            )
-                            success_total += 1
-                        except messaging.UnregisteredError:
-                            failure_total += 1
-                            Device.objects.filter(registration_id=reg_id).delete()
-                        except exceptions.InvalidArgumentError:
-                            failure_total += 1
-                            Device.objects.filter(registration_id=reg_id).update(
-                                active=False
-                            )
-                        except exceptions.FirebaseError:
-                            failure_total += 1
+            report = delivery.deliver(
+                payloads,
+                dry_run=kwargs.get("dry_run", False),
+                transport=kwargs.get("transport"),
+            )
+
+            if report.unregistered:
+                Device.objects.filter(registration_id__in=report.unregistered).delete()
+            if report.invalid:
+                Device.objects.filter(registration_id__in=report.invalid).update(
+                    active=False
+                )
 
             self.sent = timezone.now()
-            self.success = success_total
-            self.failure = failure_total
+            self.success = report.success
+            self.failure = report.failure
             self.save()
 
 
@@ -1,11 +1,17 @@
 import datetime
+import threading
 
 from django.test import TestCase, override_settings
 from django.utils import timezone
+from firebase_admin import exceptions, messaging
 
 from activemembers.models import Committee
-from events.models import Event, Member
+from events.models import Event, EventRegistration
 from mailinglists.models import MailingList
+from members.models import Member, Membership
+from pizzas.models import FoodEvent, FoodOrder, Product
+from pushnotifications import delivery
+from pushnotifications.models import Category, Device, Message
 
 
 @override_settings(SUSPEND_SIGNALS=True)
@@ -39,3 +45,178 @@ class PushNotificationsTest(TestCase):
     def test_deleting_notification_for_event_doesnt_crash(self) -> None:
         self.assertIsNotNone(self.event.start_reminder)
         self.event.start_reminder.delete()
+
+
+class FakeTransport:
+    """Transport that fails for the tokens in ``failures``."""
+
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def send_multicast(self, message, dry_run=False):
+        with self.lock:
+            self.messages.append(message)
+        return [self.failures.get(token) for token in message.tokens]
+
+
+class DeliveryTest(TestCase):
+    """Tests the delivery of push notifications."""
+
+    fixtures = ["members.json"]
+
+    def test_deliver_batches(self):
+        transport = FakeTransport(
+            failures={
+                "t3": messaging.UnregisteredError("unregistered"),
+                "t7": exceptions.InvalidArgumentError("invalid"),
+                "t8": exceptions.UnavailableError("unavailable"),
+            }
+        )
+        report = delivery.deliver(
+            [
+                ([f"t{i}" for i in range(7)], {"data": {"lang": "en"}}),
+                ([f"t{i}" for i in range(7, 10)], {"data": {"lang": "nl"}}),
+            ],
+            transport=transport,
+            batch_size=3,
+        )
+
+        self.assertEqual(
+            sorted(len(m.tokens) for m in transport.messages), [1, 3, 3, 3]
+        )
+        self.assertEqual(report.success, 7)
+        self.assertEqual(report.failure, 3)
+        self.assertEqual(report.unregistered, {"t3"})
+        self.assertEqual(report.invalid, {"t7"})
+        self.assertEqual(len(report.batches), 4)
+        self.assertEqual(sum(b.failure for b in report.batches), 3)
+
+    def test_message_send(self):
+        member = Member.objects.first()
+        category = Category.objects.get(key=Category.GENERAL)
+        for i in range(3):
+            device = Device.objects.create(
+                registration_id=f"token{i}", type="android", user=member
+            )
+            device.receive_category.set([category])
+
+        message = Message.objects.create(title="title", body="body")
+        message.users.add(member)
+        transport = FakeTransport(
+            failures={
+                "token1": messaging.UnregisteredError("unregistered"),
+                "token2": exceptions.InvalidArgumentError("invalid"),
+            }
+        )
+        message.send(transport=transport)
+
+        self.assertEqual(len(transport.messages), 1)
+        self.assertEqual(message.success, 1)
+        self.assertEqual(message.failure, 2)
+        self.assertIsNotNone(message.sent)
+        self.assertFalse(Device.objects.filter(registration_id="token1").exists())
+        self.assertFalse(Device.objects.get(registration_id="token2").active)
+        self.assertTrue(Device.objects.get(registration_id="token0").active)
+
+
+@override_settings(SUSPEND_SIGNALS=True)
+class AudienceTest(TestCase):
+    """Tests the audiences of messages."""
+
+    fixtures = ["members.json"]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.get(pk=1)
+        cls.other_member = Member.objects.get(pk=2)
+        Membership.objects.create(
+            user=cls.other_member,
+            type=Membership.MEMBER,
+            since=datetime.date(2000, 1, 1),
+        )
+        cls.committee = Committee.objects.create(name="committee")
+        cls.event = Event.objects.create(
+            title="testevent",
+            organiser=cls.committee,
+            description="desc",
+            start=timezone.now() + datetime.timedelta(days=3),
+            end=timezone.now() + datetime.timedelta(days=3, hours=1),
+            registration_start=timezone.now() + datetime.timedelta(days=1),
+            registration_end=timezone.now() + datetime.timedelta(days=2),
+            location="test location",
+            map_location="test map location",
+            price=0.00,
+            fine=5.00,
+            published=True,
+        )
+
+    def test_event_reminders(self):
+        registration_reminder = self.event.registration_reminder
+        start_reminder = self.event.start_reminder
+        self.assertEqual(registration_reminder.audience, Message.CURRENT_MEMBERS)
+        self.assertEqual(start_reminder.audience, Message.EVENT_REGISTRATIONS)
+        self.assertFalse(registration_reminder.users.exists())
+        self.assertFalse(start_reminder.users.exists())
+
+        self.assertQuerysetEqual(
+            registration_reminder.recipients(),
+            [self.member, self.other_member],
+            ordered=False,
+        )
+        self.assertQuerysetEqual(start_reminder.recipients(), [])
+
+        registration = EventRegistration.objects.create(
+            event=self.event, member=self.other_member
+        )
+        self.assertQuerysetEqual(start_reminder.recipients(), [self.other_member])
+        registration.date_cancelled = timezone.now()
+        registration.save()
+        self.assertQuerysetEqual(start_reminder.recipients(), [])
+
+    def test_food_event_reminder(self):
+        food_event = FoodEvent.objects.create(
+            event=self.event,
+            start=timezone.now() + datetime.timedelta(days=3),
+            end=timezone.now() + datetime.timedelta(days=3, hours=1),
+            send_notification=True,
+        )
+        for member in (self.member, self.other_member):
+            EventRegistration.objects.create(event=self.event, member=member)
+        FoodOrder.objects.create(
+            member=self.member,
+            food_event=food_event,
+            product=Product.objects.create(name="pizza", description="pizza", price=5),
+        )
+
+        self.assertQuerysetEqual(
+            food_event.end_reminder.recipients(), [self.other_member]
+        )
+
+    def test_for_user(self):
+        EventRegistration.objects.create(event=self.event, member=self.other_member)
+        start_reminder = self.event.start_reminder
+        start_reminder.sent = timezone.now()
+        start_reminder.save()
+        explicit = Message.objects.create(title="title", body="body")
+        explicit.users.add(self.member)
+        everyone = Message.objects.create(
+            title="title",
+            body="body",
+            audience=Message.CURRENT_MEMBERS,
+            sent=timezone.now(),
+        )
+
+        self.assertQuerysetEqual(
+            Message.all_objects.for_user(self.member),
+            [explicit, everyone],
+            transform=lambda m: m,
+            ordered=False,
+        )
+        self.assertQuerysetEqual(
+            Message.all_objects.for_user(self.other_member),
+            [start_reminder.message_ptr, everyone],
+            transform=lambda m: m,
+            ordered=False,
+        )
@@ -205,6 +205,15 @@ class RegistrationAdmin(admin.ModelAdmin):
     def accept_selected(self, request, queryset):
         """Accept the selected entries."""
         if request.user.has_perm("registrations.review_entries"):
+            for registration, error in services.get_direct_debit_errors(
+                queryset
+            ).items():
+                self.message_user(
+                    request,
+                    _("Could not accept %(entry)s: %(error)s")
+                    % {"entry": registration, "error": error},
+                    messages.WARNING,
+                )
             rows_updated = services.accept_entries(request.user.pk, queryset)
             _show_message(
                 self,
@@ -29,10 +29,13 @@ def send_registration_email_confirmation(registration: Registration) -> None:
     )
 
 
-def send_registration_accepted_message(registration: Registration) -> None:
+def send_registration_accepted_message(
+    registration: Registration, connection=None
+) -> None:
     """Send the registration acceptance email.
 
     :param registration: the registration entry
+    :param connection: optional mail connection to reuse
     """
     send_email(
         registration.email,
@@ -42,6 +45,7 @@ def send_registration_accepted_message(registration: Registration) -> None:
             "name": registration.get_full_name(),
             "fees": floatformat(registration.contribution, 2),
         },
+        connection=connection,
     )
 
 
@@ -79,10 +83,11 @@ def send_new_registration_board_message(registration: Registration) -> None:
     )
 
 
-def send_renewal_accepted_message(renewal: Renewal) -> None:
+def send_renewal_accepted_message(renewal: Renewal, connection=None) -> None:
     """Send the renewal acceptation email.
 
     :param renewal: the renewal entry
+    :param connection: optional mail connection to reuse
     """
     send_email(
         renewal.member.email,
@@ -94,6 +99,7 @@ def send_renewal_accepted_message(renewal: Renewal) -> None:
             "thalia_pay_enabled": settings.THALIA_PAY_ENABLED_PAYMENT_METHOD,
             "url": (settings.BASE_URL + reverse("registrations:renew",)),
         },
+        connection=connection,
     )
 
 
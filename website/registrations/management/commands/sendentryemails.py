@@ -0,0 +1,17 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from registrations import services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """This command can be run periodically to send the emails of accepted registrations and renewals."""
+
+    def handle(self, *args, **options):
+        """Send the emails that have not been sent yet."""
+        sent = services.send_entry_emails()
+        if sent:
+            logger.info("Sent %d registration emails", sent)
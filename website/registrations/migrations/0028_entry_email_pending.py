@@ -0,0 +1,18 @@
+# Generated by Django 3.2.7 on 2026-10-18 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registrations', '0027_alter_entry_membership'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='email_pending',
+            field=models.BooleanField(default=False, editable=False, help_text='the email about the acceptance has not been sent yet', verbose_name='email pending'),
+        ),
+    ]
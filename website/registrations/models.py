@@ -102,6 +102,13 @@ class Entry(models.Model):
         "members.Membership", on_delete=models.SET_NULL, blank=True, null=True,
     )
 
+    email_pending = models.BooleanField(
+        _("email pending"),
+        default=False,
+        editable=False,
+        help_text=_("the email about the acceptance has not been sent yet"),
+    )
+
     @property
     def membership_upgrade_discount_applies(self):
         if isinstance(self, Renewal):
@@ -1,22 +1,35 @@
 """The services defined by the registrations package."""
+import logging
 import string
 import unicodedata
-from typing import Union
+from collections import defaultdict
+from smtplib import SMTPException
+from typing import Dict, List, Set, Tuple, Union
 
+from django.conf import settings
 from django.contrib.admin.models import LogEntry, CHANGE
 from django.contrib.admin.options import get_content_type_for_model
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core import mail
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from django.db.models import Q, QuerySet
 from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
 import members
 from members.models import Membership, Profile, Member
-from payments.models import BankAccount, PaymentUser, Payment
-from payments.services import create_payment
+from members.models.profile import birthday_key
+from payments.models import BankAccount, PaymentUser, Payment, PaymentUserLedger
+from payments.payables import payables
 from registrations import emails
 from registrations.models import Entry, Registration, Renewal
+from utils import cache
 from utils.snippets import datetime_to_lectureyear
 
+logger = logging.getLogger(__name__)
+
 
 def _generate_username(registration: Registration) -> str:
     """Create username from first and lastname.
@@ -124,67 +137,332 @@ def reject_entries(user_id: int, queryset: QuerySet) -> int:
     return rows_updated
 
 
+def _unique_registrations(registrations: List[Registration]) -> Set:
+    """Check the uniqueness of the usernames and email addresses of registrations.
+
+    This applies the rules of ``check_unique_user`` to all registrations at
+    once. The registrations are checked in order, and the usernames and
+    email addresses claimed by earlier registrations are taken into account,
+    as if they were accepted one by one.
+
+    :param registrations: the registrations to check
+    :return: the primary keys of the unique registrations
+    :rtype: set
+    """
+    generated = {r.pk: _generate_username(r) for r in registrations}
+    usernames = set(generated.values()) | {
+        r.username for r in registrations if r.username is not None
+    }
+
+    taken_usernames = set()
+    taken_emails = set()
+    for username, email in (
+        get_user_model()
+        .objects.filter(
+            Q(username__in=usernames) | Q(email__in=[r.email for r in registrations])
+        )
+        .values_list("username", "email")
+    ):
+        taken_usernames.add(username)
+        taken_emails.add(email)
+
+    registered = defaultdict(set)
+    for pk, username in Registration.objects.filter(username__in=usernames).values_list(
+        "pk", "username"
+    ):
+        registered[username].add(pk)
+
+    unique = set()
+    for registration in registrations:
+        username = generated[registration.pk]
+        if username in taken_usernames and registration.username is not None:
+            username = registration.username
+
+        if (
+            registration.email in taken_emails
+            or username in taken_usernames
+            or registered[username] - {registration.pk}
+        ):
+            continue
+
+        unique.add(registration.pk)
+        username = registration.username or generated[registration.pk]
+        registered[username].add(registration.pk)
+        if registration.direct_debit:
+            taken_usernames.add(username.lower())
+            taken_emails.add(registration.email)
+    return unique
+
+
+def _create_members_from_registrations(registrations: List[Registration]) -> Dict:
+    """Create the users, profiles and bank accounts of registrations in bulk.
+
+    The users get an unusable password, a password is set when the welcome
+    message is sent by ``send_entry_emails``.
+
+    :param registrations: the registrations with direct debit
+    :return: the primary keys of the created users by registration
+    :rtype: dict
+    """
+    user_model = get_user_model()
+    user_model.objects.bulk_create(
+        [
+            user_model(
+                username=user_model.normalize_username(r.username.lower()),
+                email=user_model.objects.normalize_email(r.email),
+                password=make_password(None),
+                first_name=r.first_name,
+                last_name=r.last_name,
+            )
+            for r in registrations
+        ]
+    )
+    # Not all databases return the primary keys of bulk inserted rows
+    user_ids = dict(
+        user_model.objects.filter(
+            username__in=[r.username.lower() for r in registrations]
+        ).values_list("username", "pk")
+    )
+    user_ids = {r.pk: user_ids[r.username.lower()] for r in registrations}
+
+    Profile.objects.bulk_create(
+        [
+            Profile(
+                user_id=user_ids[r.pk],
+                programme=r.programme,
+                student_number=r.student_number,
+                starting_year=r.starting_year,
+                address_street=r.address_street,
+                address_street2=r.address_street2,
+                address_postal_code=r.address_postal_code,
+                address_city=r.address_city,
+                address_country=r.address_country,
+                phone_number=r.phone_number,
+                birthday=r.birthday,
+                birthday_key=birthday_key(r.birthday) if r.birthday else None,
+                show_birthday=r.optin_birthday,
+                receive_optin=r.optin_mailinglist,
+            )
+            for r in registrations
+        ]
+    )
+
+    BankAccount.objects.bulk_create(
+        [
+            BankAccount(
+                owner_id=user_ids[r.pk],
+                iban=r.iban,
+                bic=r.bic,
+                initials=r.initials,
+                last_name=r.last_name,
+                signature=r.signature,
+                mandate_no=f"{user_ids[r.pk]}-{1}",
+                valid_from=r.created_at,
+            )
+            for r in registrations
+        ]
+    )
+    return user_ids
+
+
+def _direct_debit_error(registration, today):
+    """Get the reason why a registration cannot be paid by direct debit."""
+    if registration.contribution == 0:
+        return _("Payment amount 0 is not accepted")
+    if (
+        not settings.THALIA_PAY_ENABLED_PAYMENT_METHOD
+        or registration.created_at.date() > today
+    ):
+        return _("This user does not have Thalia Pay enabled")
+    return None
+
+
+def get_direct_debit_errors(queryset: QuerySet) -> dict:
+    """Get the registrations in the queryset that cannot be paid by direct debit.
+
+    These registrations are skipped by :func:`accept_entries`.
+
+    :param queryset: queryset of entries
+    :type queryset: Queryset[Entry]
+    :return: the reasons by registration
+    :rtype: dict
+    """
+    today = timezone.now().date()
+    errors = {}
+    for registration in Registration.objects.filter(
+        pk__in=queryset.values("pk"), status=Entry.STATUS_REVIEW, direct_debit=True
+    ).order_by("created_at"):
+        error = _direct_debit_error(registration, today)
+        if error is not None:
+            errors[registration] = error
+    return errors
+
+
 def accept_entries(user_id: int, queryset: QuerySet) -> int:
     """Accept all entries in the queryset.
 
+    The entries are accepted in bulk inside a transaction. The uniqueness of
+    all registrations is checked at once, and the members of registrations
+    with direct debit are created together with their memberships and
+    Thalia Pay payments. Registrations that cannot be paid by direct debit
+    are skipped, see :func:`get_direct_debit_errors`. The emails are not
+    sent here, but by the ``sendentryemails`` management command.
+
     :param user_id: Id of the user executing this action
     :param queryset: queryset of entries
     :type queryset: Queryset[Entry]
     :return: number of updated rows
     :rtype: integer
     """
-    queryset = queryset.filter(status=Entry.STATUS_REVIEW)
-    entries = queryset.all()
-    updated_entries = []
+    entries = list(
+        queryset.filter(status=Entry.STATUS_REVIEW)
+        .select_related("registration", "renewal")
+        .order_by("created_at")
+    )
+    for i, entry in enumerate(entries):
+        for child in ("registration", "renewal"):
+            try:
+                entries[i] = getattr(entry, child)
+                break
+            except ObjectDoesNotExist:
+                pass
 
-    for entry in entries:
-        # Check if the user is unique
-        if not check_unique_user(entry):
-            # User is not unique, do not proceed
-            continue
+    now = timezone.now()
+    registrations = [
+        e
+        for e in entries
+        if isinstance(e, Registration)
+        and not (e.direct_debit and _direct_debit_error(e, now.date()))
+    ]
+    unique = _unique_registrations(registrations)
+    registrations = [r for r in registrations if r.pk in unique]
+    entries = [e for e in entries if not isinstance(e, Registration) or e.pk in unique]
 
+    for entry in entries:
         entry.status = Entry.STATUS_ACCEPTED
-        entry.updated_at = timezone.now()
+        entry.updated_at = now
+        entry.email_pending = isinstance(entry, (Registration, Renewal))
+    for registration in registrations:
+        if registration.username is None:
+            registration.username = _generate_username(registration)
+
+    direct_debit = [r for r in registrations if r.direct_debit]
+
+    with transaction.atomic():
+        Registration.objects.bulk_update(registrations, ["username"])
+
+        if direct_debit:
+            user_ids = _create_members_from_registrations(direct_debit)
+
+            memberships = []
+            for registration in direct_debit:
+                since, until = _membership_period(registration)
+                memberships.append(
+                    Membership(
+                        user_id=user_ids[registration.pk],
+                        since=since,
+                        until=until,
+                        type=registration.membership_type,
+                    )
+                )
+            Membership.objects.bulk_create(memberships)
+            # Bulk creation skips the signals that invalidate the cached birthdays
+            cache.invalidate("members_birthdays")
+            membership_ids = dict(
+                Membership.objects.filter(user_id__in=user_ids.values()).values_list(
+                    "user_id", "pk"
+                )
+            )
 
-        log_obj = None
+            payments = []
+            for registration in direct_debit:
+                member_id = user_ids[registration.pk]
+                registration.membership_id = membership_ids[member_id]
+                registration.status = Entry.STATUS_COMPLETED
+                payable = payables.get_payable(registration)
+                registration.payment = Payment(
+                    processed_by_id=member_id,
+                    paid_by_id=member_id,
+                    amount=payable.payment_amount,
+                    notes=payable.payment_notes,
+                    topic=payable.payment_topic,
+                    type=Payment.TPAY,
+                )
+                payments.append(registration.payment)
+            Payment.objects.bulk_create(payments)
+            PaymentUserLedger.rebuild(user_ids.values())
+
+        Entry.objects.bulk_update(
+            entries, ["status", "updated_at", "email_pending", "membership", "payment"]
+        )
 
-        try:
-            if entry.registration.username is None:
-                entry.registration.username = _generate_username(entry.registration)
-                entry.registration.save()
-
-            if entry.registration.direct_debit:
-                member = _create_member_from_registration(entry.registration)
-                membership = _create_membership_from_entry(entry.registration, member)
-                entry.membership = membership
-                entry.status = Entry.STATUS_COMPLETED
-                entry.payment = create_payment(entry, member, Payment.TPAY)
-            else:
-                emails.send_registration_accepted_message(entry.registration)
+        content_types = {}
+        LogEntry.objects.bulk_create(
+            [
+                LogEntry(
+                    user_id=user_id,
+                    content_type_id=content_types.setdefault(
+                        type(entry), get_content_type_for_model(entry).pk
+                    ),
+                    object_id=str(entry.pk),
+                    object_repr=str(entry)[:200],
+                    action_flag=CHANGE,
+                    change_message="Change status to approved",
+                )
+                for entry in entries
+                if isinstance(entry, (Registration, Renewal))
+            ]
+        )
 
-            log_obj = entry.registration
+    return len(entries)
 
-        except Registration.DoesNotExist:
+
+def send_entry_emails() -> int:
+    """Send the pending emails of accepted entries.
+
+    New members with direct debit get a welcome message, for which a new
+    password is set. Other registrations and renewals get a message that
+    they have been accepted. An entry of which the email cannot be sent
+    stays pending, so it is retried the next time.
+
+    :return: the number of emails sent
+    :rtype: int
+    """
+    entries = Entry.objects.filter(
+        email_pending=True, status__in=[Entry.STATUS_ACCEPTED, Entry.STATUS_COMPLETED],
+    ).select_related("registration", "renewal__member", "membership__user")
+
+    sent = 0
+    with mail.get_connection() as connection:
+        for entry in entries:
             try:
-                emails.send_renewal_accepted_message(entry.renewal)
-                log_obj = entry.renewal
+                try:
+                    registration = entry.registration
+                    if registration.direct_debit and entry.membership:
+                        user = entry.membership.user
+                        password = get_user_model().objects.make_random_password(
+                            length=15
+                        )
+                        user.set_password(password)
+                        user.save(update_fields=["password"])
+                        members.emails.send_welcome_message(
+                            user, password, connection=connection
+                        )
+                    else:
+                        emails.send_registration_accepted_message(
+                            registration, connection
+                        )
+                except Registration.DoesNotExist:
+                    emails.send_renewal_accepted_message(entry.renewal, connection)
+            except (SMTPException, OSError):
+                logger.exception("Could not send the email of entry %s", entry.pk)
+                continue
             except Renewal.DoesNotExist:
                 pass
 
-        if log_obj:
-            LogEntry.objects.log_action(
-                user_id=user_id,
-                content_type_id=get_content_type_for_model(log_obj).pk,
-                object_id=log_obj.pk,
-                object_repr=str(log_obj),
-                action_flag=CHANGE,
-                change_message="Change status to approved",
-            )
-
-        entry.save()
-        updated_entries.append(entry.pk)
-
-    return len(updated_entries)
+            Entry.objects.filter(pk=entry.pk).update(email_pending=False)
+            sent += 1
+    return sent
 
 
 def revert_entry(user_id: int or None, entry: Entry) -> None:
@@ -200,6 +478,7 @@ def revert_entry(user_id: int or None, entry: Entry) -> None:
     entry.status = Entry.STATUS_REVIEW
     entry.updated_at = timezone.now()
     entry.payment = None
+    entry.email_pending = False
     entry.save()
     if payment is not None:
         payment.delete()
@@ -299,6 +578,24 @@ def calculate_membership_since() -> timezone.datetime:
     return since
 
 
+def _membership_period(entry: Entry) -> Tuple:
+    """Get the period of a new membership based on an entry.
+
+    :param entry: Entry model
+    :type entry: Entry
+    :return: the since and until dates of the membership
+    :rtype: tuple
+    """
+    since = calculate_membership_since()
+    if entry.length == Entry.MEMBERSHIP_STUDY:
+        return since, None
+
+    lecture_year = datetime_to_lectureyear(timezone.now())
+    if timezone.now().month == 8:
+        lecture_year += 1
+    return since, timezone.datetime(year=lecture_year + 1, month=9, day=1).date()
+
+
 def _create_membership_from_entry(
     entry: Entry, member: Member = None
 ) -> Union[Membership, None]:
@@ -309,11 +606,7 @@ def _create_membership_from_entry(
     :return: The created or updated membership
     :rtype: Membership
     """
-    lecture_year = datetime_to_lectureyear(timezone.now())
-    since = calculate_membership_since()
-    until = None
-    if timezone.now().month == 8:
-        lecture_year += 1
+    since, until = _membership_period(entry)
 
     if entry.length == Entry.MEMBERSHIP_STUDY:
         try:
@@ -351,7 +644,6 @@ def _create_membership_from_entry(
                 since = membership.until
         except Renewal.DoesNotExist:
             pass
-        until = timezone.datetime(year=lecture_year + 1, month=9, day=1).date()
 
     return Membership.objects.create(
         user=member, since=since, until=until, type=entry.membership_type
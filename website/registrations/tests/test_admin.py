@@ -1,3 +1,4 @@
+import uuid
 from unittest import mock
 from unittest.mock import Mock
 
@@ -186,9 +187,30 @@ class RegistrationAdminTest(TestCase):
             },
         )
 
+    @mock.patch("registrations.services.get_direct_debit_errors")
     @mock.patch("registrations.services.accept_entries")
-    def test_accept(self, accept_entries):
+    def test_accept_direct_debit_error(self, accept_entries, get_direct_debit_errors):
+        accept_entries.return_value = 0
+        registration = Registration(pk=uuid.uuid4(), first_name="John", last_name="Doe")
+        get_direct_debit_errors.return_value = {
+            registration: "Payment amount 0 is not accepted"
+        }
+
+        request = _get_mock_request(["registrations.review_entries"])
+        self.admin.accept_selected(request, [])
+
+        request._messages.add.assert_any_call(
+            messages.WARNING,
+            _("Could not accept %(entry)s: %(error)s")
+            % {"entry": registration, "error": "Payment amount 0 is not accepted"},
+            "",
+        )
+
+    @mock.patch("registrations.services.get_direct_debit_errors")
+    @mock.patch("registrations.services.accept_entries")
+    def test_accept(self, accept_entries, get_direct_debit_errors):
         accept_entries.return_value = 1
+        get_direct_debit_errors.return_value = {}
 
         queryset = []
 
@@ -443,9 +465,11 @@ class RenewalAdminTest(TestCase):
         self.site = AdminSite()
         self.admin = admin.RenewalAdmin(Renewal, admin_site=self.site)
 
+    @mock.patch("registrations.services.get_direct_debit_errors")
     @mock.patch("registrations.services.accept_entries")
-    def test_accept(self, accept_entries):
+    def test_accept(self, accept_entries, get_direct_debit_errors):
         accept_entries.return_value = 1
+        get_direct_debit_errors.return_value = {}
 
         queryset = []
 
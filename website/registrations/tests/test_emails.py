@@ -61,6 +61,7 @@ class EmailsTest(TestCase):
             _("Registration accepted"),
             "registrations/email/registration_accepted.txt",
             {"name": reg.get_full_name(), "fees": floatformat(reg.contribution, 2)},
+            connection=None,
         )
 
     @mock.patch("registrations.emails.send_email")
@@ -125,6 +126,7 @@ class EmailsTest(TestCase):
                 "thalia_pay_enabled": settings.THALIA_PAY_ENABLED_PAYMENT_METHOD,
                 "url": (settings.BASE_URL + reverse("registrations:renew",)),
             },
+            connection=None,
         )
 
     @mock.patch("registrations.emails.send_email")
@@ -1,5 +1,6 @@
 # pylint: disable=too-many-statements
 from datetime import timedelta
+from smtplib import SMTPException
 from unittest import mock
 
 from django.contrib.auth import get_user_model
@@ -9,7 +10,7 @@ from django.utils import timezone
 from freezegun import freeze_time
 
 from members.models import Member, Membership
-from payments.models import Payment, BankAccount
+from payments.models import Payment, BankAccount, PaymentUserLedger
 from registrations import services, payables
 from registrations.models import Entry, Registration, Renewal
 from utils.snippets import datetime_to_lectureyear
@@ -200,7 +201,12 @@ class ServicesTest(TestCase):
 
         self.assertEqual(rows_updated, 3)
         self.assertEqual(Entry.objects.filter(status=Entry.STATUS_ACCEPTED).count(), 5)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Entry.objects.filter(email_pending=True).count(), 2)
+
+        self.assertEqual(services.send_entry_emails(), 2)
         self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(services.send_entry_emails(), 0)
 
     def test_accept_entries_manual_username(self):
         self.e2.status = Entry.STATUS_REVIEW
@@ -216,11 +222,11 @@ class ServicesTest(TestCase):
 
         self.assertEqual(rows_updated, 3)
         self.assertEqual(Entry.objects.filter(status=Entry.STATUS_ACCEPTED).count(), 5)
+        services.send_entry_emails()
         self.assertEqual(len(mail.outbox), 2)
 
-    @mock.patch("registrations.services.check_unique_user")
-    def test_accept_entries_user_not_unique(self, check_unique_user):
-        check_unique_user.return_value = False
+    def test_accept_entries_user_not_unique(self):
+        get_user_model().objects.create_user("ptest2", "ptest@example.com")
 
         self.e2.status = Entry.STATUS_REVIEW
         self.e2.save()
@@ -229,9 +235,72 @@ class ServicesTest(TestCase):
 
         rows_updated = services.accept_entries(1, Entry.objects.all())
 
-        self.assertEqual(rows_updated, 0)
-        self.assertEqual(Entry.objects.filter(status=Entry.STATUS_ACCEPTED).count(), 2)
-        self.assertEqual(len(mail.outbox), 0)
+        self.e2.refresh_from_db()
+        self.assertEqual(rows_updated, 2)
+        self.assertEqual(self.e2.status, Entry.STATUS_REVIEW)
+        self.assertEqual(Entry.objects.filter(status=Entry.STATUS_ACCEPTED).count(), 4)
+        services.send_entry_emails()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_accept_entries_same_username(self):
+        self.e1.status = Entry.STATUS_REVIEW
+        self.e1.direct_debit = True
+        self.e1.iban = "NL91ABNA0417164300"
+        self.e1.initials = "J"
+        self.e1.signature = "base64,png"
+        self.e1.save()
+        self.e2.first_name = "Jane"
+        self.e2.last_name = "Doe"
+        self.e2.status = Entry.STATUS_REVIEW
+        self.e2.save()
+
+        rows_updated = services.accept_entries(
+            1, Entry.objects.filter(pk__in=[self.e1.pk, self.e2.pk])
+        )
+
+        self.e1.refresh_from_db()
+        self.e2.refresh_from_db()
+        self.assertEqual(rows_updated, 1)
+        self.assertEqual(self.e1.status, Entry.STATUS_COMPLETED)
+        self.assertEqual(self.e2.status, Entry.STATUS_REVIEW)
+
+    def test_accept_entries_direct_debit_error(self):
+        self.e1.status = Entry.STATUS_REVIEW
+        self.e1.direct_debit = True
+        self.e1.iban = "NL91ABNA0417164300"
+        self.e1.initials = "J"
+        self.e1.signature = "base64,png"
+        self.e1.save()
+        # The contribution is computed on save
+        Entry.objects.filter(pk=self.e1.pk).update(contribution=0)
+        self.e2.status = Entry.STATUS_REVIEW
+        self.e2.save()
+
+        queryset = Entry.objects.filter(pk__in=[self.e1.pk, self.e2.pk])
+        errors = services.get_direct_debit_errors(queryset)
+        self.assertEqual(list(errors), [self.e1])
+        self.assertEqual(errors[self.e1], "Payment amount 0 is not accepted")
+
+        rows_updated = services.accept_entries(1, queryset)
+
+        self.e1.refresh_from_db()
+        self.e2.refresh_from_db()
+        self.assertEqual(rows_updated, 1)
+        self.assertEqual(self.e1.status, Entry.STATUS_REVIEW)
+        self.assertEqual(self.e2.status, Entry.STATUS_ACCEPTED)
+
+    def test_send_entry_emails_failed(self):
+        self.e2.status = Entry.STATUS_REVIEW
+        self.e2.save()
+        services.accept_entries(1, Entry.objects.filter(pk=self.e2.pk))
+
+        with mock.patch(
+            "registrations.emails.send_registration_accepted_message",
+            side_effect=SMTPException,
+        ):
+            self.assertEqual(services.send_entry_emails(), 0)
+        self.assertEqual(services.send_entry_emails(), 1)
+        self.assertEqual(len(mail.outbox), 1)
 
     def test_revert_entry(self):
         with self.subTest("Revert accepted entry"):
@@ -544,12 +613,15 @@ class ServicesTest(TestCase):
         self.e2.status = Entry.STATUS_REVIEW
         self.e2.save()
 
-        rows_updated = services.accept_entries(1, Entry.objects.all())
+        with mock.patch("registrations.services.cache.invalidate") as invalidate:
+            rows_updated = services.accept_entries(1, Entry.objects.all())
+        invalidate.assert_any_call("members_birthdays")
 
         self.e2.refresh_from_db()
 
         self.assertEqual(rows_updated, 3)
         self.assertEqual(Entry.objects.filter(status=Entry.STATUS_ACCEPTED).count(), 4)
+        services.send_entry_emails()
         self.assertEqual(len(mail.outbox), 2)
 
         self.assertEqual(Entry.objects.filter(status=Entry.STATUS_COMPLETED).count(), 1)
@@ -560,3 +632,10 @@ class ServicesTest(TestCase):
 
         self.assertEqual(registration.payment.amount, self.e2.contribution)
         self.assertEqual(registration.payment.type, Payment.TPAY)
+        self.assertTrue(registration.membership.user.has_usable_password())
+        self.assertEqual(
+            PaymentUserLedger.objects.get(
+                pk=registration.membership.user_id
+            ).tpay_balance,
+            -self.e2.contribution,
+        )
@@ -96,16 +96,20 @@ class EntryAdminViewTest(TestCase):
             response, f"/admin/registrations/registration/{self.entry1.pk}/change/"
         )
 
+    @mock.patch("registrations.services.get_direct_debit_errors")
     @mock.patch("registrations.services.check_unique_user")
     @mock.patch("registrations.services.accept_entries")
     @mock.patch("registrations.services.reject_entries")
-    def test_post_accept(self, reject_entries, accept_entries, check_unique_user):
+    def test_post_accept(
+        self, reject_entries, accept_entries, check_unique_user, direct_debit_errors
+    ):
         self.view.action = "accept"
         for reg_type, entry in {
             "registration": self.entry1,
             "renewal": self.entry2,
         }.items():
             entry_qs = Entry.objects.filter(pk=entry.pk)
+            direct_debit_errors.return_value = {}
             check_unique_user.reset_mock()
             check_unique_user.return_value = True
             reject_entries.reset_mock()
@@ -159,6 +163,19 @@ class EntryAdminViewTest(TestCase):
                     "",
                 )
 
+                accept_entries.reset_mock()
+                check_unique_user.return_value = True
+                direct_debit_errors.return_value = {entry: "Error"}
+                self.view.post(request, pk=entry.pk)
+
+                self.assertFalse(accept_entries.called)
+                request._messages.add.assert_any_call(
+                    messages.ERROR,
+                    _("Could not accept %(entry)s: %(error)s")
+                    % {"entry": entry, "error": "Error"},
+                    "",
+                )
+
     @mock.patch("registrations.services.accept_entries")
     @mock.patch("registrations.services.reject_entries")
     def test_post_reject(self, reject_entries, accept_entries):
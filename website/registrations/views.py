@@ -56,12 +56,20 @@ class EntryAdminView(View):
             return redirect("admin:index")
 
         if action == "accept":
+            direct_debit_errors = services.get_direct_debit_errors(entry_qs)
             if not services.check_unique_user(entry):
                 messages.error(
                     request,
                     _("Could not accept %s. Username is not unique.")
                     % model_ngettext(entry, 1),
                 )
+            elif direct_debit_errors:
+                for registration, error in direct_debit_errors.items():
+                    messages.error(
+                        request,
+                        _("Could not accept %(entry)s: %(error)s")
+                        % {"entry": registration, "error": error},
+                    )
             elif services.accept_entries(request.user.pk, entry_qs) > 0:
                 messages.success(
                     request, _("Successfully accepted %s.") % model_ngettext(entry, 1)
@@ -245,9 +245,7 @@ class OrderAdmin(admin.ModelAdmin):
                 shift__managers__in=request.member.get_member_groups()
             ).distinct()
 
-        queryset = queryset.select_properties(
-            "total_amount", "subtotal", "num_items", "age_restricted"
-        )
+        queryset = queryset.select_properties("age_restricted")
         queryset = queryset.prefetch_related(
             "shift", "shift__event", "shift__product_list"
         )
@@ -49,9 +49,6 @@ class OrderInline(admin.TabularInline):
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        queryset = queryset.select_properties(
-            "total_amount", "subtotal", "num_items", "age_restricted"
-        )
         queryset = queryset.prefetch_related("payment")
         queryset = queryset.prefetch_related("order_items__product__product")
         queryset = queryset.prefetch_related("payer")
@@ -139,13 +136,7 @@ class ShiftAdmin(admin.ModelAdmin):
                 managers__in=request.member.get_member_groups()
             ).distinct()
 
-        queryset = queryset.select_properties(
-            "active",
-            "total_revenue",
-            "total_revenue_paid",
-            "num_orders",
-            "num_orders_paid",
-        )
+        queryset = queryset.select_properties("active")
         queryset = queryset.prefetch_related("event")
         return queryset
 
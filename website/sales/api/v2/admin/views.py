@@ -41,15 +41,8 @@ class ShiftListView(AdminListAPIView):
                 managers__in=self.request.member.get_member_groups()
             ).distinct()
 
-        queryset = queryset.select_properties(
-            "active",
-            "total_revenue",
-            "total_revenue_paid",
-            "num_orders",
-            "num_orders_paid",
-        )
+        queryset = queryset.select_properties("active")
         queryset = queryset.prefetch_related("event", "product_list")
-        queryset = queryset.prefetch_related("orders__order_items",)
         return queryset
 
 
@@ -97,9 +90,7 @@ class OrderListView(AdminListAPIView, AdminCreateAPIView):
         if pk:
             queryset = queryset.filter(shift=pk)
 
-        queryset = queryset.select_properties(
-            "total_amount", "subtotal", "num_items", "age_restricted"
-        )
+        queryset = queryset.select_properties("age_restricted")
         queryset = queryset.prefetch_related(
             "shift", "shift__event", "shift__product_list"
         )
@@ -138,9 +129,7 @@ class OrderDetailView(AdminRetrieveAPIView, AdminUpdateAPIView, AdminDestroyAPIV
                 shift__managers__in=self.request.member.get_member_groups()
             ).distinct()
 
-        queryset = queryset.select_properties(
-            "total_amount", "subtotal", "num_items", "age_restricted"
-        )
+        queryset = queryset.select_properties("age_restricted")
         queryset = queryset.prefetch_related(
             "shift", "shift__event", "shift__product_list"
         )
@@ -6,6 +6,7 @@ class SalesConfig(AppConfig):
 
     def ready(self):
         # pylint: disable=unused-import,import-outside-toplevel
+        from . import signals
         from .payables import register
 
         register()
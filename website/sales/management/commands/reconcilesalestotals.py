@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from sales import services
+
+
+class Command(BaseCommand):
+    """This command recomputes the stored totals of orders and shifts that had drifted."""
+
+    def handle(self, *args, **options):
+        orders, shifts = services.reconcile_totals()
+        for pk in orders:
+            self.stdout.write(f"Order {pk} had drifted")
+        for pk in shifts:
+            self.stdout.write(f"Shift {pk} had drifted")
+        self.stdout.write(
+            f"{len(orders)} orders and {len(shifts)} shifts had drifted totals"
+        )
@@ -0,0 +1,105 @@
+# Generated by Django 3.2.7 on 2026-10-18 19:46
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def compute_totals(apps, schema_editor):
+    """Store the totals of the existing orders and shifts."""
+    Order = apps.get_model("sales", "Order")
+    OrderItem = apps.get_model("sales", "OrderItem")
+    Shift = apps.get_model("sales", "Shift")
+
+    items = OrderItem.objects.filter(order=OuterRef("pk")).order_by().values("order")
+    subtotal = Coalesce(
+        Subquery(items.annotate(sum=Sum("total")).values("sum")),
+        Value(Decimal("0.00")),
+        output_field=models.DecimalField(max_digits=8, decimal_places=2),
+    )
+    Order.objects.update(
+        subtotal=subtotal,
+        total_amount=subtotal
+        - Coalesce(
+            F("discount"), Value(Decimal("0.00")), output_field=models.DecimalField()
+        ),
+        num_items=Coalesce(
+            Subquery(items.annotate(sum=Sum("amount")).values("sum")),
+            Value(0),
+            output_field=models.IntegerField(),
+        ),
+    )
+
+    orders = Order.objects.filter(shift=OuterRef("pk")).order_by().values("shift")
+    paid_orders = orders.filter(
+        Q(payment__isnull=False) | Q(total_amount=0, num_items__gt=0)
+    )
+
+    def revenue(queryset):
+        return Coalesce(
+            Subquery(queryset.annotate(sum=Sum("total_amount")).values("sum")),
+            Value(Decimal("0.00")),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        )
+
+    def count(queryset):
+        return Coalesce(
+            Subquery(queryset.annotate(count=Count("pk")).values("count")),
+            Value(0),
+            output_field=models.IntegerField(),
+        )
+
+    Shift.objects.update(
+        total_revenue=revenue(orders),
+        total_revenue_paid=revenue(paid_orders),
+        num_orders=count(orders),
+        num_orders_paid=count(paid_orders),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shift',
+            name='num_orders',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='number of orders'),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='num_orders_paid',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='number of paid orders'),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='total_revenue',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10, verbose_name='total revenue'),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='total_revenue_paid',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10, verbose_name='paid revenue'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='num_items',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='number of items'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=8, verbose_name='subtotal'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=8, verbose_name='total amount'),
+        ),
+        migrations.RunPython(compute_totals, migrations.RunPython.noop),
+    ]
@@ -13,6 +13,8 @@ from django.db.models import (
     IntegerField,
     BooleanField,
     Count,
+    OuterRef,
+    Subquery,
 )
 from django.db.models.functions import Coalesce
 from django.urls import reverse
@@ -28,7 +30,7 @@ from sales.models.shift import Shift
 
 
 def default_order_shift():
-    return Shift.objects.filter(active=True).first()
+    return Shift.objects.filter(active=True).values_list("pk", flat=True).first()
 
 
 class Order(models.Model):
@@ -98,19 +100,68 @@ class Order(models.Model):
         )
     )
 
-    subtotal = AnnotationProperty(
-        Coalesce(Sum("order_items__total"), Value(0.00), output_field=DecimalField())
+    # The totals are kept up to date by the sales signals, so listing orders
+    # does not aggregate their items
+    subtotal = models.DecimalField(
+        verbose_name=_("subtotal"),
+        max_digits=8,
+        decimal_places=2,
+        default=0,
+        editable=False,
     )
 
-    total_amount = AnnotationProperty(
-        Coalesce(Sum("order_items__total"), Value(0.00), output_field=DecimalField())
-        - Coalesce(F("discount"), Value(0.00), output_field=DecimalField())
+    total_amount = models.DecimalField(
+        verbose_name=_("total amount"),
+        max_digits=8,
+        decimal_places=2,
+        default=0,
+        editable=False,
     )
 
-    num_items = AnnotationProperty(
-        Coalesce(Sum("order_items__amount"), Value(0), output_field=IntegerField())
+    num_items = models.PositiveIntegerField(
+        verbose_name=_("number of items"), default=0, editable=False
     )
 
+    TOTAL_FIELDS = ("subtotal", "total_amount", "num_items")
+
+    @classmethod
+    def computed_totals(cls) -> dict:
+        """Get expressions that compute the totals of an order from its items.
+
+        :return: the expressions by total field
+        :rtype: dict
+        """
+        items = (
+            OrderItem.objects.filter(order=OuterRef("pk")).order_by().values("order")
+        )
+        subtotal = Coalesce(
+            Subquery(items.annotate(sum=Sum("total")).values("sum")),
+            Value(Decimal("0.00")),
+            output_field=DecimalField(max_digits=8, decimal_places=2),
+        )
+        return {
+            "subtotal": subtotal,
+            "total_amount": subtotal
+            - Coalesce(
+                F("discount"), Value(Decimal("0.00")), output_field=DecimalField()
+            ),
+            "num_items": Coalesce(
+                Subquery(items.annotate(sum=Sum("amount")).values("sum")),
+                Value(0),
+                output_field=IntegerField(),
+            ),
+        }
+
+    @classmethod
+    def update_totals(cls, queryset) -> int:
+        """Recompute the totals of orders with a single update.
+
+        :param queryset: the orders to update
+        :return: the number of updated orders
+        :rtype: int
+        """
+        return queryset.update(**cls.computed_totals())
+
     def save(
         self, force_insert=False, force_update=False, using=None, update_fields=None
     ):
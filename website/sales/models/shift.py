@@ -1,18 +1,22 @@
+from decimal import Decimal
+
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import (
     Sum,
     Q,
     Count,
+    DecimalField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
 )
-from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from queryable_properties.managers import QueryablePropertiesManager
-from queryable_properties.properties import (
-    RangeCheckProperty,
-    queryable_property,
-)
+from queryable_properties.properties import RangeCheckProperty
 
 from activemembers.models import MemberGroup
 from sales.models.product import ProductList
@@ -62,6 +66,88 @@ class Shift(models.Model):
         ),
     )
 
+    # The totals are kept up to date by the sales signals, so listing shifts
+    # does not aggregate their orders
+    total_revenue = models.DecimalField(
+        verbose_name=_("total revenue"),
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        editable=False,
+    )
+
+    total_revenue_paid = models.DecimalField(
+        verbose_name=_("paid revenue"),
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        editable=False,
+    )
+
+    num_orders = models.PositiveIntegerField(
+        verbose_name=_("number of orders"), default=0, editable=False
+    )
+
+    num_orders_paid = models.PositiveIntegerField(
+        verbose_name=_("number of paid orders"), default=0, editable=False
+    )
+
+    TOTAL_FIELDS = (
+        "total_revenue",
+        "total_revenue_paid",
+        "num_orders",
+        "num_orders_paid",
+    )
+
+    @classmethod
+    def computed_totals(cls) -> dict:
+        """Get expressions that compute the totals of a shift from its orders.
+
+        Orders are paid if they have a payment, or if they contain only
+        free items.
+
+        :return: the expressions by total field
+        :rtype: dict
+        """
+        # pylint: disable=import-outside-toplevel
+        from sales.models.order import Order
+
+        orders = Order.objects.filter(shift=OuterRef("pk")).order_by().values("shift")
+        paid_orders = orders.filter(
+            Q(payment__isnull=False) | Q(total_amount=0, num_items__gt=0)
+        )
+
+        def revenue(queryset):
+            return Coalesce(
+                Subquery(queryset.annotate(sum=Sum("total_amount")).values("sum")),
+                Value(Decimal("0.00")),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+
+        def count(queryset):
+            return Coalesce(
+                Subquery(queryset.annotate(count=Count("pk")).values("count")),
+                Value(0),
+                output_field=IntegerField(),
+            )
+
+        return {
+            "total_revenue": revenue(orders),
+            "total_revenue_paid": revenue(paid_orders),
+            "num_orders": count(orders),
+            "num_orders_paid": count(paid_orders),
+        }
+
+    @classmethod
+    def update_totals(cls, queryset) -> int:
+        """Recompute the totals of shifts with a single update.
+
+        :param queryset: the shifts to update
+        :return: the number of updated shifts
+        :rtype: int
+        """
+        return queryset.update(**cls.computed_totals())
+
     def clean(self):
         super().clean()
         errors = {}
@@ -94,58 +180,6 @@ class Shift(models.Model):
 
     active = RangeCheckProperty("start", "end", timezone.now)
 
-    @queryable_property(annotation_based=True)
-    @classmethod
-    def total_revenue(cls):
-        return RawSQL(
-            """(SELECT CAST(COALESCE(SUM("__orders"."total__"), 0) AS NUMERIC) AS "shift_revenue__"
-                FROM (
-                    SELECT "sales_order"."id", "sales_order"."shift_id", "sales_order"."discount", "sales_order"."payment_id", CAST(SUM("sales_orderitem"."total") AS NUMERIC) AS "subtotal__", CAST((SUM("sales_orderitem"."total") - COALESCE("sales_order"."discount", 0)) AS NUMERIC) AS "total__", SUM("sales_orderitem"."amount") AS "num_items__"
-                    FROM "sales_order" LEFT JOIN "sales_orderitem" ON "sales_orderitem"."order_id" = "sales_order"."id"
-                    GROUP BY "sales_order"."id", "sales_order"."shift_id", "sales_order"."discount"
-                    ) AS "__orders"
-                WHERE "__orders"."shift_id"="sales_shift"."id"
-                )""",
-            [],
-        )
-
-    @queryable_property(annotation_based=True)
-    @classmethod
-    def total_revenue_paid(cls):
-        return RawSQL(
-            """(SELECT CAST(COALESCE(SUM("__orders"."total__"), 0) AS NUMERIC) AS "shift_revenue__"
-                FROM (
-                    SELECT "sales_order"."id", "sales_order"."shift_id", "sales_order"."discount", "sales_order"."payment_id", CAST(SUM("sales_orderitem"."total") AS NUMERIC) AS "subtotal__", CAST((SUM("sales_orderitem"."total") - COALESCE("sales_order"."discount", 0)) AS NUMERIC) AS "total__", SUM("sales_orderitem"."amount") AS "num_items__"
-                    FROM "sales_order" LEFT JOIN "sales_orderitem" ON "sales_orderitem"."order_id" = "sales_order"."id"
-                    GROUP BY "sales_order"."id", "sales_order"."shift_id", "sales_order"."discount"
-                    ) AS "__orders"
-                WHERE "__orders"."shift_id"="sales_shift"."id"
-                AND ("__orders"."payment_id" IS NOT NULL OR ("__orders"."payment_id" IS NULL AND "__orders"."total__"=0))
-                )""",
-            [],
-        )
-
-    @queryable_property(annotation_based=True)
-    @classmethod
-    def num_orders(cls):
-        return Count("orders")
-
-    @queryable_property(annotation_based=True)
-    @classmethod
-    def num_orders_paid(cls):
-        return RawSQL(
-            """(SELECT COUNT(*) AS "num_orders__"
-                FROM (
-                    SELECT "sales_order"."id", "sales_order"."shift_id", "sales_order"."discount", "sales_order"."payment_id", CAST(SUM("sales_orderitem"."total") AS NUMERIC) AS "subtotal__", CAST((SUM("sales_orderitem"."total") - COALESCE("sales_order"."discount", 0)) AS NUMERIC) AS "total__", SUM("sales_orderitem"."amount") AS "num_items__"
-                    FROM "sales_order" LEFT JOIN "sales_orderitem" ON "sales_orderitem"."order_id" = "sales_order"."id"
-                    GROUP BY "sales_order"."id", "sales_order"."shift_id", "sales_order"."discount"
-                    ) AS "__orders"
-                WHERE "__orders"."shift_id"="sales_shift"."id"
-                AND ("__orders"."payment_id" IS NOT NULL OR ("__orders"."payment_id" IS NULL AND "__orders"."total__"=0))
-                )""",
-            [],
-        )
-
     @property
     def product_sales(self):
         qs = (
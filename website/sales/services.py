@@ -1,5 +1,10 @@
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
+from sales.models.order import Order
+from sales.models.shift import Shift
+
 
 def is_adult(member):
     today = timezone.now().date()
@@ -19,3 +24,29 @@ def is_manager(member, shift):
             )
         )
     return False
+
+
+def _drifted_totals(model):
+    """Get the objects of which the stored totals do not match their contents."""
+    computed = {
+        f"computed_{field}": expression
+        for field, expression in model.computed_totals().items()
+    }
+    drifted = Q()
+    for field in model.TOTAL_FIELDS:
+        drifted |= ~Q(**{field: F(f"computed_{field}")})
+    return model.objects.annotate(**computed).filter(drifted)
+
+
+def reconcile_totals() -> tuple:
+    """Recompute the stored totals of orders and shifts that have drifted.
+
+    :return: the primary keys of the orders and of the shifts that were fixed
+    :rtype: tuple
+    """
+    with transaction.atomic():
+        orders = list(_drifted_totals(Order).values_list("pk", flat=True))
+        Order.update_totals(Order.objects.filter(pk__in=orders))
+        shifts = list(_drifted_totals(Shift).values_list("pk", flat=True))
+        Shift.update_totals(Shift.objects.filter(pk__in=shifts))
+    return orders, shifts
@@ -0,0 +1,79 @@
+"""The signals checked by the sales package.
+
+The totals of orders and shifts are stored on their rows and updated here
+whenever an order, order item or payment changes. These receivers are not
+suspended, see ``utils.models.signals.suspendingreceiver``.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from payments.models import Payment
+from sales.models.order import Order, OrderItem
+from sales.models.shift import Shift
+
+
+def _refresh_totals(instance):
+    """Load the stored totals of an order or shift that is in memory."""
+    model = type(instance)
+    values = model.objects.filter(pk=instance.pk).values(*model.TOTAL_FIELDS).first()
+    for field, value in (values or {}).items():
+        setattr(instance, field, value)
+
+
+def _refresh_order_totals(order):
+    """Load the stored totals of an order and its shift that are in memory."""
+    _refresh_totals(order)
+    if Order.shift.is_cached(order):
+        _refresh_totals(order.shift)
+
+
+@receiver(post_save, sender=OrderItem, dispatch_uid="sales_orderitem_save")
+@receiver(post_delete, sender=OrderItem, dispatch_uid="sales_orderitem_delete")
+def post_order_item_change(sender, instance, **kwargs):
+    """Update the totals of the order and the shift of the item."""
+    Order.update_totals(Order.objects.filter(pk=instance.order_id))
+    Shift.update_totals(Shift.objects.filter(orders=instance.order_id))
+    if OrderItem.order.is_cached(instance):
+        _refresh_order_totals(instance.order)
+
+
+@receiver(post_save, sender=Order, dispatch_uid="sales_order_save")
+def post_order_save(sender, instance, **kwargs):
+    """Update the totals of the order and its shift.
+
+    This also applies changes of the discount and the payment.
+    """
+    Order.update_totals(Order.objects.filter(pk=instance.pk))
+    Shift.update_totals(Shift.objects.filter(pk=instance.shift_id))
+    _refresh_order_totals(instance)
+
+
+@receiver(post_delete, sender=Order, dispatch_uid="sales_order_delete")
+def post_order_delete(sender, instance, **kwargs):
+    """Update the totals of the shift of the order."""
+    Shift.update_totals(Shift.objects.filter(pk=instance.shift_id))
+    if Order.shift.is_cached(instance):
+        _refresh_totals(instance.shift)
+
+
+@receiver(post_save, sender=Shift, dispatch_uid="sales_shift_save")
+def post_shift_save(sender, instance, **kwargs):
+    """Restore the totals of the shift, a save writes the ones in memory."""
+    Shift.update_totals(Shift.objects.filter(pk=instance.pk))
+    _refresh_totals(instance)
+
+
+@receiver(pre_delete, sender=Payment, dispatch_uid="sales_payment_pre_delete")
+def pre_payment_delete(sender, instance, **kwargs):
+    """Remember the shifts of the order that is paid by the payment."""
+    instance._sales_shift_ids = list(
+        Shift.objects.filter(orders__payment=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Payment, dispatch_uid="sales_payment_delete")
+def post_payment_delete(sender, instance, **kwargs):
+    """Update the paid totals of the shifts of the order that was paid."""
+    shift_ids = getattr(instance, "_sales_shift_ids", None)
+    if shift_ids:
+        Shift.update_totals(Shift.objects.filter(pk__in=shift_ids))
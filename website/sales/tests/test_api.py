@@ -1,6 +1,8 @@
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from freezegun import freeze_time
@@ -795,3 +797,28 @@ class ShiftAPITest(TestCase):
         response = self.client.get(reverse("api:v2:admin:sales:shift-list"))
         self.assertEqual(200, response.status_code)
         self.assertEqual(1, response.data["count"])
+
+    def test_list_totals(self):
+        response = self.client.get(reverse("api:v2:admin:sales:shift-list"))
+        shifts = {shift["pk"]: shift for shift in response.data["results"]}
+        self.assertEqual("6.00", shifts[self.shift.pk]["total_revenue"])
+        self.assertEqual(6, shifts[self.shift.pk]["num_orders"])
+        self.assertEqual("0.00", shifts[self.shift2.pk]["total_revenue"])
+        self.assertEqual(0, shifts[self.shift2.pk]["num_orders"])
+
+    def test_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("api:v2:admin:sales:shift-list"))
+
+        for _ in range(3):
+            order = Order.objects.create(shift=self.shift2)
+            OrderItem.objects.create(
+                order=order,
+                product=self.shift2.product_list.product_items.get(product=self.beer),
+                amount=2,
+            )
+
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(reverse("api:v2:admin:sales:shift-list"))
+        shifts = {shift["pk"]: shift for shift in response.data["results"]}
+        self.assertEqual(3, shifts[self.shift2.pk]["num_orders"])
@@ -475,6 +475,45 @@ class ShiftTest(TestCase):
             {self.beer.name: 6, self.soda.name: 2, self.wine.name: 6},
         )
 
+    def test_shift_statistics_payment_deleted(self):
+        order = Order.objects.create(shift=self.shift)
+        OrderItem.objects.create(
+            order=order,
+            product=self.shift.product_list.product_items.get(product=self.beer),
+            amount=2,
+        )
+        order.payment = create_payment(
+            order, processed_by=self.member, pay_type=Payment.CASH
+        )
+        order.save()
+        self.assertEqual(self.shift.total_revenue_paid, 1)
+        self.assertEqual(self.shift.num_orders_paid, 1)
+
+        order.payment.delete()
+        self.shift.refresh_from_db()
+        self.assertEqual(self.shift.total_revenue, 1)
+        self.assertEqual(self.shift.total_revenue_paid, 0)
+        self.assertEqual(self.shift.num_orders_paid, 0)
+
+    def test_shift_statistics_locked(self):
+        order = Order.objects.create(shift=self.shift)
+        OrderItem.objects.create(
+            order=order,
+            product=self.shift.product_list.product_items.get(product=self.beer),
+            amount=2,
+        )
+        self.assertEqual(self.shift.total_revenue, 1)
+        self.assertEqual(self.shift.num_orders, 1)
+
+        self.shift.locked = True
+        self.shift.save()
+        self.assertEqual(self.shift.total_revenue, 0)
+        self.assertEqual(self.shift.num_orders, 0)
+
+        self.shift.refresh_from_db()
+        self.assertEqual(self.shift.total_revenue, 0)
+        self.assertEqual(self.shift.num_orders, 0)
+
     def test_is_manager(self):
         # @todo Move this test to test_services
         self.member.is_superuser = False
@@ -9,6 +9,7 @@ from freezegun import freeze_time
 from activemembers.models import Committee, MemberGroupMembership
 from members.models import Member, Profile
 from sales import services
+from sales.models.order import Order, OrderItem
 from sales.models.product import Product, ProductList, ProductListItem
 from sales.models.shift import Shift
 from sales.services import is_manager
@@ -82,3 +83,23 @@ class SalesServicesTest(TestCase):
         self.member.has_perm = MagicMock()
         self.member.has_perm.return_value = True
         self.assertTrue(is_manager(self.member, self.shift))
+
+    def test_reconcile_totals(self):
+        order = Order.objects.create(shift=self.shift)
+        OrderItem.objects.create(
+            order=order,
+            product=self.shift.product_list.product_items.get(product=self.beer),
+            amount=2,
+        )
+        self.assertEqual(([], []), services.reconcile_totals())
+
+        Order.objects.filter(pk=order.pk).update(subtotal=5, total_amount=5)
+        Shift.objects.filter(pk=self.shift.pk).update(num_orders=3)
+
+        self.assertEqual(([order.pk], [self.shift.pk]), services.reconcile_totals())
+        order.refresh_from_db()
+        self.shift.refresh_from_db()
+        self.assertEqual(1, order.subtotal)
+        self.assertEqual(1, order.total_amount)
+        self.assertEqual(1, self.shift.num_orders)
+        self.assertEqual(1, self.shift.total_revenue)
@@ -36,4 +36,6 @@ class ThabloidAdmin(admin.ModelAdmin):
     """Admin class for Thabloid objects."""
 
     form = ThabloidAdminForm
-    list_filter = ("year",)
+    list_display = ("__str__", "status", "page_count")
+    list_filter = ("year", "status")
+    readonly_fields = ("status", "page_count")
@@ -0,0 +1,34 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from thabloid import services
+from thabloid.models import Thabloid
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """This command can be run periodically to render the pages of new Thabloids."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=None,
+            help="Number of processes, defaults to the number of CPUs",
+        )
+
+    def handle(self, *args, **options):
+        """Render the pages of the Thabloids that have not been rendered yet."""
+        thabloids = Thabloid.objects.filter(
+            status__in=[Thabloid.QUEUED, Thabloid.PROCESSING]
+        )
+
+        for thabloid in thabloids:
+            logger.info("Rendering Thabloid %d", thabloid.pk)
+            if services.render_pages(thabloid, max_workers=options["workers"]):
+                self.stdout.write(f"Rendered {thabloid.page_count} pages of {thabloid}")
+            else:
+                self.stderr.write(f"Rendering {thabloid} failed")
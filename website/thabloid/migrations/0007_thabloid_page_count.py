@@ -0,0 +1,47 @@
+# Generated by Django 3.2.7 on 2026-10-18 18:56
+
+import os
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def count_existing_pages(apps, schema_editor):
+    """Determine the page count of Thabloids from their extracted pages."""
+    Thabloid = apps.get_model("thabloid", "Thabloid")
+    for thabloid in Thabloid.objects.all():
+        dst, _ = os.path.splitext(thabloid.file.name)
+        pages_dir = os.path.join(
+            settings.MEDIA_ROOT, os.path.dirname(dst), "pages", os.path.basename(dst)
+        )
+        try:
+            pages = os.listdir(pages_dir)
+        except FileNotFoundError:
+            continue
+        numbers = [int(n) for page in pages for n in re.findall(r"\d+", page)]
+        if numbers:
+            thabloid.page_count = max(numbers)
+            thabloid.status = "done"
+            thabloid.save(update_fields=["page_count", "status"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thabloid', '0006_make_thabloids_private'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thabloid',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='number of pages'),
+        ),
+        migrations.AddField(
+            model_name='thabloid',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='queued', editable=False, max_length=20, verbose_name='status of the pages'),
+        ),
+        migrations.RunPython(count_existing_pages, migrations.RunPython.noop),
+    ]
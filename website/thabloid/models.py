@@ -1,17 +1,13 @@
 import os
 import shutil
-import subprocess
 from itertools import zip_longest
 
-from PIL import Image
 from django.conf import settings
 from django.core.validators import MinValueValidator, FileExtensionValidator
 from django.db import models
 from django.urls import reverse
 from django.utils.text import slugify
 
-from utils.threading import PopenAndCall
-
 
 def thabloid_filename(instance, filename):
     """Return path of thabloid."""
@@ -26,6 +22,23 @@ def pagesets(count):
     return [(1, None)] + list(zip_longest(pageiter, pageiter))
 
 
+def spreads(count):
+    """Return the pages of a Thabloid that are shown together.
+
+    The first and the last page are shown on their own, the pages in
+    between are shown as spreads of two pages.
+
+    >>> spreads(6)
+    [(1, None), (2, 3), (4, 5), (6, None)]
+    >>> spreads(5)
+    [(1, None), (2, 3), (4, None), (5, None)]
+    """
+    if count < 2:
+        return pagesets(count)
+    pageiter = iter(range(2, count))
+    return [(1, None), *zip_longest(pageiter, pageiter), (count, None)]
+
+
 class Thabloid(models.Model):
     """Model representing a Thabloid."""
 
@@ -33,6 +46,18 @@ class Thabloid(models.Model):
         verbose_name="academic year", validators=[MinValueValidator(1990)]
     )
 
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (PROCESSING, "Processing"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
     issue = models.IntegerField()
 
     file = models.FileField(
@@ -40,6 +65,18 @@ class Thabloid(models.Model):
         validators=[FileExtensionValidator(["txt", "pdf", "jpg", "jpeg", "png"])],
     )
 
+    page_count = models.PositiveIntegerField(
+        verbose_name="number of pages", null=True, blank=True, editable=False,
+    )
+
+    status = models.CharField(
+        verbose_name="status of the pages",
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        editable=False,
+    )
+
     class Meta:
         """Meta class for Thabloid model."""
 
@@ -79,11 +116,7 @@ class Thabloid(models.Model):
     @property
     def pages(self):
         """Return urls of pages that should be shown together."""
-        pages = os.listdir(
-            os.path.join(settings.MEDIA_ROOT, os.path.dirname(self.page_url()))
-        )
-        count = len(pages) * 2 - 1
-        return map(lambda p: self.page_url(p[0], p[1]), pagesets(count))
+        return map(lambda p: self.page_url(p[0], p[1]), spreads(self.page_count or 0))
 
     def get_absolute_url(self):
         """Get url of Thabloid."""
@@ -91,73 +124,12 @@ class Thabloid(models.Model):
             "thabloid:pages", kwargs={"year": self.year, "issue": self.issue}
         )
 
-    def post_extract(self):
-        """Save extracted pages to disk."""
-        pages = os.listdir(
-            os.path.join(settings.MEDIA_ROOT, os.path.dirname(self.page_url()))
-        )
-        pages = [self.page_url(i + 1) for i in range(len(pages))]
-        pages = sorted(pages)
-        pages = pages[1:-1]
-        count = int(len(pages) / 2)
-        dirname = os.path.join(settings.MEDIA_ROOT, os.path.dirname(self.page_url()))
-
-        for i in range(0, count):
-            i = i * 2
-            spread_left = os.path.join(settings.MEDIA_ROOT, pages[i])
-            spread_right = os.path.join(settings.MEDIA_ROOT, pages[i + 1])
-
-            result = Image.new("RGB", (2100, 1485))
-
-            img_left = Image.open(spread_left)
-            result.paste(img_left, (0, 0, 1050, 1485))
-            img_right = Image.open(spread_right)
-            result.paste(img_right, (1050, 0, 2100, 1485))
-
-            filename = (
-                os.path.splitext(os.path.basename(spread_left))[0]
-                + "-"
-                + os.path.splitext(os.path.basename(spread_right))[0]
-                + ".png"
-            )
-            result.save(os.path.join(dirname, filename), "PNG")
-
-            os.remove(spread_left)
-            os.remove(spread_right)
-
-    def extract_thabloid_pages(self, wait):
-        """Extract the pages of a Thabloid using Ghostscript."""
-        dst = os.path.join(settings.MEDIA_ROOT, self.page_url())
-        name = thabloid_filename(self, self.file.name)
-        src = os.path.join(settings.MEDIA_ROOT, name)
-
-        try:
-            # Remove potential remainders
-            shutil.rmtree(os.path.dirname(dst))
-        except FileNotFoundError:
-            pass
-
-        os.makedirs(os.path.dirname(dst), exist_ok=True)
-        thread = PopenAndCall(
-            self.post_extract,
-            [
-                "gs",
-                "-o",
-                dst,
-                "-g1050x1485",
-                "-dPDFFitPage",
-                "-dTextAlphaBits=4",
-                "-sDEVICE=png16m",
-                "-f",
-                src,
-            ],
-            stdout=subprocess.DEVNULL,
-        )
-        if wait:
-            thread.join()
-
     def save(self, *args, wait=False, **kwargs):
-        """Save Thabloid to disk."""
+        """Save Thabloid to disk.
+
+        The pages of a new file are rendered by the ``renderthabloids``
+        management command, or immediately if ``wait`` is True.
+        """
         new_file = False
 
         if self.pk is None:
@@ -180,13 +152,17 @@ class Thabloid(models.Model):
                 except FileNotFoundError:
                     pass
 
-                os.rename(old_dir, new_dir)
+                if os.path.isdir(old_dir):
+                    os.rename(old_dir, new_dir)
                 os.rename(
                     os.path.join(settings.MEDIA_ROOT, old.file.name),
                     os.path.join(settings.MEDIA_ROOT, self.file.name),
                 )
 
         if new_file:
+            self.page_count = None
+            self.status = self.QUEUED
+
             filename = thabloid_filename(self, self.file.name)
             src = os.path.join(settings.MEDIA_ROOT, filename)
 
@@ -198,5 +174,8 @@ class Thabloid(models.Model):
 
         super().save(*args, **kwargs)
 
-        if new_file:
-            self.extract_thabloid_pages(wait)
+        if new_file and wait:
+            # pylint: disable=import-outside-toplevel
+            from thabloid.services import render_pages
+
+            render_pages(self)
@@ -0,0 +1,160 @@
+"""The services defined by the thabloid package."""
+import logging
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+from django.conf import settings
+from django.db import connections
+
+from thabloid.models import Thabloid, spreads
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = (1050, 1485)
+
+
+def count_pages(src):
+    """Count the pages of a PDF file using Ghostscript.
+
+    Ghostscript runs in safer mode and may only read the PDF file. The path
+    is passed as a string parameter, so it is never parsed as PostScript.
+
+    :param src: the path of the PDF file
+    :return: the number of pages
+    :rtype: int
+    """
+    result = subprocess.run(
+        [
+            "gs",
+            "-q",
+            "-dNODISPLAY",
+            "-dSAFER",
+            f"--permit-file-read={src}",
+            f"-sSourceFile={src}",
+            "-c",
+            "SourceFile (r) file runpdfbegin pdfpagecount = quit",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+    return int(result.stdout.strip())
+
+
+def _render_range(src, dst_dir, first, last):
+    """Render a range of pages of a PDF file to images named by page number."""
+    range_dir = os.path.join(dst_dir, f"range-{first:03}")
+    os.makedirs(range_dir)
+    subprocess.run(
+        [
+            "gs",
+            "-q",
+            "-o",
+            os.path.join(range_dir, "%03d.png"),
+            f"-dFirstPage={first}",
+            f"-dLastPage={last}",
+            "-g{}x{}".format(*PAGE_SIZE),
+            "-dPDFFitPage",
+            "-dTextAlphaBits=4",
+            "-sDEVICE=png16m",
+            "-f",
+            src,
+        ],
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    for page in range(first, last + 1):
+        os.replace(
+            os.path.join(range_dir, f"{page - first + 1:03}.png"),
+            os.path.join(dst_dir, f"{page:03}.png"),
+        )
+    os.rmdir(range_dir)
+
+
+def _compose_spread(dst_dir, left, right):
+    """Combine two rendered pages into a spread."""
+    left_path = os.path.join(dst_dir, f"{left:03}.png")
+    right_path = os.path.join(dst_dir, f"{right:03}.png")
+
+    result = Image.new("RGB", (PAGE_SIZE[0] * 2, PAGE_SIZE[1]))
+    with Image.open(left_path) as img_left:
+        result.paste(img_left, (0, 0, *PAGE_SIZE))
+    with Image.open(right_path) as img_right:
+        result.paste(img_right, (PAGE_SIZE[0], 0, PAGE_SIZE[0] * 2, PAGE_SIZE[1]))
+    result.save(os.path.join(dst_dir, f"{left:03}-{right:03}.png"), "PNG")
+
+    os.remove(left_path)
+    os.remove(right_path)
+
+
+def render_pages(thabloid, max_workers=None, pages_per_job=8):
+    """Render the pages of a Thabloid.
+
+    The PDF is split into ranges of pages that are rendered by Ghostscript
+    in a pool of processes, after which the spreads are composed in the same
+    pool. The pages are rendered into a temporary directory that replaces
+    the old pages at once when everything succeeded. The page count and
+    the status are recorded on the Thabloid.
+
+    :param thabloid: the Thabloid to render
+    :param max_workers: the number of processes, defaults to the number of CPUs
+    :param pages_per_job: the number of pages rendered by one Ghostscript call
+    :return: True if the pages were rendered
+    :rtype: bool
+    """
+    src = os.path.join(settings.MEDIA_ROOT, thabloid.file.name)
+    dst_dir = os.path.dirname(os.path.join(settings.MEDIA_ROOT, thabloid.page_url()))
+    tmp_dir = dst_dir + ".rendering"
+    old_dir = dst_dir + ".old"
+
+    thabloid.status = Thabloid.PROCESSING
+    Thabloid.objects.filter(pk=thabloid.pk).update(status=thabloid.status)
+
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        count = count_pages(src)
+
+        ranges = [
+            (first, min(first + pages_per_job - 1, count))
+            for first in range(1, count + 1, pages_per_job)
+        ]
+        pairs = [(left, right) for left, right in spreads(count) if right]
+
+        # The processes do not use the database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(
+                _render_range,
+                [src] * len(ranges),
+                [tmp_dir] * len(ranges),
+                *zip(*ranges),
+            ):
+                pass
+            if pairs:
+                for _ in executor.map(
+                    _compose_spread, [tmp_dir] * len(pairs), *zip(*pairs)
+                ):
+                    pass
+
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.isdir(dst_dir):
+            os.rename(dst_dir, old_dir)
+        os.rename(tmp_dir, dst_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        logger.exception("Rendering the pages of %s failed", thabloid)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        thabloid.status = Thabloid.FAILED
+        Thabloid.objects.filter(pk=thabloid.pk).update(status=thabloid.status)
+        return False
+
+    thabloid.page_count = count
+    thabloid.status = Thabloid.DONE
+    Thabloid.objects.filter(pk=thabloid.pk).update(
+        page_count=thabloid.page_count, status=thabloid.status
+    )
+    return True
@@ -1,12 +1,15 @@
 import shutil
+import subprocess
 import tempfile
 import os.path
+from unittest import mock, skipUnless
 
 from django.core.files import File
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.conf import settings
 
+from thabloid import services
 from thabloid.models import Thabloid
 
 tmp_MEDIA_ROOT = tempfile.mkdtemp()
@@ -97,3 +100,60 @@ class TestThabloid(TestCase):
         self.thabloid.save()
         self.assertFalse(TestThabloid._pdf_exist(oldurl))
         self.assertTrue(TestThabloid._jpgs_exist(oldpages, inverse=True))
+
+    def test_pages(self):
+        self.thabloid.page_count = 6
+        self.assertEqual(
+            list(self.thabloid.pages),
+            [
+                "private/thabloids/pages/thabloid-1998-1999-1/001.png",
+                "private/thabloids/pages/thabloid-1998-1999-1/002-003.png",
+                "private/thabloids/pages/thabloid-1998-1999-1/004-005.png",
+                "private/thabloids/pages/thabloid-1998-1999-1/006.png",
+            ],
+        )
+
+    def test_render_pages_failed(self):
+        page_count = self.thabloid.page_count
+        with mock.patch(
+            "thabloid.services.count_pages",
+            side_effect=subprocess.CalledProcessError(1, "gs"),
+        ):
+            self.assertFalse(services.render_pages(self.thabloid))
+
+        self.thabloid.refresh_from_db()
+        self.assertEqual(self.thabloid.status, Thabloid.FAILED)
+        # The pages that were rendered before are kept
+        self.assertEqual(self.thabloid.page_count, page_count)
+
+    @mock.patch("thabloid.services.subprocess.run")
+    def test_count_pages_safer(self, run):
+        run.return_value.stdout = b"12\n"
+        src = "/media/thabloid) (w) file (.pdf"
+
+        self.assertEqual(services.count_pages(src), 12)
+
+        args = run.call_args[0][0]
+        self.assertIn("-dSAFER", args)
+        self.assertNotIn("-dNOSAFER", args)
+        self.assertIn(f"--permit-file-read={src}", args)
+        # The path is not part of the PostScript program
+        self.assertNotIn(src, args[args.index("-c") + 1])
+
+    @skipUnless(shutil.which("gs"), "Ghostscript is not installed")
+    def test_count_pages(self):
+        self.assertGreater(
+            services.count_pages(
+                os.path.join(settings.MEDIA_ROOT, self.thabloid.file.name)
+            ),
+            0,
+        )
+
+    @skipUnless(shutil.which("gs"), "Ghostscript is not installed")
+    def test_render_pages(self):
+        self.assertTrue(services.render_pages(self.thabloid, pages_per_job=2))
+
+        self.thabloid.refresh_from_db()
+        self.assertEqual(self.thabloid.status, Thabloid.DONE)
+        self.assertGreater(self.thabloid.page_count, 0)
+        self.assertTrue(TestThabloid._jpgs_exist(self.thabloid.pages))
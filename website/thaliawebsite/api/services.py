@@ -13,19 +13,33 @@ def create_image_thumbnail_dict(
     fit_small=True,
     fit_medium=True,
     fit_large=True,
+    generated=None,
 ):
+    """Get the urls of an image and its thumbnails.
+
+    :param request: the request, to build absolute urls
+    :param file: the image
+    :param placeholder: the url used for all sizes if there is no image
+    :param generated: the ``{size}_{fit}`` keys of the thumbnails that are
+                      known to exist, such as ``Photo.thumbnails``
+    :return: dict with the urls of the full image and the small, medium
+             and large thumbnails
+    """
+    generated = generated or []
+
+    def thumbnail_url(size, fit):
+        return request.build_absolute_uri(
+            get_thumbnail_url(
+                file, size, fit=fit, generated=f"{size}_{int(fit)}" in generated
+            )
+        )
+
     if file:
         return {
             "full": request.build_absolute_uri(get_media_url(file)),
-            "small": request.build_absolute_uri(
-                get_thumbnail_url(file, size_small, fit=fit_small)
-            ),
-            "medium": request.build_absolute_uri(
-                get_thumbnail_url(file, size_medium, fit=fit_medium)
-            ),
-            "large": request.build_absolute_uri(
-                get_thumbnail_url(file, size_large, fit=fit_large)
-            ),
+            "small": thumbnail_url(size_small, fit_small),
+            "medium": thumbnail_url(size_medium, fit_medium),
+            "large": thumbnail_url(size_large, fit_large),
         }
     return {
         "full": placeholder,
@@ -20,11 +20,14 @@ class ThumbnailSerializer(FileField):
         fit_small=True,
         fit_medium=True,
         fit_large=True,
+        generated_source=None,
         **kwargs
     ):
         super().__init__(instance, data, **kwargs)
 
         self.placeholder = placeholder
+        # The attribute of the model with the generated thumbnails, if any
+        self.generated_source = generated_source
         self.options = {
             "size_small": size_small,
             "size_medium": size_medium,
@@ -41,8 +44,16 @@ class ThumbnailSerializer(FileField):
                 static(self.placeholder)
             )
 
+        generated = None
+        if instance and self.generated_source:
+            generated = getattr(instance.instance, self.generated_source)
+
         return create_image_thumbnail_dict(
-            self.context["request"], instance, placeholder, **self.options
+            self.context["request"],
+            instance,
+            placeholder,
+            generated=generated,
+            **self.options
         )
 
     def to_internal_value(self, data):
@@ -170,6 +170,9 @@ PAYMENT_CHANGE_WINDOW = int(os.environ.get("PAYMENTS_CHANGE_WINDOW", 10 * 60))
 
 # Payments creditor identifier
 SEPA_CREDITOR_ID = os.environ.get("SEPA_CREDITOR_ID", "<unknown>")
+SEPA_CREDITOR_NAME = os.environ.get("SEPA_CREDITOR_NAME", "Studievereniging Thalia")
+SEPA_CREDITOR_IBAN = os.environ.get("SEPA_CREDITOR_IBAN", "<unknown>")
+SEPA_CREDITOR_BIC = os.environ.get("SEPA_CREDITOR_BIC", "<unknown>")
 
 # Payment batch withdrawal date default offset after creation date
 PAYMENT_BATCH_DEFAULT_WITHDRAWAL_DATE_OFFSET = timezone.timedelta(days=14)
@@ -259,6 +262,11 @@ if _EMAIL_BACKEND == "smtp":
         )
         EMAIL_HOST = "localhost"
 
+# Delivery of the emails in the outbox
+OUTBOX_CONNECTIONS = int(os.environ.get("OUTBOX_CONNECTIONS", "4"))
+OUTBOX_RATE_LIMIT = float(os.environ.get("OUTBOX_RATE_LIMIT", "10"))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "5"))
+
 ###############################################################################
 # Database settings
 # https://docs.djangoproject.com/en/dev/ref/settings/#databases
@@ -297,6 +305,35 @@ if DJANGO_ENV == "testing":
         },
     }
 
+###############################################################################
+# Cache settings
+# https://docs.djangoproject.com/en/dev/ref/settings/#caches
+# The cache is shared by all processes, unless the local memory cache is used.
+# The file based cache is meant for deployments on a single machine, for the
+# database cache the location is the name of the table created by the
+# ``createcachetable`` command.
+CACHE_BACKEND = from_env("CACHE_BACKEND", development="locmem", production="file")
+CACHE_LOCATION = from_env(
+    "CACHE_LOCATION", development="", production="/concrexit/cache/"
+)
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "database": "django.core.cache.backends.db.DatabaseCache",
+}
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise Misconfiguration(f"Unknown cache backend `{CACHE_BACKEND}`")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": CACHE_LOCATION,
+        "KEY_PREFIX": "concrexit",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
 ###############################################################################
 # Firebase config
 FIREBASE_CREDENTIALS = os.environ.get("FIREBASE_CREDENTIALS", "{}")
@@ -312,6 +349,8 @@ if FIREBASE_CREDENTIALS != {}:
     except ValueError as e:
         logger.error("Firebase application failed to initialise")
 
+PUSHNOTIFICATIONS_TRANSPORT = "pushnotifications.delivery.FirebaseTransport"
+
 ###############################################################################
 # GSuite config
 GSUITE_ADMIN_SCOPES = [
@@ -417,6 +456,7 @@ INSTALLED_APPS = [
     "singlepages.apps.SinglepagesConfig",
     "shortlinks.apps.ShortLinkConfig",
     "sales.apps.SalesConfig",
+    "outbox.apps.OutboxConfig",
 ]
 
 MIDDLEWARE = [
@@ -659,6 +699,12 @@ THUMBNAIL_SIZES = {
 # Photos settings
 PHOTO_UPLOAD_SIZE = 2560, 1440
 
+# Thumbnails (size, fit) that are generated in advance for every photo
+PHOTO_THUMBNAILS = [
+    (THUMBNAIL_SIZES["medium"], True),
+    (THUMBNAIL_SIZES["large"], False),
+]
+
 # TinyMCE config
 TINYMCE_JS_URL = "/static/tinymce/js/tinymce/tinymce.min.js"
 
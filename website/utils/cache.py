@@ -0,0 +1,128 @@
+"""Tagged cache entries that are invalidated when the models they depend on change.
+
+Every tag has a version that is stored in the cache itself. Keys of cached
+values contain the versions of their tags, so invalidating a tag, which
+replaces its version, makes every value cached with that tag unreachable at
+once. The stale entries simply expire. Because the versions live in the
+shared cache, invalidation works across all processes, except with the
+local memory cache (see ``is_shared``).
+
+Example::
+
+    invalidate_on_change(Partner, "partners")
+
+    def get_partners():
+        return cache.get_or_set(
+            "partners", lambda: list(Partner.objects.all()), tags=["partners"]
+        )
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache as default_cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_delete, post_save
+
+TAG_KEY_PREFIX = "cache_tag_"
+
+
+def is_shared() -> bool:
+    """Check whether the cache is shared by all processes.
+
+    The local memory cache is kept per process, so invalidating a tag only
+    reaches the process that made the change.
+
+    :return: whether the cache is shared
+    :rtype: bool
+    """
+    return not isinstance(caches["default"], LocMemCache)
+
+
+def _tag_key(tag):
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+
+def get_tag_versions(tags) -> dict:
+    """Get the current versions of cache tags.
+
+    Tags without a version get a new one, which is kept until the tag
+    is invalidated.
+
+    :param tags: the names of the tags
+    :return: the versions by tag
+    :rtype: dict
+    """
+    keys = {tag: _tag_key(tag) for tag in tags}
+    stored = default_cache.get_many(keys.values())
+    versions = {}
+    missing = {}
+    for tag, key in keys.items():
+        if key in stored:
+            versions[tag] = stored[key]
+        else:
+            versions[tag] = missing[key] = uuid.uuid4().hex
+    if missing:
+        default_cache.set_many(missing, None)
+    return versions
+
+
+def invalidate(*tags):
+    """Invalidate all values that were cached with any of the tags.
+
+    :param tags: the names of the tags
+    """
+    default_cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def tagged_key(key, tags) -> str:
+    """Get the cache key for a value that depends on tags.
+
+    :param key: the key of the value
+    :param tags: the names of the tags
+    :return: the key, including the current versions of the tags
+    :rtype: str
+    """
+    if not tags:
+        return key
+    versions = get_tag_versions(tags)
+    digest = hashlib.md5(
+        ":".join(f"{tag}={versions[tag]}" for tag in sorted(versions)).encode()
+    ).hexdigest()
+    return f"{key}_{digest}"
+
+
+def get_or_set(key, default, tags=(), timeout=DEFAULT_TIMEOUT):
+    """Get a value that was cached with tags, or cache a new one.
+
+    :param key: the key of the value
+    :param default: the value, or a callable that computes it, to cache if
+                    nothing is cached
+    :param tags: the names of the tags the value depends on
+    :param timeout: the number of seconds to keep the value
+    :return: the cached value
+    """
+    key = tagged_key(key, tags)
+    value = default_cache.get(key)
+    if value is None:
+        value = default() if callable(default) else default
+        default_cache.set(key, value, timeout)
+    return value
+
+
+def invalidate_on_change(model, *tags):
+    """Invalidate tags whenever an instance of a model is saved or deleted.
+
+    The receivers are not suspended, see
+    ``utils.models.signals.suspendingreceiver``.
+
+    :param model: the model class
+    :param tags: the names of the tags to invalidate
+    """
+
+    def receiver(**kwargs):
+        invalidate(*tags)
+
+    uid = f"cache_tags_{model._meta.label_lower}_{'_'.join(tags)}"
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
@@ -1,11 +1,16 @@
+import logging
+import time
+
 import requests
 
 from utils.conscribo.objects import Request, Result
 
+logger = logging.getLogger(__name__)
+
 
 class ConscriboApi:
-    def __init__(self, account, username, password):
-        self._session = requests.session()
+    def __init__(self, account, username, password, session=None):
+        self._session = session or requests.session()
         self._endpoint = f"https://secure.conscribo.nl" f"/{account}/request.json"
         self._headers = {"X-Conscribo-API-Version": "0.20161212"}
         self.authenticate(username, password)
@@ -29,6 +34,38 @@ class ConscriboApi:
         response.raise_for_status()
         return Result.multi(response.json())
 
+    def chunked_request(self, commands, chunk_size=100, retries=3, retry_delay=1):
+        """Execute commands in multi requests of a bounded size.
+
+        A chunk that fails because of a connection or HTTP error is retried
+        with an exponential backoff. When the retries are exhausted, the
+        error is raised and the remaining chunks are not sent.
+
+        :param commands: the commands to execute
+        :param chunk_size: the maximum number of commands per request
+        :param retries: the number of retries per chunk
+        :param retry_delay: the delay in seconds before the first retry
+        :return: generator of ``(commands, results)`` tuples for every chunk,
+                 with the results in the order of the commands and ``None``
+                 for commands without a result
+        """
+        for i in range(0, len(commands), chunk_size):
+            chunk = commands[i : i + chunk_size]
+            for attempt in range(retries + 1):
+                try:
+                    results = self.multi_request(chunk)
+                    break
+                except requests.RequestException as e:
+                    if attempt == retries:
+                        raise
+                    logger.warning(
+                        "Request of %d commands failed, retrying: %s", len(chunk), e
+                    )
+                    time.sleep(retry_delay * 2 ** attempt)
+            # The results are not necessarily in the order of the requests
+            by_sequence = {int(result.request_sequence): result for result in results}
+            yield chunk, [by_sequence.get(i) for i in range(len(chunk))]
+
     def authenticate(self, username, password):
         result = self.single_request(
             command="authenticateWithUserAndPass",
@@ -0,0 +1,190 @@
+"""Streaming exports of rows to CSV and XLSX files.
+
+The rows are written while the response is sent, so exports of large
+querysets start immediately and use a constant amount of memory when the
+rows come from ``QuerySet.iterator()``.
+"""
+import csv
+import io
+import re
+import zipfile
+from decimal import Decimal
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+
+ROWS_PER_CHUNK = 100
+
+
+def batched(iterable, size):
+    """Split an iterable into lists of at most ``size`` items.
+
+    :param iterable: the items
+    :param size: the maximum length of a batch
+    :return: generator of the batches
+    """
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+class ExportWriter:
+    """Base class of the file formats of exports."""
+
+    content_type = None
+    extension = None
+
+    def write(self, header, rows):
+        """Write the rows of an export.
+
+        :param header: the names of the columns
+        :param rows: iterable of rows, which are sequences of values
+        :return: generator of the chunks of the file
+        """
+        raise NotImplementedError
+
+
+class CSVWriter(ExportWriter):
+    """Writes exports as comma separated values."""
+
+    content_type = "text/csv"
+    extension = "csv"
+
+    def write(self, header, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for batch in batched(rows, ROWS_PER_CHUNK):
+            writer.writerows(batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+
+class _ZipStream:
+    """A write-only file that collects what a ``ZipFile`` writes to it."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class XLSXWriter(ExportWriter):
+    """Writes exports as an Office Open XML workbook with a single sheet.
+
+    The sheet is compressed while the rows are written, strings are stored
+    inline and numbers as numeric cells.
+    """
+
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    extension = "xlsx"
+
+    _ILLEGAL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+    _PARTS = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>"
+        ),
+        "xl/workbook.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+            "</workbook>"
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+            "</Relationships>"
+        ),
+    }
+
+    def _cell(self, value):
+        if value is None or value == "":
+            return "<c/>"
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            return f"<c><v>{value}</v></c>"
+        text = escape(self._ILLEGAL_CHARACTERS.sub("", str(value)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+    def _row(self, row):
+        return "<row>{}</row>".format("".join(self._cell(value) for value in row))
+
+    def write(self, header, rows):
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in self._PARTS.items():
+                archive.writestr(name, content)
+            with archive.open(
+                "xl/worksheets/sheet1.xml", "w", force_zip64=True
+            ) as sheet:
+                sheet.write(
+                    (
+                        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                        "<sheetData>" + self._row(header)
+                    ).encode("utf-8")
+                )
+                for batch in batched(rows, ROWS_PER_CHUNK):
+                    sheet.write(
+                        "".join(self._row(row) for row in batch).encode("utf-8")
+                    )
+                    data = stream.pop()
+                    if data:
+                        yield data
+                sheet.write(b"</sheetData></worksheet>")
+        yield stream.pop()
+
+
+WRITERS = {writer.extension: writer for writer in (CSVWriter, XLSXWriter)}
+
+
+def export_response(filename, header, rows, file_format="csv"):
+    """Stream rows to the client as a file.
+
+    :param filename: the name of the file, without extension
+    :param header: the names of the columns
+    :param rows: iterable of rows, which are sequences of values
+    :param file_format: the extension of one of the ``WRITERS``, defaults to
+                        CSV for unknown formats
+    :return: the response
+    :rtype: StreamingHttpResponse
+    """
+    writer = WRITERS.get(file_format, CSVWriter)()
+    response = StreamingHttpResponse(
+        writer.write([str(column) for column in header], rows),
+        content_type=writer.content_type,
+    )
+    response[
+        "Content-Disposition"
+    ] = f'attachment; filename="{filename}.{writer.extension}"'
+    return response
@@ -1,10 +1,15 @@
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 
+from PIL import Image, ImageOps, UnidentifiedImageError
 from django.db.models.fields.files import FieldFile, ImageFieldFile
 from django.conf import settings
 from django.core import signing
 from django.urls import reverse
 
+logger = logging.getLogger(__name__)
+
 
 def get_media_url(path, attachment=False):
     """Get the url of the provided media file to serve in a browser.
@@ -37,7 +42,42 @@ def get_media_url(path, attachment=False):
     return f"{settings.MEDIA_URL}{url_path}{query}"
 
 
-def get_thumbnail_url(path, size, fit=True):
+def get_thumbnail_paths(path, size, fit=True):
+    """Get the full paths of a media file and its thumbnail, NEVER use this with user input.
+
+    :param path: the location of the file
+    :param size: size of the image
+    :param fit: False to keep the aspect ratio, True to crop
+    :return: tuple of the full original path and the full thumbnail path
+    """
+    if isinstance(path, ImageFieldFile) or isinstance(path, FieldFile):
+        path = path.name
+
+    thumb_path = os.path.join("thumbnails", "{}_{}".format(size, int(fit)))
+    parts = path.split("/")
+    if parts[0] == "public":
+        path = "/".join(parts[1:])
+        root = os.path.join(settings.MEDIA_ROOT, "public")
+    else:
+        root = settings.MEDIA_ROOT
+
+    return os.path.join(root, path), os.path.join(root, thumb_path, path)
+
+
+def is_thumbnail_outdated(full_original_path, full_thumb_path):
+    """Check if a thumbnail does not exist or is older than its original.
+
+    :param full_original_path: the location of the original image
+    :param full_thumb_path: the location of the thumbnail
+    :return: True if the thumbnail has to be generated
+    """
+    return not os.path.isfile(full_thumb_path) or (
+        os.path.exists(full_original_path)
+        and os.path.getmtime(full_original_path) > os.path.getmtime(full_thumb_path)
+    )
+
+
+def get_thumbnail_url(path, size, fit=True, generated=False):
     """Get the thumbnail url of a media file, NEVER use this with user input.
 
     If the thumbnail exists this function will return the url of the
@@ -47,6 +87,8 @@ def get_thumbnail_url(path, size, fit=True):
     :param path: the location of the file
     :param size: size of the image
     :param fit: False to keep the aspect ratio, True to crop
+    :param generated: True if the caller knows the thumbnail has been
+    generated, which skips checking the file system
     :return: direct media url or generate-thumbnail path
     """
     if isinstance(path, ImageFieldFile) or isinstance(path, FieldFile):
@@ -75,25 +117,12 @@ def get_thumbnail_url(path, size, fit=True):
     sig_info["thumb_path"] = f'thumbnails/{size_fit}/{sig_info["path"]}'
     url_path = f'{sig_info["visibility"]}/thumbnails/' f'{size_fit}/{sig_info["path"]}'
 
-    if sig_info["visibility"] == "public":
-        full_original_path = os.path.join(
-            settings.MEDIA_ROOT, "public", sig_info["path"]
-        )
-        full_thumb_path = os.path.join(
-            settings.MEDIA_ROOT, "public", sig_info["thumb_path"]
-        )
-    else:
-        full_original_path = os.path.join(settings.MEDIA_ROOT, sig_info["path"])
-        full_thumb_path = os.path.join(settings.MEDIA_ROOT, sig_info["thumb_path"])
-
+    full_original_path, full_thumb_path = get_thumbnail_paths(path, size, fit)
     sig_info["serve_path"] = full_thumb_path
 
     # Check if we need to generate, then redirect to the generating route,
     # otherwise just return the serving file path
-    if not os.path.isfile(full_thumb_path) or (
-        os.path.exists(full_original_path)
-        and os.path.getmtime(full_original_path) > os.path.getmtime(full_thumb_path)
-    ):
+    if not generated and is_thumbnail_outdated(full_original_path, full_thumb_path):
         # Put all image info in signature for the generate view
         query = f"?sig={signing.dumps(sig_info)}"
         # We provide a URL instead of calling it as a function, so that using
@@ -111,3 +140,51 @@ def get_thumbnail_url(path, size, fit=True):
         query = f"?sig={signing.dumps(sig_info)}"
 
     return f"{settings.MEDIA_URL}{url_path}{query}"
+
+
+def generate_thumbnail(full_original_path, full_thumb_path, size, fit=True):
+    """Create a thumbnail of an image file.
+
+    :param full_original_path: the location of the original image
+    :param full_thumb_path: the location to save the thumbnail to
+    :param size: size of the thumbnail formatted like `widthxheight`
+    :param fit: False to keep the aspect ratio, True to crop
+    """
+    # Check if directory for thumbnail exists, if not create it
+    os.makedirs(os.path.dirname(full_thumb_path), exist_ok=True)
+
+    image = Image.open(full_original_path)
+    size = tuple(int(dim) for dim in size.split("x"))
+    if not fit:
+        ratio = min([a / b for a, b in zip(size, image.size)])
+        size = tuple(int(ratio * x) for x in image.size)
+
+    if size[0] == image.size[0] and size[1] == image.size[1]:
+        image.save(full_thumb_path)
+    else:
+        thumb = ImageOps.fit(image, size, Image.ANTIALIAS)
+        thumb.save(full_thumb_path)
+
+
+def _generate_thumbnail_job(job):
+    try:
+        generate_thumbnail(*job)
+    except (OSError, UnidentifiedImageError):
+        logger.warning("Could not generate thumbnail %s", job[1])
+        return False
+    return True
+
+
+def generate_thumbnails(jobs, max_workers=None):
+    """Create many thumbnails in a pool of processes.
+
+    :param jobs: list of (original path, thumbnail path, size, fit) tuples
+    :param max_workers: the number of processes, defaults to the number of CPUs
+    :return: iterator over whether each job succeeded, in the order of the jobs
+    """
+    if max_workers == 1:
+        yield from map(_generate_thumbnail_job, jobs)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(_generate_thumbnail_job, jobs, chunksize=4)
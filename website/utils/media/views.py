@@ -2,7 +2,6 @@
 import os
 from datetime import timedelta
 
-from PIL import Image, ImageOps
 from django.conf import settings
 from django.core import signing
 from django.core.exceptions import PermissionDenied
@@ -11,6 +10,8 @@ from django.http import Http404
 from django.shortcuts import redirect
 from django_sendfile import sendfile
 
+from utils.media import services
+
 
 def _get_signature_info(request):
     if "sig" in request.GET:
@@ -79,24 +80,14 @@ def generate_thumbnail(request, request_path):
     if not os.path.exists(full_original_path):
         raise Http404
 
-    # Check if directory for thumbnail exists, if not create it
-    os.makedirs(os.path.dirname(full_thumb_path), exist_ok=True)
     # Skip generating the thumbnail if it exists
     if not os.path.isfile(full_thumb_path) or os.path.getmtime(
         full_original_path
     ) > os.path.getmtime(full_thumb_path):
         # Create a thumbnail from the original_path, saved to thumb_path
-        image = Image.open(full_original_path)
-        size = tuple(int(dim) for dim in sig_info["size"].split("x"))
-        if not sig_info["fit"]:
-            ratio = min([a / b for a, b in zip(size, image.size)])
-            size = tuple(int(ratio * x) for x in image.size)
-
-        if size[0] == image.size[0] and size[1] == image.size[1]:
-            image.save(full_thumb_path)
-        else:
-            thumb = ImageOps.fit(image, size, Image.ANTIALIAS)
-            thumb.save(full_thumb_path)
+        services.generate_thumbnail(
+            full_original_path, full_thumb_path, sig_info["size"], sig_info["fit"]
+        )
 
     if sig_info["visibility"] == "private":
         query = f'?sig={request.GET["sig"]}'
@@ -8,7 +8,9 @@ def suspendingreceiver(signal, **decorator_kwargs):
     """Create wrapper around the standard django receiver that prevents the receiver from running if the setting `SUSPEND_SIGNALS` is `True`.
 
     This is particularly useful if you want to prevent signals running during
-    unit testing.
+    unit testing. Receivers that keep stored data consistent, like totals,
+    ledgers and cache tags, use the plain ``receiver`` instead, since
+    skipping them would leave that data wrong.
 
     @override_settings(SUSPEND_SIGNALS=True)
     class MyTestCase(TestCase):
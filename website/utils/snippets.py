@@ -186,17 +186,21 @@ def overlaps(check, others, can_equal=True):
     return False
 
 
-def send_email(to: str, subject: str, body_template: str, context: dict) -> None:
+def send_email(
+    to: str, subject: str, body_template: str, context: dict, connection=None
+) -> None:
     """Easily send an email with the right subject and a body template.
 
     :param to: where should the email go?
     :param subject: what is the email about?
     :param body_template: what is the content of the email?
     :param context: add some context to the body
+    :param connection: optional mail connection to reuse
     """
     mail.EmailMessage(
         "[THALIA] {}".format(subject),
         loader.render_to_string(body_template, context),
         settings.DEFAULT_FROM_EMAIL,
         [to],
+        connection=connection,
     ).send()
@@ -1,7 +1,19 @@
 """Tests for the ``utils`` module."""
 import doctest
+import io
+import os
+import tempfile
+import zipfile
+from decimal import Decimal
 
-from utils import snippets
+from django.core.cache import cache as default_cache
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from members.models import Member
+from utils import cache, export, snippets
+from utils.media.services import get_thumbnail_url
 
 
 def load_tests(_loader, tests, _ignore):
@@ -9,3 +21,145 @@ def load_tests(_loader, tests, _ignore):
     # Adds the doctests in snippets
     tests.addTests(doctest.DocTestSuite(snippets))
     return tests
+
+
+class CacheTagsTest(TestCase):
+    def setUp(self):
+        default_cache.clear()
+        self.calls = 0
+
+    def _compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_get_or_set(self):
+        self.assertEqual(1, cache.get_or_set("key", self._compute, tags=["a"]))
+        self.assertEqual(1, cache.get_or_set("key", self._compute, tags=["a"]))
+        self.assertEqual(1, self.calls)
+
+    def test_invalidate(self):
+        cache.get_or_set("key_a", self._compute, tags=["a"])
+        cache.get_or_set("key_ab", self._compute, tags=["a", "b"])
+        cache.get_or_set("key_c", self._compute, tags=["c"])
+
+        cache.invalidate("a")
+
+        self.assertEqual(4, cache.get_or_set("key_a", self._compute, tags=["a"]))
+        self.assertEqual(5, cache.get_or_set("key_ab", self._compute, tags=["b", "a"]))
+        self.assertEqual(3, cache.get_or_set("key_c", self._compute, tags=["c"]))
+
+    def test_tag_versions_shared(self):
+        versions = cache.get_tag_versions(["a", "b"])
+        self.assertEqual(versions, cache.get_tag_versions(["b", "a"]))
+        cache.invalidate("b")
+        self.assertEqual(versions["a"], cache.get_tag_versions(["a"])["a"])
+        self.assertNotEqual(versions["b"], cache.get_tag_versions(["b"])["b"])
+
+    def test_invalidate_on_change(self):
+        cache.invalidate_on_change(Member, "test_members")
+        uid = "cache_tags_members.member_test_members"
+        self.addCleanup(post_save.disconnect, sender=Member, dispatch_uid=uid)
+        self.addCleanup(post_delete.disconnect, sender=Member, dispatch_uid=uid)
+        key = cache.tagged_key("key", ["test_members"])
+        self.assertEqual(key, cache.tagged_key("key", ["test_members"]))
+
+        member = Member.objects.create(username="test")
+        self.assertNotEqual(key, cache.tagged_key("key", ["test_members"]))
+
+        key = cache.tagged_key("key", ["test_members"])
+        member.delete()
+        self.assertNotEqual(key, cache.tagged_key("key", ["test_members"]))
+
+
+class ExportTest(TestCase):
+    def test_batched(self):
+        self.assertEqual([[0, 1], [2, 3], [4]], list(export.batched(range(5), 2)))
+        self.assertEqual([], list(export.batched([], 2)))
+
+    def test_csv(self):
+        rows = ([i, f"row {i}"] for i in range(export.ROWS_PER_CHUNK + 1))
+        chunks = list(export.CSVWriter().write(["Number", "Name"], rows))
+
+        self.assertEqual(2, len(chunks))
+        content = b"".join(chunks).decode("utf-8").split("\r\n")
+        self.assertEqual("Number,Name", content[0])
+        self.assertEqual("0,row 0", content[1])
+        self.assertEqual("100,row 100", content[101])
+
+    def test_xlsx(self):
+        rows = [[1, Decimal("2.50"), "<a & b>", None], [True, "x\x01y", "", 3.5]]
+        content = b"".join(export.XLSXWriter().write(["A", "B", "C", "D"], rows))
+
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIn("xl/workbook.xml", archive.namelist())
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+
+        self.assertIn("<c><v>1</v></c><c><v>2.50</v></c>", sheet)
+        self.assertIn('<t xml:space="preserve">&lt;a &amp; b&gt;</t>', sheet)
+        self.assertIn('<t xml:space="preserve">True</t>', sheet)
+        self.assertIn('<t xml:space="preserve">xy</t></is></c><c/><c><v>3.5</v>', sheet)
+        self.assertEqual(3, sheet.count("<row>"))
+
+    def test_export_response(self):
+        response = export.export_response("test", ["A"], [[1]], "xlsx")
+        self.assertEqual(export.XLSXWriter.content_type, response["Content-Type"])
+        self.assertEqual(
+            'attachment; filename="test.xlsx"', response["Content-Disposition"]
+        )
+
+        response = export.export_response("test", ["A"], [[1]], "unknown")
+        self.assertEqual(
+            'attachment; filename="test.csv"', response["Content-Disposition"]
+        )
+        self.assertEqual(b"A\r\n1\r\n", b"".join(response.streaming_content))
+
+
+class GenerateThumbnailTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = media_root.name
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _image(self, path):
+        full_path = os.path.join(self.media_root, path)
+        os.makedirs(os.path.dirname(full_path))
+        Image.new("RGB", (800, 400)).save(full_path)
+
+    def test_generate_public(self):
+        self._image("public/test/image.png")
+        url = get_thumbnail_url("public/test/image.png", "300x300", fit=False)
+        self.assertIn("generate-thumbnail", url)
+
+        response = self.client.get(url)
+
+        self.assertEqual(301, response.status_code)
+        self.assertTrue(
+            response.url.endswith("public/thumbnails/300x300_0/test/image.png")
+        )
+        with Image.open(
+            os.path.join(self.media_root, "public/thumbnails/300x300_0/test/image.png")
+        ) as thumbnail:
+            self.assertEqual((300, 150), thumbnail.size)
+
+    def test_generate_private(self):
+        self._image("private/image.png")
+        url = get_thumbnail_url("private/image.png", "300x300")
+
+        response = self.client.get(url)
+
+        self.assertEqual(301, response.status_code)
+        self.assertIn("?sig=", response.url)
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(self.media_root, "thumbnails/300x300_1/private/image.png")
+            )
+        )
+
+    def test_bad_signature(self):
+        response = self.client.get(
+            "/media/generate-thumbnail/300x300_1/image.png?sig=bad"
+        )
+        self.assertEqual(403, response.status_code)